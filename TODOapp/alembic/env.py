@@ -4,6 +4,7 @@ from logging.config import fileConfig
 from alembic import context
 from core.config import settings
 from core.models import Base
+from core.utils.task_partitions import DEFAULT_PARTITION, PARTITION_NAME_RE
 from sqlalchemy import pool
 from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import async_engine_from_config
@@ -56,8 +57,19 @@ def run_migrations_offline() -> None:
         context.run_migrations()
 
 
+def include_name(name, type_, parent_names) -> bool:
+    return not (
+        type_ == "table"
+        and (name == DEFAULT_PARTITION or PARTITION_NAME_RE.match(name))
+    )
+
+
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_name=include_name,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
@@ -0,0 +1,29 @@
+"""add security epoch to user
+
+Revision ID: 9b2e4d7c1a05
+Revises: 3f1c9a7d2b64
+Create Date: 2026-10-18 11:20:41.907315
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9b2e4d7c1a05"
+down_revision: str | None = "3f1c9a7d2b64"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column("security_epoch", sa.Integer(), server_default="0", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("users", "security_epoch")
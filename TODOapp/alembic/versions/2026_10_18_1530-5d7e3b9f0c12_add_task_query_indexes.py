@@ -0,0 +1,49 @@
+"""add task query indexes
+
+Revision ID: 5d7e3b9f0c12
+Revises: c4d81f2a6e97
+Create Date: 2026-10-18 15:30:12.418227
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5d7e3b9f0c12"
+down_revision: str | None = "c4d81f2a6e97"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+task_indexes: dict[str, list[str]] = {
+    "ix_tasks_user_id_id": ["user_id", "id"],
+    "ix_tasks_status_id": ["status", "id"],
+    "ix_tasks_name_id": ["name", "id"],
+    "ix_tasks_start_at": ["start_at"],
+    "ix_tasks_end_at": ["end_at"],
+}
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for index_name, columns in task_indexes.items():
+            op.create_index(
+                index_name,
+                "tasks",
+                columns,
+                unique=False,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for index_name in task_indexes:
+            op.drop_index(
+                index_name,
+                table_name="tasks",
+                if_exists=True,
+                postgresql_concurrently=True,
+            )
@@ -0,0 +1,73 @@
+"""add task search indexes
+
+Revision ID: 8a4c6e2f1b37
+Revises: 5d7e3b9f0c12
+Create Date: 2026-10-18 16:40:51.093316
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "8a4c6e2f1b37"
+down_revision: str | None = "5d7e3b9f0c12"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column(
+        "tasks",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "to_tsvector('simple', "
+                "coalesce(name, '') || ' ' || coalesce(description, ''))",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_tasks_search_vector",
+            "tasks",
+            ["search_vector"],
+            unique=False,
+            if_not_exists=True,
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+        for column in ("name", "description"):
+            op.create_index(
+                f"ix_tasks_{column}_trgm",
+                "tasks",
+                [column],
+                unique=False,
+                if_not_exists=True,
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for index_name in (
+            "ix_tasks_description_trgm",
+            "ix_tasks_name_trgm",
+            "ix_tasks_search_vector",
+        ):
+            op.drop_index(
+                index_name,
+                table_name="tasks",
+                if_exists=True,
+                postgresql_concurrently=True,
+            )
+    op.drop_column("tasks", "search_vector")
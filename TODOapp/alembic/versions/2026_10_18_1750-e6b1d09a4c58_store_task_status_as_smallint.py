@@ -0,0 +1,77 @@
+"""store task status as smallint
+
+Revision ID: e6b1d09a4c58
+Revises: 8a4c6e2f1b37
+Create Date: 2026-10-18 17:50:08.662140
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from core.config import settings
+
+# revision identifiers, used by Alembic.
+revision: str = "e6b1d09a4c58"
+down_revision: str | None = "8a4c6e2f1b37"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+task_statuses: dict[str, int] = {
+    "Planned": 0,
+    "At work": 1,
+    "Completed": 2,
+    "Delayed": 3,
+}
+
+
+def check_task_statuses() -> None:
+    configured = list(settings.tstat.model_dump().values())
+    if configured != list(task_statuses):
+        raise RuntimeError(
+            "Migration e6b1d09a4c58 converts the default task status labels "
+            f"{list(task_statuses)} to codes in that order, but settings.tstat "
+            f"is {configured}. Rename the stored statuses to the default labels "
+            "before migrating, or adjust task_statuses in this migration."
+        )
+
+
+def upgrade() -> None:
+    check_task_statuses()
+    to_code = " ".join(
+        f"WHEN '{label}' THEN {code}" for label, code in task_statuses.items()
+    )
+    op.alter_column("tasks", "status", server_default=None)
+    op.alter_column(
+        "tasks",
+        "status",
+        type_=sa.SmallInteger(),
+        existing_type=sa.String(),
+        existing_nullable=False,
+        postgresql_using=f"CASE status {to_code} END",
+    )
+    op.alter_column("tasks", "status", server_default="0")
+    op.create_check_constraint(
+        "ck_tasks_status",
+        "tasks",
+        f"status >= 0 AND status < {len(task_statuses)}",
+    )
+
+
+def downgrade() -> None:
+    check_task_statuses()
+    to_label = " ".join(
+        f"WHEN {code} THEN '{label}'" for label, code in task_statuses.items()
+    )
+    op.drop_constraint("ck_tasks_status", "tasks", type_="check")
+    op.alter_column("tasks", "status", server_default=None)
+    op.alter_column(
+        "tasks",
+        "status",
+        type_=sa.String(),
+        existing_type=sa.SmallInteger(),
+        existing_nullable=False,
+        postgresql_using=f"CASE status {to_label} END",
+    )
+    op.alter_column("tasks", "status", server_default="Planned")
@@ -0,0 +1,86 @@
+"""create tasks archive table
+
+Revision ID: 7f3a9c1d5e28
+Revises: e6b1d09a4c58
+Create Date: 2026-10-18 18:30:42.627071
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "7f3a9c1d5e28"
+down_revision: str | None = "e6b1d09a4c58"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "tasks_archive",
+        sa.Column("name", sa.String(length=70), nullable=False),
+        sa.Column("description", sa.String(length=360), nullable=True),
+        sa.Column("start_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("end_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "scheduled_hours",
+            sa.Integer(),
+            server_default="0",
+            nullable=False,
+        ),
+        sa.Column("status", sa.SmallInteger(), server_default="0", nullable=False),
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "to_tsvector('simple', "
+                "coalesce(name, '') || ' ' || coalesce(description, ''))",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "archived_at",
+            sa.DateTime(),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("last_update_at", sa.DateTime(), nullable=True),
+        sa.CheckConstraint(
+            "status >= 0 AND status < 4",
+            name="ck_tasks_archive_status",
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_tasks_archive_user_id_id",
+        "tasks_archive",
+        ["user_id", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_tasks_archive_search_vector",
+        "tasks_archive",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tasks_archive_search_vector", table_name="tasks_archive")
+    op.drop_index("ix_tasks_archive_user_id_id", table_name="tasks_archive")
+    op.drop_table("tasks_archive")
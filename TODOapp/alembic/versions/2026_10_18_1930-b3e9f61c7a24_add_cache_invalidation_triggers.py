@@ -0,0 +1,37 @@
+"""add cache invalidation triggers
+
+Revision ID: b3e9f61c7a24
+Revises: 7f3a9c1d5e28
+Create Date: 2026-10-18 19:30:17.415932
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+from core.config import settings
+from core.utils.invalidation_triggers import (
+    TRIGGER_FUNCTIONS,
+    TRIGGER_NAME,
+    create_trigger,
+    function_name,
+)
+from sqlalchemy.sql import text
+
+# revision identifiers, used by Alembic.
+revision: str = "b3e9f61c7a24"
+down_revision: str | None = "7f3a9c1d5e28"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    for table, function in TRIGGER_FUNCTIONS.items():
+        op.execute(text(function))
+        op.execute(text(create_trigger(table, settings.db.invalidation_bus.channel)))
+
+
+def downgrade() -> None:
+    for table in TRIGGER_FUNCTIONS:
+        op.execute(text(f"DROP TRIGGER IF EXISTS {TRIGGER_NAME} ON {table};"))
+        op.execute(text(f"DROP FUNCTION IF EXISTS {function_name(table)};"))
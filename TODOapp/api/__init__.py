@@ -2,6 +2,7 @@ from core.config import settings
 from fastapi import APIRouter
 
 from .auth.auth import router as auth_router
+from .views.internal import router as internal_router
 from .views.task import router as task_router
 from .views.user import router as user_router
 
@@ -21,3 +22,8 @@ router.include_router(
     prefix=settings.api.auth_jwt.prefix,
     tags=[settings.api.auth_jwt.tag],
 )
+router.include_router(
+    router=internal_router,
+    prefix=settings.api.internal.prefix,
+    tags=[settings.api.internal.tag],
+)
@@ -1,20 +1,50 @@
+import contextlib
+from datetime import UTC, datetime, timedelta
 from typing import Annotated
 
 from core.config import settings
+from core.crud import api_key as api_key_crud
 from core.models import User, db_helper
-from fastapi import APIRouter, Depends, Response
+from core.utils.jwt import decode_jwt_cached
+from core.utils.rate_limit import login_admission
+from core.utils.revocation import revocation_list
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Path,
+    Request,
+    Response,
+    status,
+)
 from fastapi.security import OAuth2PasswordRequestForm
+from jwt import InvalidTokenError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.auth.utils import create_access_token, create_refresh_token
-from api.schemas import TokenInfoSchm, UserSchmExtended
+from api.http_exceptions import (
+    api_key_id_exc_templ,
+    no_priv_except,
+    rendering_exception_with_param,
+)
+from api.schemas import (
+    ApiKeyCreatedSchm,
+    ApiKeySchm,
+    CreateApiKeySchm,
+    RevokeTokenSchm,
+    TokenInfoSchm,
+    UserSchmExtended,
+)
 
 from .validation import (
     ACCESS_TOKEN_TYPE,
     REFRESH_TOKEN_TYPE,
     get_auth_user_from_db,
+    get_currant_access_token_payload,
     get_currant_auth_user,
     get_currant_auth_user_for_refresh,
+    get_currant_auth_user_with_admin,
 )
 
 router = APIRouter()
@@ -24,14 +54,23 @@ router = APIRouter()
 async def auth_user_login(
     session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
+    request: Request,
     response: Response,
+    background_tasks: BackgroundTasks,
 ):
-
-    user = await get_auth_user_from_db(
-        session,
-        form_data.username,
-        form_data.password,
-    )
+    client_ip = request.client.host if request.client else "unknown"
+    login_admission.admit(form_data.username, client_ip)
+    async with login_admission.verification_slot():
+        try:
+            user = await get_auth_user_from_db(
+                session,
+                form_data.username,
+                form_data.password,
+                background_tasks,
+            )
+        except HTTPException:
+            login_admission.record_failure(form_data.username)
+            raise
     access_token = create_access_token(user, response=response)
     refresh_token = create_refresh_token(user, response=response)
     return TokenInfoSchm(
@@ -57,9 +96,19 @@ async def auth_user_refresh(
 
 @router.post("/logout/")
 async def auth_user_logout(
+    session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
     _current_user: Annotated[UserSchmExtended, Depends(get_currant_auth_user)],
+    payload: Annotated[dict, Depends(get_currant_access_token_payload)],
+    request: Request,
     response: Response,
 ):
+    await revocation_list.revoke_payload(session, payload)
+    if refresh_token := request.cookies.get(REFRESH_TOKEN_TYPE):
+        with contextlib.suppress(InvalidTokenError):
+            await revocation_list.revoke_payload(
+                session,
+                decode_jwt_cached(refresh_token),
+            )
     response.delete_cookie(
         key=ACCESS_TOKEN_TYPE,
         httponly=settings.api.auth_jwt.cookies.http_only,
@@ -75,3 +124,72 @@ async def auth_user_logout(
         samesite=settings.api.auth_jwt.cookies.samesite,
     )
     return {"detail": "Logout successful"}
+
+
+@router.post(
+    "/revoke/",
+    description=f"Authentication and {settings.roles.admin} role is required",
+)
+async def revoke_token(
+    session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
+    token_to_revoke: RevokeTokenSchm,
+    _admin: Annotated[UserSchmExtended, Depends(get_currant_auth_user_with_admin)],
+):
+    expires_at = token_to_revoke.expires_at or datetime.now(UTC) + timedelta(
+        days=settings.api.auth_jwt.refresh_token_expire_days,
+    )
+    await revocation_list.revoke(session, token_to_revoke.jti, expires_at)
+    return {"detail": "Token revoked"}
+
+
+@router.post(
+    "/api-keys/",
+    response_model=ApiKeyCreatedSchm,
+    status_code=status.HTTP_201_CREATED,
+    description="Authentication is required. The key is only shown once",
+)
+async def create_api_key(
+    session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
+    api_key_to_create: CreateApiKeySchm,
+    current_user: Annotated[UserSchmExtended, Depends(get_currant_auth_user)],
+):
+    api_key, raw_key = await api_key_crud.create_api_key(
+        session,
+        user_id=current_user.id,
+        name=api_key_to_create.name,
+        expires_at=api_key_to_create.expires_at,
+    )
+    return ApiKeyCreatedSchm(
+        **ApiKeySchm.model_validate(api_key).model_dump(),
+        key=raw_key,
+    )
+
+
+@router.get(
+    "/api-keys/",
+    response_model=list[ApiKeySchm],
+    description="Authentication is required",
+)
+async def get_api_keys(
+    session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
+    current_user: Annotated[UserSchmExtended, Depends(get_currant_auth_user)],
+):
+    return await api_key_crud.get_user_api_keys(session, current_user.id)
+
+
+@router.delete(
+    "/api-keys/{api_key_id}/",
+    description=f"Authentication is required. {settings.roles.admin} role can revoke any key",
+)
+async def revoke_api_key(
+    session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
+    api_key_id: Annotated[int, Path],
+    current_user: Annotated[UserSchmExtended, Depends(get_currant_auth_user)],
+):
+    api_key = await api_key_crud.get_api_key_by_id(session, api_key_id)
+    if not api_key:
+        raise rendering_exception_with_param(api_key_id_exc_templ, str(api_key_id))
+    if api_key.user_id != current_user.id and current_user.role != settings.roles.admin:
+        raise no_priv_except
+    await api_key_crud.revoke_api_key(session, api_key)
+    return {"detail": "API key revoked"}
@@ -0,0 +1,13 @@
+from typing import Any
+
+from core.config import settings
+from core.utils.jwt import key_ring
+from fastapi import APIRouter, Response
+
+router = APIRouter()
+
+
+@router.get(settings.api.auth_jwt.jwks_path)
+async def get_jwks(response: Response) -> dict[str, list[dict[str, Any]]]:
+    response.headers["Cache-Control"] = "public, max-age=3600"
+    return key_ring.jwks()
@@ -4,18 +4,24 @@ from datetime import UTC, datetime, timedelta
 from core.config import settings
 from core.models import User
 from core.utils.jwt import encode_jwt
+from core.utils.timing import timed
 from fastapi import Depends, Request, Response
-from fastapi.security import OAuth2PasswordBearer
+from fastapi.security import APIKeyHeader, OAuth2PasswordBearer
 
 TOKEN_TYPE_FIELD = "type"
 ACCESS_TOKEN_TYPE = "access_token"
 REFRESH_TOKEN_TYPE = "refresh_token"
+WRITE_MARKER_TYPE = "write_marker"
 
 TOKEN_URL = f"{settings.api.prefix}{settings.api.auth_jwt.prefix}/login/"
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl=TOKEN_URL,
     auto_error=False,
 )
+api_key_header = APIKeyHeader(
+    name=settings.api.auth_jwt.api_key.header_name,
+    auto_error=False,
+)
 
 
 def create_token(
@@ -46,6 +52,15 @@ def create_token(
     return token
 
 
+def create_write_marker(user_id: int, response: Response) -> str:
+    return create_token(
+        token_type=WRITE_MARKER_TYPE,
+        payload={"sub": user_id},
+        expire_timedelta=timedelta(seconds=settings.db.read_your_writes_seconds),
+        response=response,
+    )
+
+
 def create_access_token(user: User, response: Response | None = None) -> str:
     jwt_payload = {
         "iss": "TODOapi-1@jam089.com",
@@ -55,6 +70,10 @@ def create_access_token(user: User, response: Response | None = None) -> str:
         "name": user.name,
         "logged_in_at": datetime.now(UTC).timestamp(),
         "role": user.role,
+        "active": user.active,
+        "epoch": user.security_epoch,
+        "b_date": user.b_date.isoformat() if user.b_date else None,
+        "created_at": user.created_at.timestamp(),
     }
     return create_token(
         token_type=ACCESS_TOKEN_TYPE,
@@ -67,6 +86,8 @@ def create_access_token(user: User, response: Response | None = None) -> str:
 def create_refresh_token(user: User, response: Response | None = None):
     jwt_payload = {
         "sub": user.id,
+        "jti": str(uuid.uuid4()),
+        "epoch": user.security_epoch,
     }
     return create_token(
         token_type=REFRESH_TOKEN_TYPE,
@@ -83,8 +104,9 @@ def get_token_of_type(token_type: str):
         request: Request,
         token: str | None = Depends(oauth2_scheme),
     ):
-        if not token:
-            token = request.cookies.get(token_type)
+        with timed("auth_token"):
+            if not token:
+                token = request.cookies.get(token_type)
         return token
 
     return get_token
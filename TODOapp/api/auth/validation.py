@@ -1,10 +1,21 @@
 from typing import Annotated
 
 from core.config import settings
-from core.crud.user import get_user_by_id, get_user_by_username
+from core.crud.api_key import get_active_api_key_by_digest
+from core.crud.cache import api_key_cache, epoch_cache, user_cache
+from core.crud.user import (
+    get_user_by_id,
+    get_user_by_username,
+    get_user_security_epoch,
+    replace_password_hash,
+)
 from core.models import User, db_helper
-from core.utils.jwt import check_password, decode_jwt
-from fastapi import Depends
+from core.utils.api_key import api_key_digest
+from core.utils.jwt import check_password_async, decode_jwt_cached, hash_password_async
+from core.utils.password_hashers import password_needs_rehash
+from core.utils.revocation import revocation_list
+from core.utils.timing import timed
+from fastapi import BackgroundTasks, Depends
 from jwt import InvalidTokenError
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -19,6 +30,7 @@ from .utils import (
     ACCESS_TOKEN_TYPE,
     REFRESH_TOKEN_TYPE,
     TOKEN_TYPE_FIELD,
+    api_key_header,
     get_token_of_type,
 )
 
@@ -37,21 +49,86 @@ async def get_user_from_payload(
     payload: dict,
 ) -> UserSchmExtended:
     user_id: int = payload["sub"]
-    if user := await get_user_by_id(session, user_id):
-        if not user.active:
-            raise inactive_user_exception
-        return UserSchmExtended.model_validate(user)
-    raise token_invalid_exc
+    user_snapshot: UserSchmExtended | None = user_cache.get(user_id)
+    if user_snapshot is None:
+        with timed("auth_user_fetch"):
+            user = await get_user_by_id(session, user_id)
+        if not user:
+            raise token_invalid_exc
+        with timed("auth_validate"):
+            user_snapshot = UserSchmExtended.model_validate(user)
+        user_cache.set(user_id, user_snapshot)
+    if not user_snapshot.active:
+        raise inactive_user_exception
+    return user_snapshot
+
+
+async def get_security_epoch(session: AsyncSession, user_id: int) -> int | None:
+    epoch: int | None = epoch_cache.get(user_id)
+    if epoch is None:
+        with timed("auth_user_fetch"):
+            epoch = await get_user_security_epoch(session, user_id)
+        if epoch is not None:
+            epoch_cache.set(user_id, epoch)
+    return epoch
+
+
+async def get_user_from_claims(
+    session: AsyncSession,
+    payload: dict,
+) -> UserSchmExtended:
+    if await get_security_epoch(session, payload["sub"]) != payload["epoch"]:
+        raise token_invalid_exc
+    if not payload.get("active"):
+        raise inactive_user_exception
+    with timed("auth_validate"):
+        return UserSchmExtended.model_validate(
+            {
+                "id": payload["sub"],
+                "username": payload["username"],
+                "name": payload.get("name"),
+                "b_date": payload.get("b_date"),
+                "active": payload["active"],
+                "role": payload["role"],
+                "created_at": payload["created_at"],
+                "last_update_at": None,
+                "security_epoch": payload["epoch"],
+            }
+        )
+
+
+async def get_user_from_api_key(
+    session: AsyncSession,
+    api_key: str,
+) -> UserSchmExtended:
+    digest = api_key_digest(api_key)
+    user_id: int | None = api_key_cache.get(digest)
+    if user_id is None:
+        with timed("auth_user_fetch"):
+            key = await get_active_api_key_by_digest(session, digest)
+        if not key:
+            raise token_invalid_exc
+        user_id = key.user_id
+        api_key_cache.set(
+            digest,
+            user_id,
+            expire_at=key.expires_at.timestamp() if key.expires_at else None,
+        )
+    return await get_user_from_payload(session, {"sub": user_id})
 
 
 def get_currant_token_payload_of_token_type(
     token_type: str,
+    optional: bool = False,
 ):
     def get_currant_token_payload(
         token: Annotated[str, Depends(get_token_of_type(token_type=token_type))],
-    ) -> dict:
+    ) -> dict | None:
+        if not token and optional:
+            return None
         try:
-            payload = decode_jwt(token)
+            with timed("auth_decode"):
+                payload = decode_jwt_cached(token)
         except InvalidTokenError as err:
             raise token_invalid_exc from err
         return payload
@@ -62,23 +139,54 @@ def get_currant_token_payload_of_token_type(
 def get_auth_user_from_token_of_type(
     token_type: str,
     user_role_to_check: str | None = None,
+    fresh_user: bool = False,
 ):
     async def get_auth_user_from_token(
         session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
         payload: Annotated[
-            dict,
-            Depends(get_currant_token_payload_of_token_type(token_type=token_type)),
+            dict | None,
+            Depends(
+                get_currant_token_payload_of_token_type(
+                    token_type=token_type,
+                    optional=token_type == ACCESS_TOKEN_TYPE,
+                )
+            ),
         ],
+        api_key: Annotated[str | None, Depends(api_key_header)] = None,
     ) -> UserSchmExtended:
+        if payload is None:
+            if not api_key:
+                raise token_invalid_exc
+            user = await get_user_from_api_key(session, api_key)
+            if user_role_to_check and user.role != user_role_to_check:
+                raise no_priv_except
+            return user
         validate_token_type(payload, token_type)
+        if revocation_list.is_revoked(payload.get("jti")):
+            raise token_invalid_exc
         if user_role_to_check and payload.get("role") != user_role_to_check:
             raise no_priv_except
-        return await get_user_from_payload(session, payload)
+        if not (settings.api.auth_jwt.stateless and "epoch" in payload):
+            return await get_user_from_payload(session, payload)
+        if token_type == ACCESS_TOKEN_TYPE and not fresh_user:
+            return await get_user_from_claims(session, payload)
+        user = await get_user_from_payload(session, payload)
+        if user.security_epoch != payload["epoch"]:
+            raise token_invalid_exc
+        return user
 
     return get_auth_user_from_token
 
 
+get_currant_access_token_payload = get_currant_token_payload_of_token_type(
+    ACCESS_TOKEN_TYPE,
+)
+
 get_currant_auth_user = get_auth_user_from_token_of_type(ACCESS_TOKEN_TYPE)
+get_currant_fresh_auth_user = get_auth_user_from_token_of_type(
+    token_type=ACCESS_TOKEN_TYPE,
+    fresh_user=True,
+)
 get_currant_auth_user_for_refresh = get_auth_user_from_token_of_type(REFRESH_TOKEN_TYPE)
 
 get_currant_auth_user_with_admin = get_auth_user_from_token_of_type(
@@ -87,10 +195,17 @@ get_currant_auth_user_with_admin = get_auth_user_from_token_of_type(
 )
 
 
+async def rehash_user_password(user_id: int, old_hash: str, password: str) -> None:
+    new_hash = (await hash_password_async(password)).decode()
+    async with db_helper.session_factory() as session:
+        await replace_password_hash(session, user_id, old_hash, new_hash)
+
+
 async def get_auth_user_from_db(
     session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
     username: str,
     password: str,
+    background_tasks: BackgroundTasks | None = None,
 ) -> User:
     user: User | None = await get_user_by_username(
         session=session,
@@ -100,7 +215,7 @@ async def get_auth_user_from_db(
     if not user:
         raise unauth_exc
 
-    if not check_password(
+    if not await check_password_async(
         password=password,
         hashed_password=user.password.encode(),
     ):
@@ -109,4 +224,12 @@ async def get_auth_user_from_db(
     if not user.active:
         raise inactive_user_exception
 
+    if background_tasks is not None and password_needs_rehash(user.password):
+        background_tasks.add_task(
+            rehash_user_password,
+            user.id,
+            user.password,
+            password,
+        )
+
     return user
@@ -1,3 +1,4 @@
+from collections.abc import AsyncGenerator
 from typing import Annotated
 
 from core.crud import task as task_crud
@@ -5,14 +6,19 @@ from core.crud import user as user_crud
 from core.models import Task as TaskModel
 from core.models import User as UserModel
 from core.models import db_helper
-from fastapi import Depends, Path
-from sqlalchemy.ext.asyncio import AsyncSession
+from core.utils.jwt import decode_jwt_cached
+from fastapi import Depends, Path, Request, Response
+from jwt import InvalidTokenError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from .auth.utils import TOKEN_TYPE_FIELD, WRITE_MARKER_TYPE, create_write_marker
+from .auth.validation import get_currant_auth_user
 from .http_exceptions import (
     rendering_exception_with_param,
     task_id_exc_templ,
     user_id_exc_templ,
 )
+from .schemas import UserSchmExtended
 
 
 async def get_user(
@@ -35,3 +41,57 @@ async def get_task(
         return task
 
     raise rendering_exception_with_param(task_id_exc_templ, str(task_id))
+
+
+def has_recent_write(request: Request, user_id: int) -> bool:
+    token = request.cookies.get(WRITE_MARKER_TYPE)
+    if not token:
+        return False
+    try:
+        payload = decode_jwt_cached(token)
+    except InvalidTokenError:
+        return False
+    return (
+        payload.get(TOKEN_TYPE_FIELD) == WRITE_MARKER_TYPE
+        and payload.get("sub") == user_id
+    )
+
+
+def _replica_session_factory(
+    request: Request,
+    user_id: int,
+) -> async_sessionmaker[AsyncSession] | None:
+    if has_recent_write(request, user_id):
+        return None
+    return db_helper.replica_session_factory()
+
+
+async def read_session_getter(
+    session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
+    user: Annotated[UserSchmExtended, Depends(get_currant_auth_user)],
+    request: Request,
+) -> AsyncGenerator[AsyncSession, None]:
+    replica_session_factory = _replica_session_factory(request, user.id)
+    if replica_session_factory is None:
+        yield session
+        return
+    async with replica_session_factory() as replica_session:
+        replica_session.info["replica"] = True
+        yield replica_session
+
+
+async def write_session_getter(
+    session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
+    user: Annotated[UserSchmExtended, Depends(get_currant_auth_user)],
+    response: Response,
+) -> AsyncSession:
+    if db_helper.replica_session_factories:
+        create_write_marker(user.id, response)
+    return session
+
+
+async def stream_session_factory(
+    user: Annotated[UserSchmExtended, Depends(get_currant_auth_user)],
+    request: Request,
+) -> async_sessionmaker[AsyncSession]:
+    return _replica_session_factory(request, user.id) or db_helper.session_factory
@@ -0,0 +1,35 @@
+import hashlib
+from datetime import datetime
+
+from fastapi import Response, status
+
+
+def make_etag(ids: str | None, updated_at: datetime | None) -> str:
+    version = updated_at.isoformat() if updated_at is not None else ""
+    return f'"{hashlib.sha256(f"{ids or ''}|{version}".encode()).hexdigest()[:32]}"'
+
+
+def record_etag(
+    record_id: int,
+    created_at: datetime,
+    last_update_at: datetime | None,
+) -> str:
+    return make_etag(str(record_id), max(created_at, last_update_at or created_at))
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+def not_modified(etag: str, headers: dict[str, str] | None = None) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={**(headers or {}), "ETag": etag},
+    )
@@ -1,6 +1,8 @@
 from string import Template
 
-from fastapi import HTTPException, status
+from fastapi import HTTPException, Request, status
+from fastapi.exception_handlers import http_exception_handler
+from fastapi.responses import Response
 
 no_priv_except = HTTPException(
     status_code=status.HTTP_403_FORBIDDEN,
@@ -43,21 +45,57 @@ task_id_exc_templ = HTTPException(
     detail="Task with id=[$parameter] not found",
 )
 
+api_key_id_exc_templ = HTTPException(
+    status_code=status.HTTP_404_NOT_FOUND,
+    detail="API key with id=[$parameter] not found",
+)
+
 username_already_exist_exc_templ = HTTPException(
     status_code=status.HTTP_409_CONFLICT,
     detail="Username '$parameter' already exist",
 )
 
+invalid_cursor_exc = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST,
+    detail="Invalid cursor",
+)
+
 role_not_exist_exc_templ = HTTPException(
     status_code=status.HTTP_400_BAD_REQUEST,
     detail="Role '$parameter' not exist",
 )
 
 
-def rendering_exception_with_param(exc: HTTPException, parameter: str):
+password_pool_busy_exc = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail="Server is busy, try again later",
+    headers={"Retry-After": "1"},
+)
+
+
+login_throttled_exc_templ = HTTPException(
+    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+    detail="Too many login attempts, try again in $parameter seconds",
+)
+
+
+def rendering_exception_with_param(exc: HTTPException, parameter: str) -> HTTPException:
     template = Template(exc.detail)
     rendered_detail = template.substitute(parameter=parameter)
     return HTTPException(
         status_code=exc.status_code,
         detail=rendered_detail,
     )
+
+
+async def password_pool_busy_handler(request: Request, _exc: Exception) -> Response:
+    return await http_exception_handler(request, password_pool_busy_exc)
+
+
+async def login_throttled_handler(request: Request, exc: Exception) -> Response:
+    retry_after = str(getattr(exc, "retry_after", 1))
+    rendered_exc = rendering_exception_with_param(
+        login_throttled_exc_templ, retry_after
+    )
+    rendered_exc.headers = {"Retry-After": retry_after}
+    return await http_exception_handler(request, rendered_exc)
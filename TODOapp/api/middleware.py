@@ -0,0 +1,37 @@
+from collections.abc import Awaitable, Callable
+
+from core.utils.pool_metrics import request_scope
+from core.utils.timing import (
+    request_timings,
+    reset_request_timings,
+    server_timing_value,
+    start_request_timings,
+)
+from fastapi import Request, Response
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class RequestScopeMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        token = request_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_scope.reset(token)
+
+
+async def server_timing_middleware(
+    request: Request,
+    call_next: Callable[[Request], Awaitable[Response]],
+) -> Response:
+    token = start_request_timings()
+    try:
+        response = await call_next(request)
+        if timings := request_timings():
+            response.headers["Server-Timing"] = server_timing_value(timings)
+        return response
+    finally:
+        reset_request_timings(token)
@@ -0,0 +1,90 @@
+import base64
+import binascii
+import json
+from collections.abc import Callable, Sequence
+from typing import Annotated, Any, TypeVar
+
+from core.config import settings
+from fastapi import Query, Request, Response
+
+from .http_exceptions import invalid_cursor_exc
+
+T = TypeVar("T")
+
+
+def encode_cursor(key: tuple[float, ...]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+
+def _load_cursor(cursor: str) -> Any:
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as err:
+        raise invalid_cursor_exc from err
+
+
+def decode_cursor(cursor: str, size: int) -> tuple[int, ...]:
+    key = _load_cursor(cursor)
+    if (
+        not isinstance(key, list)
+        or len(key) != size
+        or not all(type(value) is int for value in key)
+    ):
+        raise invalid_cursor_exc
+    return tuple(key)
+
+
+def decode_ranked_cursor(cursor: str) -> tuple[float, int]:
+    key = _load_cursor(cursor)
+    if (
+        not isinstance(key, list)
+        or len(key) != 2
+        or type(key[0]) not in (int, float)
+        or type(key[1]) is not int
+    ):
+        raise invalid_cursor_exc
+    return float(key[0]), key[1]
+
+
+class Page:
+    def __init__(
+        self,
+        request: Request,
+        response: Response,
+        limit: Annotated[int | None, Query(ge=1)] = None,
+        cursor: str | None = None,
+    ):
+        self.request = request
+        self.response = response
+        self.limit = min(
+            limit or settings.api.pagination.default_limit,
+            settings.api.pagination.max_limit,
+        )
+        self.cursor = cursor
+
+    @property
+    def fetch_limit(self) -> int:
+        return self.limit + 1
+
+    def after(self, size: int) -> tuple[int, ...] | None:
+        if self.cursor is None:
+            return None
+        return decode_cursor(self.cursor, size)
+
+    def ranked_after(self) -> tuple[float, int] | None:
+        if self.cursor is None:
+            return None
+        return decode_ranked_cursor(self.cursor)
+
+    def trim(
+        self, items: Sequence[T], key: Callable[[T], tuple[float, ...]]
+    ) -> Sequence[T]:
+        if len(items) <= self.limit:
+            return items
+        items = items[: self.limit]
+        next_url = self.request.url.include_query_params(
+            limit=self.limit,
+            cursor=encode_cursor(key(items[-1])),
+        )
+        self.response.headers["Link"] = f'<{next_url}>; rel="next"'
+        return items
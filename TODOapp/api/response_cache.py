@@ -0,0 +1,70 @@
+from collections.abc import Hashable
+from typing import Any
+
+from core.config import settings
+from core.utils import metrics
+from core.utils.cache import TTLCache
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+from api.schemas import TaskSchm
+
+CACHED_HEADERS = ("Link", "ETag")
+
+
+def response_cache_key(user_id: int, request: Request) -> Hashable:
+    return (
+        user_id,
+        request.url.path,
+        tuple(sorted(request.query_params.multi_items())),
+    )
+
+
+class ResponseCache:
+    def __init__(self, cache: TTLCache, adapter: TypeAdapter[Any], name: str):
+        self._cache = cache
+        self._adapter = adapter
+        self._hits = metrics.counter(f"{name}_hits_total")
+        self._misses = metrics.counter(f"{name}_misses_total")
+        self._size = metrics.gauge(f"{name}_size")
+
+    def get(self, key: Hashable, version: int) -> Response | None:
+        entry = self._cache.get(key)
+        if entry is None or entry[0] != version:
+            self._misses.inc()
+            return None
+        self._hits.inc()
+        _version, body, headers = entry
+        return Response(body, media_type="application/json", headers=headers)
+
+    def put(
+        self,
+        key: Hashable,
+        version: int,
+        content: Any,
+        response: Response,
+        store: bool = True,
+    ) -> Response:
+        body = self._adapter.dump_json(
+            self._adapter.validate_python(content, from_attributes=True)
+        )
+        headers = {
+            name: response.headers[name]
+            for name in CACHED_HEADERS
+            if name in response.headers
+        }
+        if store:
+            self._cache.set(key, (version, body, headers))
+            self._size.set(len(self._cache))
+        return Response(body, media_type="application/json", headers=headers)
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self._size.set(0)
+
+
+task_response_cache = ResponseCache(
+    TTLCache.from_cfg(settings.api.task.response_cache),
+    TypeAdapter(list[TaskSchm]),
+    "task_response_cache",
+)
@@ -10,8 +10,13 @@ __all__ = (
     "SearchTaskSchm",
     "UserSchmExtended",
     "TokenInfoSchm",
+    "RevokeTokenSchm",
+    "CreateApiKeySchm",
+    "ApiKeySchm",
+    "ApiKeyCreatedSchm",
 )
 
+from .api_key import ApiKeyCreatedSchm, ApiKeySchm, CreateApiKeySchm
 from .task import (
     ChangeTaskUserSchm,
     CreateTaskSchm,
@@ -19,7 +24,7 @@ from .task import (
     TaskSchm,
     UpdateTaskSchm,
 )
-from .token import TokenInfoSchm
+from .token import RevokeTokenSchm, TokenInfoSchm
 from .user import (
     CreateAdminUserSchm,
     CreateUserSchm,
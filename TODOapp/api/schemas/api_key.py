@@ -0,0 +1,24 @@
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class CreateApiKeySchm(BaseModel):
+    name: str = Field(max_length=70)
+    expires_at: datetime | None = None
+
+
+class ApiKeySchm(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: str
+    prefix: str
+    user_id: int
+    created_at: datetime
+    expires_at: datetime | None
+    revoked: bool
+
+
+class ApiKeyCreatedSchm(ApiKeySchm):
+    key: str
@@ -1,12 +1,21 @@
 from datetime import datetime
 
-from pydantic import BaseModel, ConfigDict
+from core.utils.task_status import TASK_STATUS_CODES
+from pydantic import BaseModel, ConfigDict, field_validator
+
+from api.http_exceptions import rendering_exception_with_param, status_exception_templ
 
 
 class BaseTask(BaseModel):
     pass
 
 
+def validate_task_status(status: str | None) -> str | None:
+    if status is not None and status not in TASK_STATUS_CODES:
+        raise rendering_exception_with_param(status_exception_templ, status)
+    return status
+
+
 class CreateTaskSchm(BaseTask):
     name: str
     description: str | None = None
@@ -23,6 +32,8 @@ class UpdateTaskSchm(BaseTask):
     scheduled_hours: int | None = None
     status: str | None = None
 
+    _check_status = field_validator("status")(validate_task_status)
+
 
 class ChangeTaskUserSchm(BaseTask):
     user_id: int
@@ -33,8 +44,14 @@ class SearchTaskSchm(BaseTask):
     name: str | None = None
     start_at: datetime | None = None
     end_at: datetime | None = None
+    created_after: datetime | None = None
+    created_before: datetime | None = None
     user_id: int | None = None
     status: str | None = None
+    contains: str | None = None
+    query: str | None = None
+
+    _check_status = field_validator("status")(validate_task_status)
 
 
 class TaskSchm(CreateTaskSchm):
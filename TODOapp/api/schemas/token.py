@@ -1,6 +1,13 @@
+from datetime import datetime
+
 from pydantic import BaseModel
 
 
 class TokenInfoSchm(BaseModel):
     access_token: str
     refresh_token: str | None = None
+
+
+class RevokeTokenSchm(BaseModel):
+    jti: str
+    expires_at: datetime | None = None
@@ -32,6 +32,7 @@ class UserSchmExtended(UserSchm):
     created_at: datetime
     last_update_at: datetime | None
     role: str
+    security_epoch: int = 0
 
 
 class UserPassChangeSchm(BaseModel):
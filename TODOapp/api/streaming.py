@@ -0,0 +1,30 @@
+from collections.abc import AsyncIterator, Callable
+from typing import Any
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def wants_ndjson(accept: str | None) -> bool:
+    if not accept:
+        return False
+    return any(
+        media_range.split(";")[0].strip().lower() == NDJSON_MEDIA_TYPE
+        for media_range in accept.split(",")
+    )
+
+
+def ndjson_response(
+    session_factory: async_sessionmaker[AsyncSession],
+    rows: Callable[[AsyncSession], AsyncIterator[Any]],
+    schema: type[BaseModel],
+) -> StreamingResponse:
+    async def body() -> AsyncIterator[bytes]:
+        async with session_factory() as session:
+            async for row in rows(session):
+                yield schema.model_validate(row).model_dump_json().encode() + b"\n"
+
+    return StreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE)
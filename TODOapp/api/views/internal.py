@@ -0,0 +1,20 @@
+from typing import Annotated, Any
+
+from core.config import settings
+from core.utils import metrics
+from fastapi import APIRouter, Depends
+
+from api.auth.validation import get_currant_auth_user_with_admin
+from api.schemas import UserSchmExtended
+
+router = APIRouter()
+
+
+@router.get(
+    "/metrics/",
+    description=f"Authentication and {settings.roles.admin} role is required",
+)
+async def get_metrics(
+    _admin: Annotated[UserSchmExtended, Depends(get_currant_auth_user_with_admin)],
+) -> dict[str, dict[str, Any]]:
+    return metrics.snapshot()
@@ -3,19 +3,25 @@ from typing import Annotated
 
 from core.config import settings
 from core.crud import task as crud
-from core.models import Task, db_helper
+from core.crud.cache import task_versions
+from core.models import db_helper
 from core.models.user import User as UserModel
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from core.utils.task_status import TASK_STATUS_CODES
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from api import deps
 from api.auth.validation import get_currant_auth_user, get_currant_auth_user_with_admin
+from api.etag import etag_matches, make_etag, not_modified
 from api.http_exceptions import (
     no_priv_except,
     rendering_exception_with_param,
-    status_exception_templ,
     task_id_exc_templ,
+    user_id_exc_templ,
 )
+from api.pagination import Page
+from api.response_cache import response_cache_key, task_response_cache
 from api.schemas import (
     CreateTaskSchm,
     SearchTaskSchm,
@@ -23,54 +29,144 @@ from api.schemas import (
     UpdateTaskSchm,
     UserSchmExtended,
 )
+from api.streaming import NDJSON_MEDIA_TYPE, ndjson_response, wants_ndjson
 
 router = APIRouter()
 
 
+async def task_mutation_exc(session: AsyncSession, task_id: int) -> HTTPException:
+    if await crud.task_exists(session, task_id):
+        return no_priv_except
+    return rendering_exception_with_param(task_id_exc_templ, str(task_id))
+
+
 @router.get(
     "/all/",
     response_model=Sequence[TaskSchm],
-    description=f"Authentication and {settings.roles.admin} role is required",
+    description=f"Authentication and {settings.roles.admin} role is required"
+    f"<br>Send 'Accept: {NDJSON_MEDIA_TYPE}' to stream all tasks as NDJSON",
 )
 async def get_all_tasks(
-    session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
+    session: Annotated[AsyncSession, Depends(deps.read_session_getter)],
     _admin: Annotated[UserSchmExtended, Depends(get_currant_auth_user_with_admin)],
+    page: Annotated[Page, Depends()],
+    stream_session_factory: Annotated[
+        async_sessionmaker[AsyncSession],
+        Depends(deps.stream_session_factory),
+    ],
+    accept: Annotated[str | None, Header()] = None,
+    include_archived: bool = False,
 ):
-    return await crud.get_all_tasks(session)
+    if wants_ndjson(accept):
+        return ndjson_response(
+            stream_session_factory,
+            lambda stream_session: crud.stream_all_tasks(
+                stream_session,
+                settings.api.streaming.fetch_size,
+                include_archived,
+            ),
+            TaskSchm,
+        )
+    tasks = await crud.get_all_tasks(
+        session,
+        page.fetch_limit,
+        page.after(2),
+        include_archived,
+    )
+    return page.trim(tasks, lambda task: (task.user_id, task.id))
 
 
 @router.get(
     "/search/",
     response_model=Sequence[TaskSchm],
-    description="Authentication is required",
+    description="Authentication is required"
+    "<br>Use 'contains' for case-insensitive substring search in name and description"
+    "<br>Use 'query' for full-text search, results are ordered by rank"
+    "<br>Use 'created_after' and 'created_before' to narrow the search"
+    " to recent tasks",
 )
 async def search_task_by_parameters(
-    session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
+    session: Annotated[AsyncSession, Depends(deps.read_session_getter)],
     search_task: Annotated[SearchTaskSchm, Depends()],
-    _user: Annotated[UserSchmExtended, Depends(get_currant_auth_user)],
+    user: Annotated[UserSchmExtended, Depends(get_currant_auth_user)],
+    page: Annotated[Page, Depends()],
+    include_archived: bool = False,
 ):
-    if (
-        search_task.status
-        and search_task.status not in settings.tstat.model_dump().values()
-    ):
-        raise rendering_exception_with_param(
-            status_exception_templ,
-            search_task.status,
+    cache_key = response_cache_key(user.id, page.request)
+    version = task_versions.get()
+    if cached := task_response_cache.get(cache_key, version):
+        return cached
+    if search_task.query:
+        ranked_tasks = await crud.get_ranked_tasks(
+            session,
+            search_task,
+            page.fetch_limit,
+            page.ranked_after(),
+            include_archived,
+        )
+        found = [
+            task
+            for task, _rank in page.trim(
+                ranked_tasks,
+                lambda ranked_task: (-ranked_task[1], ranked_task[0].id),
+            )
+        ]
+    else:
+        tasks = await crud.get_tasks_by_some_statement(
+            session,
+            search_task,
+            page.fetch_limit,
+            page.after(1),
+            include_archived,
         )
-    return await crud.get_tasks_by_some_statement(session, search_task)
+        found = list(page.trim(tasks or [], lambda task: (task.id,)))
+    return task_response_cache.put(
+        cache_key,
+        version,
+        found,
+        page.response,
+        store=not session.info.get("replica"),
+    )
 
 
 @router.get(
     "/by-user/{user_id}/",
     response_model=Sequence[TaskSchm],
-    description=f"Authentication and {settings.roles.admin} role is required",
+    description=f"Authentication and {settings.roles.admin} role is required"
+    f"<br>Send 'Accept: {NDJSON_MEDIA_TYPE}' to stream all user`s tasks as NDJSON",
 )
 async def get_task_by_user_id(
-    session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
+    session: Annotated[AsyncSession, Depends(deps.read_session_getter)],
     user: Annotated[UserModel, Depends(deps.get_user)],
     _admin: Annotated[UserSchmExtended, Depends(get_currant_auth_user_with_admin)],
+    page: Annotated[Page, Depends()],
+    stream_session_factory: Annotated[
+        async_sessionmaker[AsyncSession],
+        Depends(deps.stream_session_factory),
+    ],
+    accept: Annotated[str | None, Header()] = None,
+    include_archived: bool = False,
 ):
-    return await crud.get_user_all_tasks(session, UserSchmExtended.model_validate(user))
+    if wants_ndjson(accept):
+        user_id = user.id
+        return ndjson_response(
+            stream_session_factory,
+            lambda stream_session: crud.stream_user_all_tasks(
+                stream_session,
+                user_id,
+                settings.api.streaming.fetch_size,
+                include_archived,
+            ),
+            TaskSchm,
+        )
+    tasks = await crud.get_user_all_tasks(
+        session,
+        UserSchmExtended.model_validate(user),
+        page.fetch_limit,
+        page.after(2),
+        include_archived,
+    )
+    return page.trim(tasks, lambda task: (task.user_id, task.id))
 
 
 @router.get(
@@ -79,10 +175,45 @@ async def get_task_by_user_id(
     description="Authentication is required",
 )
 async def get_user_all_tasks(
-    session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
+    session: Annotated[AsyncSession, Depends(deps.read_session_getter)],
     user: Annotated[UserSchmExtended, Depends(get_currant_auth_user)],
+    page: Annotated[Page, Depends()],
+    include_archived: bool = False,
+    if_none_match: Annotated[str | None, Header()] = None,
 ):
-    return await crud.get_user_all_tasks(session, user)
+    cache_key = response_cache_key(user.id, page.request)
+    version = task_versions.get(user.id)
+    if cached := task_response_cache.get(cache_key, version):
+        if etag_matches(if_none_match, cached.headers["ETag"]):
+            return not_modified(cached.headers["ETag"])
+        return cached
+    after = page.after(2)
+    etag = make_etag(
+        *await crud.get_user_tasks_fingerprint(
+            session,
+            user,
+            page.fetch_limit,
+            after,
+            include_archived,
+        )
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    tasks = await crud.get_user_all_tasks(
+        session,
+        user,
+        page.fetch_limit,
+        after,
+        include_archived,
+    )
+    page.response.headers["ETag"] = etag
+    return task_response_cache.put(
+        cache_key,
+        version,
+        page.trim(tasks, lambda task: (task.user_id, task.id)),
+        page.response,
+        store=not session.info.get("replica"),
+    )
 
 
 @router.get(
@@ -91,9 +222,22 @@ async def get_user_all_tasks(
     description=f"Authentication and {settings.roles.admin} role is required",
 )
 async def get_task_by_task_id(
-    task: Annotated[Task, Depends(deps.get_task)],
+    session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
+    task_id: int,
+    response: Response,
     _admin: Annotated[UserSchmExtended, Depends(get_currant_auth_user_with_admin)],
+    if_none_match: Annotated[str | None, Header()] = None,
 ):
+    ids, updated_at = await crud.get_task_fingerprint(session, task_id)
+    if ids is None:
+        raise rendering_exception_with_param(task_id_exc_templ, str(task_id))
+    etag = make_etag(ids, updated_at)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    task = await crud.get_task_by_id(session, task_id)
+    if task is None:
+        raise rendering_exception_with_param(task_id_exc_templ, str(task_id))
+    response.headers["ETag"] = etag
     return task
 
 
@@ -104,7 +248,7 @@ async def get_task_by_task_id(
     description="Authentication is required",
 )
 async def create_task(
-    session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
+    session: Annotated[AsyncSession, Depends(deps.write_session_getter)],
     task_input: CreateTaskSchm,
     user: Annotated[UserSchmExtended, Depends(get_currant_auth_user)],
 ):
@@ -118,21 +262,18 @@ async def create_task(
     f" {settings.roles.admin} role is required for other tasks",
 )
 async def change_task_owner(
-    session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
+    session: Annotated[AsyncSession, Depends(deps.write_session_getter)],
     task_id: int,
     user: Annotated[UserSchmExtended, Depends(get_currant_auth_user)],
-    new_user: Annotated[UserModel, Depends(deps.get_user)],
+    user_id: int,
 ):
-    task_to_update: Task | None = await crud.get_task_by_id(session, task_id)
-    if task_to_update is None:
-        raise rendering_exception_with_param(task_id_exc_templ, str(task_id))
-    if task_to_update.user_id == user.id or user.role == settings.roles.admin:
-        return await crud.change_task_user_by_user(
-            session=session,
-            task_to_update=task_to_update,
-            new_user=new_user,
-        )
-    raise no_priv_except
+    try:
+        updated_task = await crud.change_task_owner(session, task_id, user_id, user)
+    except IntegrityError as err:
+        raise rendering_exception_with_param(user_id_exc_templ, str(user_id)) from err
+    if updated_task is None:
+        raise await task_mutation_exc(session, task_id)
+    return updated_task
 
 
 @router.patch(
@@ -140,28 +281,18 @@ async def change_task_owner(
     response_model=TaskSchm,
     description=f"Authentication is required for user`s tasks and"
     f" {settings.roles.admin} role is required for other tasks"
-    f"<br>Use for status: {", ".join(settings.tstat.model_dump().values())}",
+    f"<br>Use for status: {", ".join(TASK_STATUS_CODES)}",
 )
 async def update_task(
-    session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
+    session: Annotated[AsyncSession, Depends(deps.write_session_getter)],
     task_input: UpdateTaskSchm,
     task_id: int,
     user: Annotated[UserSchmExtended, Depends(get_currant_auth_user)],
 ):
-    if (
-        task_input.status
-        and task_input.status not in settings.tstat.model_dump().values()
-    ):
-        raise rendering_exception_with_param(
-            status_exception_templ,
-            task_input.status,
-        )
-    task_to_update: Task | None = await crud.get_task_by_id(session, task_id)
-    if task_to_update is None:
-        raise rendering_exception_with_param(task_id_exc_templ, str(task_id))
-    if task_to_update.user_id == user.id or user.role == settings.roles.admin:
-        return await crud.update_task(session, task_to_update, task_input)
-    raise no_priv_except
+    updated_task = await crud.update_task(session, task_id, task_input, user)
+    if updated_task is None:
+        raise await task_mutation_exc(session, task_id)
+    return updated_task
 
 
 @router.delete(
@@ -171,14 +302,9 @@ async def update_task(
     f" {settings.roles.admin} role is required for other tasks",
 )
 async def delete_task(
-    session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
+    session: Annotated[AsyncSession, Depends(deps.write_session_getter)],
     task_id: int,
     user: Annotated[UserSchmExtended, Depends(get_currant_auth_user)],
 ):
-    task_to_delete: Task | None = await crud.get_task_by_id(session, task_id)
-    if task_to_delete is None:
-        raise rendering_exception_with_param(task_id_exc_templ, str(task_id))
-    if task_to_delete.user_id == user.id or user.role == settings.roles.admin:
-        await crud.delete_task(session, task_to_delete)
-        return
-    raise no_priv_except
+    if not await crud.delete_task(session, task_id, user):
+        raise await task_mutation_exc(session, task_id)
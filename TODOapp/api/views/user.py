@@ -3,13 +3,20 @@ from typing import Annotated
 
 from core.config import settings
 from core.crud import user
+from core.crud.cache import missing_username_cache, username_cache
 from core.models import User as UserModel
 from core.models import db_helper
-from fastapi import APIRouter, Depends, Path, status
+from fastapi import APIRouter, Depends, Header, Path, Response, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api import deps
-from api.auth.validation import get_currant_auth_user, get_currant_auth_user_with_admin
+from api.auth.validation import (
+    get_currant_auth_user,
+    get_currant_auth_user_with_admin,
+    get_currant_fresh_auth_user,
+)
+from api.etag import etag_matches, not_modified, record_etag
 from api.http_exceptions import (
     no_priv_except,
     rendering_exception_with_param,
@@ -18,11 +25,41 @@ from api.http_exceptions import (
     user_id_exc_templ,
     username_already_exist_exc_templ,
 )
+from api.pagination import Page
 from api.schemas import CreateUserSchm, UpdateUserSchm, UserSchm, UserSchmExtended
 from api.schemas.user import UserPassChangeSchm, UserRoleChangeSchm
 
 router = APIRouter()
 
+UNIQUE_VIOLATION = "23505"
+USERNAME_UNIQUE_CONSTRAINT = "users_username_key"
+
+
+def _is_username_conflict(err: IntegrityError) -> bool:
+    if getattr(err.orig, "sqlstate", None) != UNIQUE_VIOLATION:
+        return False
+    cause = err.orig.__cause__ if err.orig is not None else None
+    return getattr(cause, "constraint_name", None) == USERNAME_UNIQUE_CONSTRAINT
+
+
+async def _update_user(
+    session: AsyncSession,
+    user_id: int,
+    user_input: UpdateUserSchm,
+) -> UserModel:
+    try:
+        updated_user = await user.update_user(session, user_id, user_input)
+    except IntegrityError as err:
+        if not _is_username_conflict(err):
+            raise
+        raise rendering_exception_with_param(
+            username_already_exist_exc_templ,
+            str(user_input.username),
+        ) from err
+    if updated_user is None:
+        raise rendering_exception_with_param(user_id_exc_templ, str(user_id))
+    return updated_user
+
 
 @router.get(
     "/profile/",
@@ -31,8 +68,18 @@ router = APIRouter()
     description="Authentication is required",
 )
 async def get_profile(
-    current_user: Annotated[UserSchmExtended, Depends(get_currant_auth_user)],
+    current_user: Annotated[UserSchmExtended, Depends(get_currant_fresh_auth_user)],
+    response: Response,
+    if_none_match: Annotated[str | None, Header()] = None,
 ):
+    etag = record_etag(
+        current_user.id,
+        current_user.created_at,
+        current_user.last_update_at,
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     return current_user
 
 
@@ -40,16 +87,37 @@ async def get_profile(
 async def get_user_by_username(
     session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
     username: str,
+    response: Response,
+    if_none_match: Annotated[str | None, Header()] = None,
 ):
-    user_by_username: UserModel | None = await user.get_user_by_username(
-        session, username
-    )
-    if user_by_username:
-        return user_by_username
-    raise rendering_exception_with_param(
-        user_exception_templ,
-        username,
-    )
+    if missing_username_cache.get(username):
+        raise rendering_exception_with_param(user_exception_templ, username)
+    cached: tuple[UserSchm, str] | None = username_cache.get(username)
+    if cached is None:
+        user_by_username: UserModel | None = await user.get_user_by_username(
+            session, username
+        )
+        if not user_by_username:
+            missing_username_cache.set(username, True)
+            raise rendering_exception_with_param(
+                user_exception_templ,
+                username,
+            )
+        cached = (
+            UserSchm.model_validate(user_by_username),
+            record_etag(
+                user_by_username.id,
+                user_by_username.created_at,
+                user_by_username.last_update_at,
+            ),
+        )
+        username_cache.set(username, cached)
+    user_snapshot, etag = cached
+    cache_headers = {"Cache-Control": settings.api.user.lookup.cache_control}
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, cache_headers)
+    response.headers.update({**cache_headers, "ETag": etag})
+    return user_snapshot
 
 
 @router.get(
@@ -60,11 +128,12 @@ async def get_user_by_username(
     f"Authentication and {settings.roles.admin} role is required for specific user",
 )
 async def get_all_user_and_by_id(
-    session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
+    session: Annotated[AsyncSession, Depends(deps.read_session_getter)],
     current_user: Annotated[
         UserSchmExtended,
         Depends(get_currant_auth_user),
     ],
+    page: Annotated[Page, Depends()],
     user_id: Annotated[int, Path] | None = None,
 ):
     if user_id is not None:
@@ -75,7 +144,8 @@ async def get_all_user_and_by_id(
             return user_by_id
         raise rendering_exception_with_param(user_id_exc_templ, str(user_id))
 
-    return await user.get_all_users(session)
+    users = await user.get_all_users(session, page.fetch_limit, page.after(1))
+    return page.trim(users, lambda user_in_db: (user_in_db.id,))
 
 
 @router.post(
@@ -87,8 +157,8 @@ async def create_user(
     session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
     user_to_create: CreateUserSchm,
 ):
-    if not await user.get_user_by_username(session, user_to_create.username):
-        return await user.create_user(session, user_to_create)
+    if new_user := await user.create_user(session, user_to_create):
+        return new_user
     raise rendering_exception_with_param(
         username_already_exist_exc_templ,
         user_to_create.username,
@@ -103,19 +173,18 @@ async def create_user(
 )
 async def change_your_password(
     new_password: UserPassChangeSchm,
-    session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
+    session: Annotated[AsyncSession, Depends(deps.write_session_getter)],
     current_user: Annotated[
         UserSchmExtended,
         Depends(get_currant_auth_user),
     ],
 ):
-
-    if user_to_update := await user.get_user_by_id(session, current_user.id):
-        return await user.update_password(
-            session=session,
-            user_to_update=user_to_update,
-            password=new_password.password,
-        )
+    if updated_user := await user.update_password(
+        session=session,
+        user_id=current_user.id,
+        password=new_password.password,
+    ):
+        return updated_user
     raise rendering_exception_with_param(user_id_exc_templ, str(current_user.id))
 
 
@@ -127,8 +196,8 @@ async def change_your_password(
 )
 async def change_role(
     new_role: UserRoleChangeSchm,
-    session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
-    user_to_update: Annotated[UserModel, Depends(deps.get_user)],
+    session: Annotated[AsyncSession, Depends(deps.write_session_getter)],
+    user_id: Annotated[int, Path],
     _current_user: Annotated[
         UserSchmExtended,
         Depends(get_currant_auth_user_with_admin),
@@ -141,7 +210,9 @@ async def change_role(
             new_role.role,
         )
 
-    return await user.update_role(session, user_to_update, new_role.role)
+    if updated_user := await user.update_role(session, user_id, new_role.role):
+        return updated_user
+    raise rendering_exception_with_param(user_id_exc_templ, str(user_id))
 
 
 @router.patch(
@@ -151,21 +222,14 @@ async def change_role(
 )
 async def update_user(
     user_input: UpdateUserSchm,
-    session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
-    user_to_update: Annotated[UserModel, Depends(deps.get_user)],
+    session: Annotated[AsyncSession, Depends(deps.write_session_getter)],
+    user_id: Annotated[int, Path],
     _current_user: Annotated[
         UserSchmExtended,
         Depends(get_currant_auth_user_with_admin),
     ],
 ):
-    if (username := user_input.username) and await user.get_user_by_username(
-        session, username
-    ):
-        raise rendering_exception_with_param(
-            username_already_exist_exc_templ,
-            username,
-        )
-    return await user.update_user(session, user_to_update, user_input)
+    return await _update_user(session, user_id, user_input)
 
 
 @router.patch(
@@ -175,23 +239,13 @@ async def update_user(
 )
 async def update_yourself(
     user_input: UpdateUserSchm,
-    session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
+    session: Annotated[AsyncSession, Depends(deps.write_session_getter)],
     current_user: Annotated[
         UserSchmExtended,
         Depends(get_currant_auth_user),
     ],
 ):
-    user_to_update = await user.get_user_by_id(session, current_user.id)
-    if (username := user_input.username) and await user.get_user_by_username(
-        session, username
-    ):
-        raise rendering_exception_with_param(
-            username_already_exist_exc_templ,
-            username,
-        )
-    if user_to_update:
-        return await user.update_user(session, user_to_update, user_input)
-    raise rendering_exception_with_param(user_id_exc_templ, str(current_user.id))
+    return await _update_user(session, current_user.id, user_input)
 
 
 @router.delete(
@@ -200,14 +254,15 @@ async def update_yourself(
     description=f"Authentication and {settings.roles.admin} role is required",
 )
 async def delete_user(
-    session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
-    user_to_delete: Annotated[UserModel, Depends(deps.get_user)],
+    session: Annotated[AsyncSession, Depends(deps.write_session_getter)],
+    user_id: Annotated[int, Path],
     _current_user: Annotated[
         UserSchmExtended,
         Depends(get_currant_auth_user_with_admin),
     ],
 ) -> None:
-    await user.delete_user(session, user_to_delete)
+    if not await user.delete_user(session, user_id):
+        raise rendering_exception_with_param(user_id_exc_templ, str(user_id))
 
 
 @router.delete(
@@ -216,11 +271,8 @@ async def delete_user(
     description="Authentication is required",
 )
 async def delete_yourself(
-    session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
+    session: Annotated[AsyncSession, Depends(deps.write_session_getter)],
     current_user: Annotated[UserSchmExtended, Depends(get_currant_auth_user)],
 ) -> None:
-    user_in_db = await user.get_user_by_id(session, current_user.id)
-    if user_in_db:
-        await user.delete_user(session, user_in_db)
-    else:
+    if not await user.delete_user(session, current_user.id):
         raise rendering_exception_with_param(user_id_exc_templ, str(current_user.id))
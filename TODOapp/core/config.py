@@ -13,6 +13,29 @@ class RunCfg(BaseModel):
     reload: bool = True
 
 
+class TaskPartitionsCfg(BaseModel):
+    enabled: bool = False
+    premake_months: int = 3
+    retention_months: int | None = None
+    drop_detached: bool = False
+    maintenance_interval_seconds: float = 3600
+
+
+class TaskArchiveCfg(BaseModel):
+    enabled: bool = False
+    min_age_days: int = 30
+    batch_size: int = 1000
+    pause_seconds: float = 0.5
+    interval_seconds: float = 3600
+
+
+class InvalidationBusCfg(BaseModel):
+    enabled: bool = True
+    channel: str = "cache_invalidation"
+    reconnect_seconds: float = 1
+    health_check_seconds: float = 10
+
+
 class DBCfg(BaseModel):
     url: PostgresDsn
     echo: bool = False
@@ -20,6 +43,11 @@ class DBCfg(BaseModel):
     pool_size: int = 50
     max_overflow: int = 10
     mode: str
+    replica_urls: list[PostgresDsn] = []
+    read_your_writes_seconds: float = 5
+    task_partitions: TaskPartitionsCfg = TaskPartitionsCfg()
+    task_archive: TaskArchiveCfg = TaskArchiveCfg()
+    invalidation_bus: InvalidationBusCfg = InvalidationBusCfg()
 
 
 class TaskStatuses(BaseModel):
@@ -41,31 +69,111 @@ class AuthCookies(BaseModel):
     path: str = "/"
 
 
+class CacheCfg(BaseModel):
+    enabled: bool = True
+    max_size: int = 10_000
+    ttl_seconds: float | None = None
+
+
+class PasswordHashCfg(BaseModel):
+    algorithm: Literal["bcrypt", "scrypt"] = "bcrypt"
+    bcrypt_rounds: int = 12
+    scrypt_n: int = 2**14
+    scrypt_r: int = 8
+    scrypt_p: int = 1
+
+
+class PasswordPoolCfg(BaseModel):
+    max_workers: int = 4
+    max_queue: int = 64
+
+
+class RevocationCfg(BaseModel):
+    refresh_interval_seconds: float = 5
+    refresh_overlap_seconds: float = 60
+    full_reload_seconds: float = 300
+    filter_capacity: int = 100_000
+    filter_error_rate: float = 0.001
+
+
+class LoginThrottleCfg(BaseModel):
+    enabled: bool = True
+    per_username_limit: int = 10
+    per_username_window_seconds: float = 300
+    per_ip_limit: int = 60
+    per_ip_window_seconds: float = 60
+    max_tracked_keys: int = 100_000
+    max_concurrent_verifications: int = 8
+
+
+class ApiKeyCfg(BaseModel):
+    header_name: str = "X-API-Key"
+    prefix: str = "todo_"
+    cache: CacheCfg = CacheCfg(ttl_seconds=30)
+
+
 class AuthJWT(BaseModel):
     private_key_path: Path = BASE_DIR / "certs" / "jwt-private.pem"
     public_key_path: Path = BASE_DIR / "certs" / "jwt-public.pem"
+    retired_public_key_paths: list[Path] = []
     algorithm: str = "RS256"
+    jwks_path: str = "/.well-known/jwks.json"
     access_token_expire_minutes: int = 60
     refresh_token_expire_days: int = 40
     prefix: str = "/auth"
     tag: str = "Auth"
     cookies: AuthCookies = AuthCookies()
+    token_cache: CacheCfg = CacheCfg()
+    user_cache: CacheCfg = CacheCfg(ttl_seconds=30)
+    stateless: bool = False
+    epoch_cache: CacheCfg = CacheCfg(max_size=100_000, ttl_seconds=30)
+    password_hash: PasswordHashCfg = PasswordHashCfg()
+    password_pool: PasswordPoolCfg = PasswordPoolCfg()
+    revocation: RevocationCfg = RevocationCfg()
+    login_throttle: LoginThrottleCfg = LoginThrottleCfg()
+    api_key: ApiKeyCfg = ApiKeyCfg()
+
+
+class UserLookupCfg(BaseModel):
+    cache: CacheCfg = CacheCfg(ttl_seconds=60)
+    negative_cache: CacheCfg = CacheCfg(ttl_seconds=30)
+    cache_control: str = "public, max-age=30"
 
 
 class UserAPI(BaseModel):
     prefix: str = "/user"
     tag: str = "User"
+    lookup: UserLookupCfg = UserLookupCfg()
 
 
 class TaskAPI(BaseModel):
     prefix: str = "/task"
     tag: str = "Task"
+    response_cache: CacheCfg = CacheCfg()
+
+
+class InternalAPI(BaseModel):
+    prefix: str = "/internal"
+    tag: str = "Internal"
+    server_timing_header: bool = False
+
+
+class PaginationCfg(BaseModel):
+    default_limit: int = 100
+    max_limit: int = 1000
+
+
+class StreamingCfg(BaseModel):
+    fetch_size: int = 1000
 
 
 class APICfg(BaseModel):
     prefix: str = "/api"
+    pagination: PaginationCfg = PaginationCfg()
+    streaming: StreamingCfg = StreamingCfg()
     user: UserAPI = UserAPI()
     task: TaskAPI = TaskAPI()
+    internal: InternalAPI = InternalAPI()
     auth_jwt: AuthJWT = AuthJWT()
 
 
@@ -0,0 +1,59 @@
+from collections.abc import Sequence
+from datetime import UTC, datetime
+
+from sqlalchemy import ScalarResult, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from core.crud.cache import api_key_cache
+from core.models import ApiKey
+from core.utils.api_key import api_key_digest, generate_api_key
+
+
+async def create_api_key(
+    session: AsyncSession,
+    user_id: int,
+    name: str,
+    expires_at: datetime | None = None,
+) -> tuple[ApiKey, str]:
+    raw_key = generate_api_key()
+    api_key = ApiKey(
+        name=name,
+        prefix=raw_key[: len(settings.api.auth_jwt.api_key.prefix) + 6],
+        digest=api_key_digest(raw_key),
+        user_id=user_id,
+        expires_at=expires_at,
+    )
+    session.add(api_key)
+    await session.commit()
+    await session.refresh(api_key)
+    return api_key, raw_key
+
+
+async def get_api_key_by_id(session: AsyncSession, api_key_id: int) -> ApiKey | None:
+    return await session.get(ApiKey, api_key_id)
+
+
+async def get_active_api_key_by_digest(
+    session: AsyncSession,
+    digest: str,
+) -> ApiKey | None:
+    stmt = select(ApiKey).where(
+        ApiKey.digest == digest,
+        ApiKey.revoked.is_(False),
+        or_(ApiKey.expires_at.is_(None), ApiKey.expires_at > datetime.now(UTC)),
+    )
+    result: ApiKey | None = await session.scalar(stmt)
+    return result
+
+
+async def get_user_api_keys(session: AsyncSession, user_id: int) -> Sequence[ApiKey]:
+    stmt = select(ApiKey).where(ApiKey.user_id == user_id).order_by(ApiKey.id)
+    result: ScalarResult = await session.scalars(stmt)
+    return result.all()
+
+
+async def revoke_api_key(session: AsyncSession, api_key: ApiKey) -> None:
+    api_key.revoked = True
+    await session.commit()
+    api_key_cache.pop(api_key.digest)
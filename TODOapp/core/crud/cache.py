@@ -0,0 +1,10 @@
+from core.config import settings
+from core.utils.cache import TTLCache
+from core.utils.data_versions import DataVersions
+
+user_cache = TTLCache.from_cfg(settings.api.auth_jwt.user_cache)
+epoch_cache = TTLCache.from_cfg(settings.api.auth_jwt.epoch_cache)
+api_key_cache = TTLCache.from_cfg(settings.api.auth_jwt.api_key.cache)
+username_cache = TTLCache.from_cfg(settings.api.user.lookup.cache)
+missing_username_cache = TTLCache.from_cfg(settings.api.user.lookup.negative_cache)
+task_versions = DataVersions(settings.api.task.response_cache.max_size)
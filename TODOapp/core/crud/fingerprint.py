@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import Row, Select, Subquery, Text, cast, func, literal, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def fingerprint(rows: Subquery) -> Select[tuple[str | None, datetime | None]]:
+    return select(
+        func.string_agg(
+            cast(rows.c.id, Text),
+            aggregate_order_by(literal(","), rows.c.id),
+        ),
+        func.max(func.greatest(rows.c.created_at, rows.c.last_update_at)),
+    )
+
+
+async def get_fingerprint(
+    session: AsyncSession,
+    stmt: Select[Any],
+) -> Row[tuple[str | None, datetime | None]]:
+    result = await session.execute(fingerprint(stmt.subquery()))
+    return result.one()
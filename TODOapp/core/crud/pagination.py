@@ -0,0 +1,15 @@
+from typing import Any
+
+from sqlalchemy import ColumnElement, Select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+def keyset_page(
+    stmt: Select[Any],
+    order_by: tuple[InstrumentedAttribute[Any] | ColumnElement[Any], ...],
+    after: tuple[float, ...] | None = None,
+    limit: int | None = None,
+) -> Select[Any]:
+    if after is not None:
+        stmt = stmt.where(tuple_(*order_by) > after)
+    return stmt.order_by(*order_by).limit(limit)
@@ -0,0 +1,49 @@
+from collections.abc import Sequence
+from datetime import UTC, datetime
+
+from sqlalchemy import Row, delete, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.models import RevokedToken
+
+
+async def revoke_token(
+    session: AsyncSession,
+    jti: str,
+    expires_at: datetime,
+    user_id: int | None = None,
+) -> None:
+    stmt = (
+        insert(RevokedToken)
+        .values(jti=jti, expires_at=expires_at, user_id=user_id)
+        .on_conflict_do_nothing(index_elements=[RevokedToken.jti])
+    )
+    await session.execute(stmt)
+    await session.commit()
+
+
+async def get_active_revoked_tokens(
+    session: AsyncSession,
+    after_id: int = 0,
+    created_after: datetime | None = None,
+) -> Sequence[Row[tuple[int, str]]]:
+    recent = RevokedToken.id > after_id
+    if created_after is not None:
+        recent = or_(recent, RevokedToken.created_at >= created_after)
+    stmt = (
+        select(RevokedToken.id, RevokedToken.jti)
+        .where(
+            recent,
+            RevokedToken.expires_at > datetime.now(UTC),
+        )
+        .order_by(RevokedToken.id)
+    )
+    result = await session.execute(stmt)
+    return result.all()
+
+
+async def delete_expired_revoked_tokens(session: AsyncSession) -> None:
+    stmt = delete(RevokedToken).where(RevokedToken.expires_at <= datetime.now(UTC))
+    await session.execute(stmt)
+    await session.commit()
@@ -1,4 +1,5 @@
-from collections.abc import Sequence
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime
 
 from api.schemas import (
     CreateTaskSchm,
@@ -6,97 +7,333 @@ from api.schemas import (
     UpdateTaskSchm,
     UserSchmExtended,
 )
-from sqlalchemy import ScalarResult, select
+from sqlalchemy import (
+    ColumnElement,
+    Row,
+    ScalarResult,
+    Select,
+    delete,
+    exists,
+    func,
+    insert,
+    or_,
+    select,
+    union_all,
+    update,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from sqlalchemy.orm.util import AliasedClass
+
+from core.config import settings
+from core.crud.cache import task_versions
+from core.crud.fingerprint import get_fingerprint
+from core.crud.pagination import keyset_page
+from core.models import Task, TaskArchive
+from core.models.task import TASK_SEARCH_CONFIG
 
-from core.models import Task, User
 
+def _tasks(include_archived: bool) -> type[Task] | AliasedClass[Task]:
+    if not include_archived:
+        return Task
+    hot = Task.__table__
+    archive = TaskArchive.__table__
+    tasks = union_all(
+        select(*hot.c),
+        select(*(archive.c[column.key] for column in hot.c)),
+    ).subquery("tasks")
+    return aliased(Task, tasks)
 
-async def get_all_tasks(session: AsyncSession) -> Sequence[Task]:
-    stmt = select(Task).order_by(Task.user_id, Task.id)
+
+async def get_all_tasks(
+    session: AsyncSession,
+    limit: int | None = None,
+    after: tuple[int, ...] | None = None,
+    include_archived: bool = False,
+) -> Sequence[Task]:
+    tasks = _tasks(include_archived)
+    stmt = keyset_page(select(tasks), (tasks.user_id, tasks.id), after, limit)
     result: ScalarResult = await session.scalars(stmt)
     return result.all()
 
 
+def _user_tasks_stmt(
+    user_id: int,
+    limit: int | None,
+    after: tuple[int, ...] | None,
+    include_archived: bool,
+) -> Select[tuple[Task]]:
+    tasks = _tasks(include_archived)
+    return keyset_page(
+        select(tasks).where(tasks.user_id == user_id),
+        (tasks.user_id, tasks.id),
+        after,
+        limit,
+    )
+
+
 async def get_user_all_tasks(
     session: AsyncSession,
     user: UserSchmExtended,
+    limit: int | None = None,
+    after: tuple[int, ...] | None = None,
+    include_archived: bool = False,
 ) -> Sequence[Task]:
-    stmt = select(Task).where(Task.user_id == user.id).order_by(Task.user_id, Task.id)
+    stmt = _user_tasks_stmt(user.id, limit, after, include_archived)
     result: ScalarResult = await session.scalars(stmt)
     return result.all()
 
 
+async def get_user_tasks_fingerprint(
+    session: AsyncSession,
+    user: UserSchmExtended,
+    limit: int | None = None,
+    after: tuple[int, ...] | None = None,
+    include_archived: bool = False,
+) -> Row[tuple[str | None, datetime | None]]:
+    stmt = _user_tasks_stmt(user.id, limit, after, include_archived)
+    return await get_fingerprint(session, stmt)
+
+
+async def _stream_tasks(
+    session: AsyncSession,
+    stmt: Select[tuple[Task]],
+    fetch_size: int,
+) -> AsyncIterator[Task]:
+    result = await session.stream_scalars(
+        stmt.execution_options(yield_per=fetch_size),
+    )
+    async for task in result:
+        yield task
+
+
+def stream_all_tasks(
+    session: AsyncSession,
+    fetch_size: int,
+    include_archived: bool = False,
+) -> AsyncIterator[Task]:
+    tasks = _tasks(include_archived)
+    stmt = select(tasks).order_by(tasks.user_id, tasks.id)
+    return _stream_tasks(session, stmt, fetch_size)
+
+
+def stream_user_all_tasks(
+    session: AsyncSession,
+    user_id: int,
+    fetch_size: int,
+    include_archived: bool = False,
+) -> AsyncIterator[Task]:
+    tasks = _tasks(include_archived)
+    stmt = (
+        select(tasks).where(tasks.user_id == user_id).order_by(tasks.user_id, tasks.id)
+    )
+    return _stream_tasks(session, stmt, fetch_size)
+
+
 async def get_task_by_id(session: AsyncSession, task_id: int) -> Task | None:
     return await session.get(Task, task_id)
 
 
-async def get_tasks_by_some_statement(
+async def get_task_fingerprint(
     session: AsyncSession,
+    task_id: int,
+) -> Row[tuple[str | None, datetime | None]]:
+    return await get_fingerprint(session, select(Task).where(Task.id == task_id))
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _search_conditions(
+    tasks: type[Task] | AliasedClass[Task],
     search_task: SearchTaskSchm,
-) -> Sequence[Task] | None:
+) -> list[ColumnElement[bool]]:
     condition = []
     if search_task.id is not None:
-        condition.append(Task.id == search_task.id)
+        condition.append(tasks.id == search_task.id)
     if search_task.name is not None:
-        condition.append(Task.name == search_task.name)
+        condition.append(tasks.name == search_task.name)
     if search_task.user_id is not None:
-        condition.append(Task.user_id == search_task.user_id)
+        condition.append(tasks.user_id == search_task.user_id)
     if search_task.status is not None:
-        condition.append(Task.status == search_task.status)
+        condition.append(tasks.status == search_task.status)
     if search_task.start_at is not None:
-        condition.append(Task.start_at >= search_task.start_at)
+        condition.append(tasks.start_at >= search_task.start_at)
     if search_task.end_at is not None:
-        condition.append(Task.end_at <= search_task.end_at)
+        condition.append(tasks.end_at <= search_task.end_at)
+    if search_task.created_after is not None:
+        condition.append(tasks.created_at >= search_task.created_after)
+    if search_task.created_before is not None:
+        condition.append(tasks.created_at < search_task.created_before)
+    if search_task.contains:
+        pattern = f"%{_escape_like(search_task.contains)}%"
+        condition.append(
+            or_(
+                tasks.name.ilike(pattern, escape="\\"),
+                tasks.description.ilike(pattern, escape="\\"),
+            )
+        )
+    return condition
+
 
-    stmt = select(Task).where(*condition).order_by(Task.id)
+async def get_tasks_by_some_statement(
+    session: AsyncSession,
+    search_task: SearchTaskSchm,
+    limit: int | None = None,
+    after: tuple[int, ...] | None = None,
+    include_archived: bool = False,
+) -> Sequence[Task] | None:
+    tasks = _tasks(include_archived)
+    stmt = keyset_page(
+        select(tasks).where(*_search_conditions(tasks, search_task)),
+        (tasks.id,),
+        after,
+        limit,
+    )
     result: ScalarResult = await session.scalars(stmt)
     return result.all()
 
 
+async def get_ranked_tasks(
+    session: AsyncSession,
+    search_task: SearchTaskSchm,
+    limit: int | None = None,
+    after: tuple[float, ...] | None = None,
+    include_archived: bool = False,
+) -> Sequence[Row[tuple[Task, float]]]:
+    tasks = _tasks(include_archived)
+    query = func.websearch_to_tsquery(TASK_SEARCH_CONFIG, search_task.query)
+    rank = func.ts_rank(tasks.search_vector, query)
+    stmt = keyset_page(
+        select(tasks, rank).where(
+            tasks.search_vector.bool_op("@@")(query),
+            *_search_conditions(tasks, search_task),
+        ),
+        (-rank, tasks.id),
+        after,
+        limit,
+    )
+    result = await session.execute(stmt)
+    return result.all()
+
+
+def _task_access_conditions(task_id: int, user: UserSchmExtended) -> list:
+    conditions = [Task.id == task_id]
+    if user.role != settings.roles.admin:
+        conditions.append(Task.user_id == user.id)
+    return conditions
+
+
+async def task_exists(session: AsyncSession, task_id: int) -> bool:
+    stmt = select(exists().where(Task.id == task_id))
+    return bool(await session.scalar(stmt))
+
+
 async def create_task(
     session: AsyncSession,
     task_input: CreateTaskSchm,
     user: UserSchmExtended,
 ) -> Task:
-    new_task_dict = {
-        "user_id": user.id,
-        **task_input.model_dump(),
-    }
-    new_task = Task(**new_task_dict)
-    session.add(new_task)
+    stmt = (
+        insert(Task).values(user_id=user.id, **task_input.model_dump()).returning(Task)
+    )
+    new_task: Task = (await session.scalars(stmt)).one()
     await session.commit()
-    await session.refresh(new_task)
+    task_versions.bump(new_task.user_id)
     return new_task
 
 
 async def update_task(
     session: AsyncSession,
-    task_to_update: Task,
+    task_id: int,
     task_in: UpdateTaskSchm,
-) -> Task:
-    for name, value in task_in.model_dump(exclude_unset=True).items():
-        setattr(task_to_update, name, value)
-
+    user: UserSchmExtended,
+) -> Task | None:
+    conditions = _task_access_conditions(task_id, user)
+    if not (values := task_in.model_dump(exclude_unset=True)):
+        task: Task | None = await session.scalar(select(Task).where(*conditions))
+        return task
+    stmt = update(Task).where(*conditions).values(**values).returning(Task)
+    updated_task: Task | None = await session.scalar(stmt)
     await session.commit()
-    await session.refresh(task_to_update)
-    return task_to_update
+    if updated_task is not None:
+        task_versions.bump(updated_task.user_id)
+    return updated_task
 
 
-async def change_task_user_by_user(
+async def change_task_owner(
     session: AsyncSession,
-    task_to_update: Task,
-    new_user: User,
-) -> Task:
-    task_to_update.user_id = new_user.id
+    task_id: int,
+    new_user_id: int,
+    user: UserSchmExtended,
+) -> Task | None:
+    previous = (
+        select(Task.id, Task.user_id)
+        .where(*_task_access_conditions(task_id, user))
+        .with_for_update()
+        .cte("previous")
+    )
+    stmt = (
+        update(Task)
+        .where(Task.id == previous.c.id)
+        .values(user_id=new_user_id)
+        .returning(Task, previous.c.user_id)
+    )
+    row = (await session.execute(stmt)).one_or_none()
     await session.commit()
-    await session.refresh(task_to_update)
-    return task_to_update
+    if row is None:
+        return None
+    updated_task: Task = row[0]
+    task_versions.bump(row[1], new_user_id)
+    return updated_task
 
 
 async def delete_task(
     session: AsyncSession,
-    task_to_delete: Task,
-) -> None:
-    await session.delete(task_to_delete)
+    task_id: int,
+    user: UserSchmExtended,
+) -> bool:
+    stmt = (
+        delete(Task)
+        .where(*_task_access_conditions(task_id, user))
+        .returning(Task.user_id)
+    )
+    owner_id: int | None = await session.scalar(stmt)
+    await session.commit()
+    if owner_id is None:
+        return False
+    task_versions.bump(owner_id)
+    return True
+
+
+async def archive_completed_tasks(
+    session: AsyncSession,
+    completed_before: datetime,
+    batch_size: int,
+) -> int:
+    batch = (
+        select(Task.id)
+        .where(
+            Task.status == settings.tstat.cmp,
+            func.coalesce(Task.last_update_at, Task.created_at) < completed_before,
+        )
+        .order_by(Task.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    columns = [column for column in Task.__table__.c if column.computed is None]
+    moved = delete(Task).where(Task.id.in_(batch)).returning(*columns).cte("moved")
+    stmt = (
+        insert(TaskArchive)
+        .from_select(
+            [column.key for column in columns],
+            select(*(moved.c[column.key] for column in columns)),
+        )
+        .returning(TaskArchive.user_id)
+    )
+    owner_ids = (await session.scalars(stmt)).all()
     await session.commit()
+    if owner_ids:
+        task_versions.bump(*set(owner_ids))
+    return len(owner_ids)
@@ -1,15 +1,36 @@
 from collections.abc import Sequence
 
 from api.schemas import CreateAdminUserSchm, CreateUserSchm, UpdateUserSchm
-from sqlalchemy import Result, ScalarResult, select
+from sqlalchemy import (
+    ColumnElement,
+    Result,
+    ScalarResult,
+    case,
+    delete,
+    func,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.crud.cache import (
+    epoch_cache,
+    missing_username_cache,
+    user_cache,
+    username_cache,
+)
+from core.crud.pagination import keyset_page
 from core.models import User
-from core.utils.jwt import hash_password
+from core.utils.jwt import hash_password_async
 
 
-async def get_all_users(session: AsyncSession) -> Sequence[User]:
-    stmt = select(User).order_by(User.id)
+async def get_all_users(
+    session: AsyncSession,
+    limit: int | None = None,
+    after: tuple[int, ...] | None = None,
+) -> Sequence[User]:
+    stmt = keyset_page(select(User), (User.id,), after, limit)
     result: ScalarResult = await session.scalars(stmt)
     return result.all()
 
@@ -28,73 +49,158 @@ async def get_user_by_username(
     return user
 
 
+def _invalidate_user(user_id: int) -> None:
+    user_cache.pop(user_id)
+    epoch_cache.pop(user_id)
+
+
+def _invalidate_usernames(*usernames: str) -> None:
+    for username in usernames:
+        username_cache.pop(username)
+        missing_username_cache.pop(username)
+
+
+def _bumped_security_epoch() -> ColumnElement[int]:
+    return func.coalesce(User.security_epoch, 0) + 1
+
+
+async def get_user_security_epoch(session: AsyncSession, user_id: int) -> int | None:
+    stmt = select(User.security_epoch).where(User.id == user_id)
+    epoch: int | None = await session.scalar(stmt)
+    return epoch
+
+
 async def _create_user_helper(
     session: AsyncSession,
     user_input: dict,
-) -> User:
+) -> User | None:
     user_input_w_hashed_password = user_input.copy()
     user_input_w_hashed_password.update(
-        password=hash_password(user_input["password"]).decode(),
+        password=(await hash_password_async(user_input["password"])).decode(),
+    )
+    stmt = (
+        insert(User)
+        .values(**user_input_w_hashed_password)
+        .on_conflict_do_nothing(index_elements=[User.username])
+        .returning(User)
     )
-    new_user = User(**user_input_w_hashed_password)
-    session.add(new_user)
+    new_user: User | None = (await session.scalars(stmt)).one_or_none()
     await session.commit()
-    await session.refresh(new_user)
+    if new_user is not None:
+        _invalidate_usernames(new_user.username)
     return new_user
 
 
 async def create_user(
     session: AsyncSession,
     user_input: CreateUserSchm,
-) -> User:
+) -> User | None:
     return await _create_user_helper(session, user_input.model_dump())
 
 
 async def create_admin_user(
     session: AsyncSession,
     user_input: CreateAdminUserSchm,
-) -> User:
+) -> User | None:
     return await _create_user_helper(session, user_input.model_dump())
 
 
 async def update_user(
     session: AsyncSession,
-    user_to_update: User,
+    user_id: int,
     user_input: UpdateUserSchm,
-) -> User:
-    for name, value in user_input.model_dump(exclude_unset=True).items():
-        setattr(user_to_update, name, value)
-
+) -> User | None:
+    values = user_input.model_dump(exclude_unset=True)
+    if not values:
+        return await get_user_by_id(session, user_id)
+    previous = (
+        select(User.id, User.username, User.active)
+        .where(User.id == user_id)
+        .with_for_update()
+        .cte("previous")
+    )
+    if "active" in values:
+        values["security_epoch"] = case(
+            (previous.c.active != values["active"], _bumped_security_epoch()),
+            else_=User.security_epoch,
+        )
+    stmt = (
+        update(User)
+        .where(User.id == previous.c.id)
+        .values(**values)
+        .returning(User, previous.c.username)
+    )
+    row = (await session.execute(stmt)).one_or_none()
     await session.commit()
-    await session.refresh(user_to_update)
-    return user_to_update
+    if row is None:
+        return None
+    updated_user: User = row[0]
+    _invalidate_user(updated_user.id)
+    _invalidate_usernames(row[1], updated_user.username)
+    return updated_user
 
 
 async def update_password(
     session: AsyncSession,
-    user_to_update: User,
+    user_id: int,
     password: str | bytes,
-) -> User:
-    user_to_update.password = hash_password(password).decode()
+) -> User | None:
+    stmt = (
+        update(User)
+        .where(User.id == user_id)
+        .values(
+            password=(await hash_password_async(password)).decode(),
+            security_epoch=_bumped_security_epoch(),
+        )
+        .returning(User)
+    )
+    updated_user: User | None = await session.scalar(stmt)
+    await session.commit()
+    _invalidate_user(user_id)
+    return updated_user
+
+
+async def replace_password_hash(
+    session: AsyncSession,
+    user_id: int,
+    old_hash: str,
+    new_hash: str,
+) -> None:
+    stmt = (
+        update(User)
+        .where(User.id == user_id, User.password == old_hash)
+        .values(password=new_hash)
+    )
+    await session.execute(stmt)
     await session.commit()
-    await session.refresh(user_to_update)
-    return user_to_update
 
 
 async def update_role(
     session: AsyncSession,
-    user_to_update: User,
+    user_id: int,
     role: str,
-) -> User:
-    user_to_update.role = role
+) -> User | None:
+    stmt = (
+        update(User)
+        .where(User.id == user_id)
+        .values(role=role, security_epoch=_bumped_security_epoch())
+        .returning(User)
+    )
+    updated_user: User | None = await session.scalar(stmt)
     await session.commit()
-    await session.refresh(user_to_update)
-    return user_to_update
+    _invalidate_user(user_id)
+    return updated_user
 
 
 async def delete_user(
     session: AsyncSession,
-    user_to_delete: User,
-) -> None:
-    await session.delete(user_to_delete)
+    user_id: int,
+) -> bool:
+    stmt = delete(User).where(User.id == user_id).returning(User.username)
+    username: str | None = await session.scalar(stmt)
     await session.commit()
+    if username is None:
+        return False
+    _invalidate_user(user_id)
+    _invalidate_usernames(username)
+    return True
@@ -3,10 +3,16 @@ __all__ = (
     "Base",
     "User",
     "Task",
+    "TaskArchive",
+    "RevokedToken",
+    "ApiKey",
 )
 
 
+from .api_key import ApiKey
 from .base import Base
 from .db_helper import db_helper
+from .revoked_token import RevokedToken
 from .task import Task
+from .task_archive import TaskArchive
 from .user import User
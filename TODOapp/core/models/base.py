@@ -15,7 +15,7 @@ class Base(DeclarativeBase):
 
     id: Mapped[int] = mapped_column(primary_key=True)
     created_at: Mapped[datetime] = mapped_column(
-        default=datetime.now(),
+        default=datetime.now,
         server_default=func.now(),
     )
     last_update_at: Mapped[datetime | None]
@@ -1,4 +1,5 @@
-from collections.abc import AsyncGenerator
+import itertools
+from collections.abc import AsyncGenerator, Sequence
 
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
@@ -8,6 +9,7 @@ from sqlalchemy.ext.asyncio import (
 )
 
 from core.config import settings
+from core.utils.pool_metrics import InstrumentedAsyncQueuePool, instrument_pool
 
 
 class DatabaseHelper:
@@ -18,16 +20,55 @@ class DatabaseHelper:
         echo_pool: bool,
         pool_size: int,
         max_overflow: int,
+        replica_urls: Sequence[str] = (),
     ):
-        self.engine: AsyncEngine = create_async_engine(
+        self.engine: AsyncEngine = self._create_engine(
             url=url,
             echo=echo,
             echo_pool=echo_pool,
             pool_size=pool_size,
             max_overflow=max_overflow,
         )
-        self.session_factory = async_sessionmaker(
-            bind=self.engine,
+        instrument_pool(self.engine, "primary")
+        self.session_factory = self._make_session_factory(self.engine)
+        self.replica_engines: list[AsyncEngine] = [
+            self._create_engine(
+                url=replica_url,
+                echo=echo,
+                echo_pool=echo_pool,
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+            )
+            for replica_url in replica_urls
+        ]
+        for number, engine in enumerate(self.replica_engines, start=1):
+            instrument_pool(engine, f"replica-{number}")
+        self.replica_session_factories = [
+            self._make_session_factory(engine) for engine in self.replica_engines
+        ]
+        self._replicas = itertools.cycle(self.replica_session_factories)
+
+    @staticmethod
+    def _create_engine(
+        url: str,
+        echo: bool,
+        echo_pool: bool,
+        pool_size: int,
+        max_overflow: int,
+    ) -> AsyncEngine:
+        return create_async_engine(
+            url=url,
+            echo=echo,
+            echo_pool=echo_pool,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            poolclass=InstrumentedAsyncQueuePool,
+        )
+
+    @staticmethod
+    def _make_session_factory(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+        return async_sessionmaker(
+            bind=engine,
             autoflush=False,
             autocommit=False,
             expire_on_commit=False,
@@ -35,11 +76,18 @@ class DatabaseHelper:
 
     async def dispose(self) -> None:
         await self.engine.dispose()
+        for engine in self.replica_engines:
+            await engine.dispose()
 
     async def session_getter(self) -> AsyncGenerator[AsyncSession, None]:
         async with self.session_factory() as session:
             yield session
 
+    def replica_session_factory(self) -> async_sessionmaker[AsyncSession] | None:
+        if not self.replica_session_factories:
+            return None
+        return next(self._replicas)
+
 
 db_helper = DatabaseHelper(
     url=str(settings.db.url),
@@ -47,4 +95,5 @@ db_helper = DatabaseHelper(
     echo_pool=settings.db.echo_pool,
     pool_size=settings.db.pool_size,
     max_overflow=settings.db.max_overflow,
+    replica_urls=[str(url) for url in settings.db.replica_urls],
 )
@@ -0,0 +1,12 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.models import Base
+
+
+class RevokedToken(Base):
+    jti: Mapped[str] = mapped_column(String(36), unique=True)
+    user_id: Mapped[int | None]
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
@@ -1,26 +1,108 @@
 from datetime import datetime
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
-from sqlalchemy import DateTime, ForeignKey, String
+from sqlalchemy import (
+    CheckConstraint,
+    Computed,
+    Connection,
+    DateTime,
+    Dialect,
+    ForeignKey,
+    Index,
+    SmallInteger,
+    String,
+    Table,
+    TypeDecorator,
+    text,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.sql.ddl import BaseDDLElement
+from sqlalchemy.sql.schema import SchemaItem
 
 from core.config import settings
 from core.models import Base
+from core.utils.task_status import TASK_STATUS_CODES, TASK_STATUS_LABELS
 
 if TYPE_CHECKING:
     from core.models import User
 
+TASK_SEARCH_CONFIG = "simple"
 
-class Task(Base):
+
+def _pg_trgm_installed(
+    ddl: BaseDDLElement,
+    target: SchemaItem,
+    bind: Connection | None,
+    tables: list[Table] | None = None,
+    state: Any = None,
+    **kw: Any,
+) -> bool:
+    if bind is None:
+        return True
+    stmt = text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")
+    return bool(bind.scalar(stmt))
+
+
+class TaskStatusCode(TypeDecorator[str]):
+    impl = SmallInteger
+    cache_ok = True
+
+    def process_bind_param(self, value: str | None, dialect: Dialect) -> int | None:
+        return None if value is None else TASK_STATUS_CODES[value]
+
+    def process_result_value(self, value: int | None, dialect: Dialect) -> str | None:
+        return None if value is None else TASK_STATUS_LABELS[value]
+
+
+class TaskFieldsMixin:
     name: Mapped[str] = mapped_column(String(70))
     description: Mapped[str | None] = mapped_column(String(360))
     start_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
     end_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
     scheduled_hours: Mapped[int] = mapped_column(default=0, server_default="0")
     status: Mapped[str] = mapped_column(
+        TaskStatusCode,
         default=settings.tstat.pld,
-        server_default=settings.tstat.pld,
+        server_default=str(TASK_STATUS_CODES[settings.tstat.pld]),
+    )
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            f"to_tsvector('{TASK_SEARCH_CONFIG}', "
+            "coalesce(name, '') || ' ' || coalesce(description, ''))",
+            persisted=True,
+        ),
+        deferred=True,
+    )
+
+
+class Task(TaskFieldsMixin, Base):
+    __table_args__ = (
+        CheckConstraint(
+            f"status >= 0 AND status < {len(TASK_STATUS_CODES)}",
+            name="ck_tasks_status",
+        ),
+        Index("ix_tasks_user_id_id", "user_id", "id"),
+        Index("ix_tasks_status_id", "status", "id"),
+        Index("ix_tasks_name_id", "name", "id"),
+        Index("ix_tasks_start_at", "start_at"),
+        Index("ix_tasks_end_at", "end_at"),
+        Index("ix_tasks_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_tasks_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ).ddl_if(callable_=_pg_trgm_installed),
+        Index(
+            "ix_tasks_description_trgm",
+            "description",
+            postgresql_using="gin",
+            postgresql_ops={"description": "gin_trgm_ops"},
+        ).ddl_if(callable_=_pg_trgm_installed),
     )
+
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
 
     user: Mapped["User"] = relationship(back_populates="tasks")
@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from sqlalchemy import CheckConstraint, ForeignKey, Index, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.utils.task_status import TASK_STATUS_CODES
+
+from .base import Base
+from .task import TaskFieldsMixin
+
+
+class TaskArchive(TaskFieldsMixin, Base):
+    __tablename__ = "tasks_archive"
+    __table_args__ = (
+        CheckConstraint(
+            f"status >= 0 AND status < {len(TASK_STATUS_CODES)}",
+            name="ck_tasks_archive_status",
+        ),
+        Index("ix_tasks_archive_user_id_id", "user_id", "id"),
+        Index(
+            "ix_tasks_archive_search_vector",
+            "search_vector",
+            postgresql_using="gin",
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    archived_at: Mapped[datetime] = mapped_column(server_default=func.now())
@@ -22,4 +22,6 @@ class User(Base):
         server_default=str(settings.roles.user),
     )
 
+    security_epoch: Mapped[int] = mapped_column(default=0, server_default="0")
+
     tasks: Mapped[list["Task"]] = relationship(back_populates="user")
@@ -0,0 +1,12 @@
+import hashlib
+import secrets
+
+from core.config import settings
+
+
+def generate_api_key() -> str:
+    return f"{settings.api.auth_jwt.api_key.prefix}{secrets.token_urlsafe(32)}"
+
+
+def api_key_digest(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode()).hexdigest()
@@ -0,0 +1,43 @@
+import asyncio
+import contextlib
+import logging
+from collections.abc import Awaitable, Callable
+
+from core.utils import metrics
+
+
+class BackgroundLoop:
+    def __init__(
+        self,
+        failures: metrics.Counter,
+        failure_message: str,
+        logger: logging.Logger,
+    ):
+        self.failures = failures
+        self.failure_message = failure_message
+        self.logger = logger
+        self._task: asyncio.Task | None = None
+
+    async def _run_forever(
+        self,
+        job: Callable[[], Awaitable[object]],
+        interval: float,
+    ) -> None:
+        while True:
+            try:
+                await job()
+            except Exception:
+                self.failures.inc()
+                self.logger.exception(self.failure_message)
+            await asyncio.sleep(interval)
+
+    def start(self, job: Callable[[], Awaitable[object]], interval: float) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run_forever(job, interval))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
@@ -0,0 +1,29 @@
+import itertools
+from collections.abc import Hashable
+
+from core.utils.cache import TTLCache
+
+ANY = "*"
+
+
+class DataVersions:
+    def __init__(self, max_size: int):
+        self._versions = TTLCache(max_size=max(max_size, 1))
+        self._counter = itertools.count(1)
+        self.bypassed = False
+
+    def get(self, key: Hashable = ANY) -> int:
+        if self.bypassed:
+            return next(self._counter)
+        version: int | None = self._versions.get(key)
+        if version is None:
+            version = next(self._counter)
+            self._versions.set(key, version)
+        return version
+
+    def bump(self, *keys: Hashable) -> None:
+        for key in (*keys, ANY):
+            self._versions.set(key, next(self._counter))
+
+    def clear(self) -> None:
+        self._versions.clear()
@@ -0,0 +1,191 @@
+import asyncio
+import logging
+from functools import partial
+from typing import Any
+
+import asyncpg
+from sqlalchemy import make_url
+
+from core.config import InvalidationBusCfg, settings
+from core.crud.cache import (
+    api_key_cache,
+    epoch_cache,
+    missing_username_cache,
+    task_versions,
+    user_cache,
+    username_cache,
+)
+from core.utils import metrics
+from core.utils.background import BackgroundLoop
+from core.utils.invalidation_triggers import (
+    TRIGGER_FUNCTIONS,
+    TRIGGER_NAME,
+    trigger_matches,
+)
+
+log = logging.getLogger(__name__)
+
+USER = "user"
+USERNAME = "username"
+API_KEY = "api_key"
+TASKS = "tasks"
+
+received_messages = metrics.counter("invalidation_bus_messages_total")
+flushes = metrics.counter("invalidation_bus_flushes_total")
+listener_failures = metrics.counter("invalidation_bus_failures_total")
+listener_connected = metrics.gauge("invalidation_bus_connected")
+
+
+class InvalidationChannelError(Exception):
+    pass
+
+
+def message(kind: str, key: object) -> str:
+    return f"{kind}:{key}"
+
+
+def apply(payload: str) -> None:
+    kind, _, key = payload.partition(":")
+    if kind == USER:
+        user_cache.pop(int(key))
+        epoch_cache.pop(int(key))
+    elif kind == USERNAME:
+        username_cache.pop(key)
+        missing_username_cache.pop(key)
+    elif kind == API_KEY:
+        api_key_cache.pop(key)
+    elif kind == TASKS:
+        task_versions.bump(int(key))
+    else:
+        log.warning("Unknown invalidation message %r", payload)
+
+
+def flush() -> None:
+    user_cache.clear()
+    epoch_cache.clear()
+    username_cache.clear()
+    missing_username_cache.clear()
+    api_key_cache.clear()
+    task_versions.clear()
+    flushes.inc()
+
+
+def set_bypass(bypassed: bool) -> None:
+    for cache in (
+        user_cache,
+        epoch_cache,
+        username_cache,
+        missing_username_cache,
+        api_key_cache,
+        task_versions,
+    ):
+        cache.bypassed = bypassed
+
+
+class InvalidationBus:
+    def __init__(
+        self,
+        enabled: bool,
+        channel: str,
+        reconnect_interval: float,
+        health_check_interval: float,
+    ):
+        self.enabled = enabled
+        self.channel = channel
+        self.reconnect_interval = reconnect_interval
+        self.health_check_interval = health_check_interval
+        self.connected = False
+        self._loop = BackgroundLoop(
+            listener_failures,
+            "Invalidation listener disconnected",
+            log,
+        )
+
+    @classmethod
+    def from_cfg(cls, cfg: InvalidationBusCfg) -> "InvalidationBus":
+        return cls(
+            enabled=cfg.enabled,
+            channel=cfg.channel,
+            reconnect_interval=cfg.reconnect_seconds,
+            health_check_interval=cfg.health_check_seconds,
+        )
+
+    def _set_connected(self, connected: bool) -> None:
+        if connected == self.connected:
+            return
+        self.connected = connected
+        listener_connected.set(int(connected))
+        set_bypass(not connected)
+        if not connected:
+            flush()
+
+    def _on_notification(
+        self,
+        _conn: Any,
+        _pid: int,
+        _channel: str,
+        payload: str,
+    ) -> None:
+        received_messages.inc()
+        try:
+            apply(payload)
+        except ValueError:
+            log.warning("Malformed invalidation message %r", payload)
+
+    async def check_triggers(self, conn: asyncpg.Connection) -> None:
+        rows = await conn.fetch(
+            "SELECT tgrelid::regclass::text AS table_name, "
+            "pg_get_triggerdef(oid) AS definition FROM pg_trigger "
+            "WHERE tgname = $1 AND tgrelid::regclass::text = ANY($2::text[])",
+            TRIGGER_NAME,
+            list(TRIGGER_FUNCTIONS),
+        )
+        definitions = {row["table_name"]: row["definition"] for row in rows}
+        if mismatched := [
+            table
+            for table in TRIGGER_FUNCTIONS
+            if not trigger_matches(definitions.get(table), table, self.channel)
+        ]:
+            raise InvalidationChannelError(
+                f"Invalidation triggers on {", ".join(mismatched)} "
+                f"do not publish on channel {self.channel!r}"
+            )
+
+    async def listen(self, url: str) -> None:
+        conn = await asyncpg.connect(
+            make_url(url).set(drivername="postgresql").render_as_string(False),
+            server_settings={"application_name": "invalidation_bus"},
+        )
+        closed = asyncio.Event()
+
+        def on_termination(_conn: Any) -> None:
+            self._set_connected(False)
+            closed.set()
+
+        try:
+            await self.check_triggers(conn)
+            await conn.add_listener(self.channel, self._on_notification)
+            conn.add_termination_listener(on_termination)
+            self._set_connected(True)
+            while True:
+                try:
+                    await asyncio.wait_for(closed.wait(), self.health_check_interval)
+                except TimeoutError:
+                    await conn.execute("SELECT 1", timeout=self.health_check_interval)
+                else:
+                    raise ConnectionError("Invalidation listener connection closed")
+        finally:
+            self._set_connected(False)
+            conn.terminate()
+
+    def start(self, url: str) -> None:
+        set_bypass(True)
+        flush()
+        self._loop.start(partial(self.listen, url), self.reconnect_interval)
+
+    async def stop(self) -> None:
+        await self._loop.stop()
+        set_bypass(False)
+
+
+invalidation_bus = InvalidationBus.from_cfg(settings.db.invalidation_bus)
@@ -0,0 +1,65 @@
+TRIGGER_NAME = "invalidation_trigger"
+
+TRIGGER_EVENTS = {
+    "users": "INSERT OR UPDATE OR DELETE",
+    "tasks": "INSERT OR UPDATE OR DELETE",
+    "api_keys": "UPDATE OR DELETE",
+}
+
+TRIGGER_FUNCTIONS = {
+    "users": """
+        CREATE OR REPLACE FUNCTION notify_users_invalidation()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN
+                PERFORM pg_notify(TG_ARGV[0], 'user:' || OLD.id);
+                PERFORM pg_notify(TG_ARGV[0], 'username:' || OLD.username);
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                PERFORM pg_notify(TG_ARGV[0], 'username:' || NEW.username);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
+    "tasks": """
+        CREATE OR REPLACE FUNCTION notify_tasks_invalidation()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN
+                PERFORM pg_notify(TG_ARGV[0], 'tasks:' || OLD.user_id);
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                PERFORM pg_notify(TG_ARGV[0], 'tasks:' || NEW.user_id);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
+    "api_keys": """
+        CREATE OR REPLACE FUNCTION notify_api_keys_invalidation()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            PERFORM pg_notify(TG_ARGV[0], 'api_key:' || OLD.digest);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
+}
+
+
+def function_name(table: str) -> str:
+    return f"notify_{table}_invalidation"
+
+
+def create_trigger(table: str, channel: str) -> str:
+    return (
+        f"CREATE TRIGGER {TRIGGER_NAME} AFTER {TRIGGER_EVENTS[table]} ON {table} "
+        f"FOR EACH ROW EXECUTE FUNCTION {function_name(table)}('{channel}')"
+    )
+
+
+def trigger_matches(definition: str | None, table: str, channel: str) -> bool:
+    return definition is not None and definition.endswith(
+        f"EXECUTE FUNCTION {function_name(table)}('{channel}')"
+    )
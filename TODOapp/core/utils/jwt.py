@@ -1,16 +1,27 @@
+import hashlib
 from datetime import UTC, datetime, timedelta
 from typing import Any
 
-import bcrypt
 import jwt
 
 from core.config import settings
+from core.utils import metrics
+from core.utils.cache import TTLCache
+from core.utils.keyring import KeyRing, PrivateKey, PublicKey
+from core.utils.password_hashers import default_hasher, identify_hasher
+from core.utils.password_pool import password_pool
+
+key_ring = KeyRing.from_cfg(settings.api.auth_jwt)
+token_cache = TTLCache.from_cfg(settings.api.auth_jwt.token_cache)
+token_cache_hits = metrics.counter("token_cache_hits_total")
+token_cache_misses = metrics.counter("token_cache_misses_total")
+token_cache_size = metrics.gauge("token_cache_size")
 
 
 def encode_jwt(
     payload: dict,
-    private_key: str = settings.api.auth_jwt.private_key_path.read_text(),
-    algorithm: str = settings.api.auth_jwt.algorithm,
+    private_key: str | PrivateKey | None = None,
+    algorithm: str | None = None,
     expire_minutes: int = settings.api.auth_jwt.access_token_expire_minutes,
     expire_timedelta: timedelta | None = None,
 ) -> str:
@@ -24,33 +35,80 @@ def encode_jwt(
         iat=now,
         exp=expire,
     )
-    token = jwt.encode(payload=to_payload, key=private_key, algorithm=algorithm)
+    if private_key is not None:
+        return jwt.encode(
+            payload=to_payload,
+            key=private_key,
+            algorithm=algorithm or settings.api.auth_jwt.algorithm,
+        )
+    signing_key = key_ring.active
+    token = jwt.encode(
+        payload=to_payload,
+        key=key_ring.private_key,
+        algorithm=signing_key.algorithm,
+        headers={"kid": signing_key.kid},
+    )
     return token
 
 
 def decode_jwt(
     token: str | bytes,
-    public_key: str = settings.api.auth_jwt.public_key_path.read_text(),
-    algorithm: str = settings.api.auth_jwt.algorithm,
+    public_key: str | PublicKey | None = None,
+    algorithm: str | None = None,
 ) -> dict[str, Any]:
+    if public_key is None:
+        verifying_key = key_ring.get(jwt.get_unverified_header(token).get("kid"))
+        public_key = verifying_key.public_key
+        algorithm = verifying_key.algorithm
     decoded: dict[str, Any] = jwt.decode(
         jwt=token,
         key=public_key,
-        algorithms=[algorithm],
+        algorithms=[algorithm or settings.api.auth_jwt.algorithm],
     )
     return decoded
 
 
+def decode_jwt_cached(token: str | bytes) -> dict[str, Any]:
+    if not token or not settings.api.auth_jwt.token_cache.enabled:
+        return decode_jwt(token)
+    if isinstance(token, str):
+        token = token.encode()
+    token_digest = hashlib.sha256(token).digest()
+    decoded: dict[str, Any] | None = token_cache.get(token_digest)
+    if decoded is not None:
+        token_cache_hits.inc()
+        return decoded
+    token_cache_misses.inc()
+    decoded = decode_jwt(token)
+    token_cache.set(token_digest, decoded, expire_at=decoded.get("exp"))
+    token_cache_size.set(len(token_cache))
+    return decoded
+
+
 def hash_password(
     password: str | bytes,
 ) -> bytes:
     if isinstance(password, str):
         password = password.encode()
-    return bcrypt.hashpw(password, bcrypt.gensalt())
+    return default_hasher.hash(password).encode()
 
 
 def check_password(
     password: str,
     hashed_password: bytes,
 ) -> bool:
-    return bcrypt.checkpw(password.encode(), hashed_password)
+    hashed = hashed_password.decode()
+    return identify_hasher(hashed).verify(password.encode(), hashed)
+
+
+async def hash_password_async(
+    password: str | bytes,
+) -> bytes:
+    return await password_pool.run(hash_password, password)
+
+
+async def check_password_async(
+    password: str,
+    hashed_password: bytes,
+) -> bool:
+    return await password_pool.run(check_password, password, hashed_password)
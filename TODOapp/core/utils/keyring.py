@@ -0,0 +1,151 @@
+import base64
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric.ec import (
+    EllipticCurvePrivateKey,
+    EllipticCurvePublicKey,
+)
+from cryptography.hazmat.primitives.asymmetric.ed448 import (
+    Ed448PrivateKey,
+    Ed448PublicKey,
+)
+from cryptography.hazmat.primitives.asymmetric.ed25519 import (
+    Ed25519PrivateKey,
+    Ed25519PublicKey,
+)
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPrivateKey, RSAPublicKey
+from jwt import InvalidTokenError
+from jwt.algorithms import ECAlgorithm, OKPAlgorithm, RSAAlgorithm
+
+from core.config import AuthJWT
+
+PublicKey = RSAPublicKey | EllipticCurvePublicKey | Ed25519PublicKey | Ed448PublicKey
+PrivateKey = (
+    RSAPrivateKey | EllipticCurvePrivateKey | Ed25519PrivateKey | Ed448PrivateKey
+)
+
+EC_CURVE_ALGORITHMS = {
+    "secp256r1": "ES256",
+    "secp256k1": "ES256K",
+    "secp384r1": "ES384",
+    "secp521r1": "ES512",
+}
+JWK_THUMBPRINT_MEMBERS = {
+    "RSA": ("e", "kty", "n"),
+    "EC": ("crv", "kty", "x", "y"),
+    "OKP": ("crv", "kty", "x"),
+}
+
+
+def key_algorithm(public_key: PublicKey, preferred: str) -> str:
+    if isinstance(public_key, RSAPublicKey):
+        return preferred if preferred[:2] in ("RS", "PS") else "RS256"
+    if isinstance(public_key, EllipticCurvePublicKey):
+        return EC_CURVE_ALGORITHMS[public_key.curve.name]
+    return "EdDSA"
+
+
+def public_jwk(public_key: PublicKey) -> dict[str, Any]:
+    jwk: dict[str, Any]
+    if isinstance(public_key, RSAPublicKey):
+        jwk = RSAAlgorithm.to_jwk(public_key, as_dict=True)
+    elif isinstance(public_key, EllipticCurvePublicKey):
+        jwk = ECAlgorithm.to_jwk(public_key, as_dict=True)
+    else:
+        jwk = OKPAlgorithm.to_jwk(public_key, as_dict=True)
+    return jwk
+
+
+def jwk_thumbprint(jwk: dict[str, Any]) -> str:
+    members = {name: jwk[name] for name in JWK_THUMBPRINT_MEMBERS[jwk["kty"]]}
+    canonical = json.dumps(members, separators=(",", ":"), sort_keys=True)
+    digest = hashlib.sha256(canonical.encode()).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+@dataclass(frozen=True)
+class JWTKey:
+    kid: str
+    algorithm: str
+    public_key: PublicKey
+    private_key: PrivateKey | None = None
+
+    @classmethod
+    def from_keys(
+        cls,
+        public_key: PublicKey,
+        private_key: PrivateKey | None = None,
+        preferred_algorithm: str = "RS256",
+    ) -> "JWTKey":
+        return cls(
+            kid=jwk_thumbprint(public_jwk(public_key)),
+            algorithm=key_algorithm(public_key, preferred_algorithm),
+            public_key=public_key,
+            private_key=private_key,
+        )
+
+    def jwk(self) -> dict[str, Any]:
+        jwk = public_jwk(self.public_key)
+        jwk.pop("key_ops", None)
+        return {
+            **jwk,
+            "kid": self.kid,
+            "alg": self.algorithm,
+            "use": "sig",
+        }
+
+
+def load_public_key(path: Path) -> PublicKey:
+    public_key = serialization.load_pem_public_key(path.read_bytes())
+    if not isinstance(public_key, PublicKey):
+        raise ValueError(f"Unsupported JWT public key type in {path}")
+    return public_key
+
+
+def load_private_key(path: Path) -> PrivateKey:
+    private_key = serialization.load_pem_private_key(path.read_bytes(), password=None)
+    if not isinstance(private_key, PrivateKey):
+        raise ValueError(f"Unsupported JWT private key type in {path}")
+    return private_key
+
+
+class KeyRing:
+    def __init__(self, active: JWTKey, retired: tuple[JWTKey, ...] = ()):
+        if active.private_key is None:
+            raise ValueError("Active JWT key must have a private key")
+        self.active = active
+        self.private_key: PrivateKey = active.private_key
+        self.keys = {key.kid: key for key in (*retired, active)}
+
+    @classmethod
+    def from_cfg(cls, cfg: AuthJWT) -> "KeyRing":
+        active = JWTKey.from_keys(
+            public_key=load_public_key(cfg.public_key_path),
+            private_key=load_private_key(cfg.private_key_path),
+            preferred_algorithm=cfg.algorithm,
+        )
+        if active.algorithm != cfg.algorithm:
+            raise ValueError(
+                f"JWT algorithm {cfg.algorithm} does not match the active key"
+                f" ({active.algorithm})"
+            )
+        retired = tuple(
+            JWTKey.from_keys(load_public_key(path), preferred_algorithm=cfg.algorithm)
+            for path in cfg.retired_public_key_paths
+        )
+        return cls(active, retired)
+
+    def get(self, kid: str | None) -> JWTKey:
+        if kid is None:
+            return self.active
+        if key := self.keys.get(kid):
+            return key
+        raise InvalidTokenError(f"Unknown key id '{kid}'")
+
+    def jwks(self) -> dict[str, list[dict[str, Any]]]:
+        return {"keys": [key.jwk() for key in self.keys.values()]}
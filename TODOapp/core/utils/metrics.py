@@ -0,0 +1,125 @@
+from bisect import bisect_left
+from threading import Lock
+from typing import Any
+
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class Counter:
+    def __init__(self, name: str):
+        self.name = name
+        self.value = 0
+        self._lock = Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"type": "counter", "value": self.value}
+
+
+class Gauge:
+    def __init__(self, name: str):
+        self.name = name
+        self.value: float = 0
+        self._lock = Lock()
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"type": "gauge", "value": self.value}
+
+
+class Histogram:
+    def __init__(self, name: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self.bucket_counts[bisect_left(self.buckets, value)] += 1
+            self.count += 1
+            self.sum += value
+            self.max = max(self.max, value)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            cumulative = 0
+            buckets = {}
+            for bound, bucket_count in zip(
+                (*self.buckets, float("inf")),
+                self.bucket_counts,
+                strict=True,
+            ):
+                cumulative += bucket_count
+                buckets[str(bound)] = cumulative
+            return {
+                "type": "histogram",
+                "count": self.count,
+                "sum": self.sum,
+                "max": self.max,
+                "buckets": buckets,
+            }
+
+
+Metric = Counter | Gauge | Histogram
+
+registry: dict[str, Metric] = {}
+
+
+def counter(name: str) -> Counter:
+    metric = registry.get(name) or registry.setdefault(name, Counter(name))
+    assert isinstance(metric, Counter)
+    return metric
+
+
+def gauge(name: str) -> Gauge:
+    metric = registry.get(name) or registry.setdefault(name, Gauge(name))
+    assert isinstance(metric, Gauge)
+    return metric
+
+
+def histogram(name: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+    metric = registry.get(name) or registry.setdefault(name, Histogram(name, buckets))
+    assert isinstance(metric, Histogram)
+    return metric
+
+
+def snapshot() -> dict[str, dict[str, Any]]:
+    return {name: metric.snapshot() for name, metric in sorted(registry.items())}
+
+
+def labelled(name: str, **labels: str | None) -> str:
+    if not labels:
+        return name
+    rendered = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    return f"{name}{{{rendered}}}"
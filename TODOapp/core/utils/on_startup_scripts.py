@@ -23,8 +23,6 @@ async def check_and_create_superuser(
     )
 
     await create_user(session, admin)
-    admin_user = await get_user_by_id(session, admin_id)
-    if admin_user:
-        await update_role(session, admin_user, role=settings.roles.admin)
+    await update_role(session, admin_id, role=settings.roles.admin)
 
     return "admin created"
@@ -0,0 +1,131 @@
+import base64
+import hashlib
+import hmac
+import math
+import os
+from abc import ABC, abstractmethod
+
+import bcrypt
+
+from core.config import PasswordHashCfg, settings
+
+
+class PasswordHasher(ABC):
+    name: str
+
+    @abstractmethod
+    def identify(self, hashed: str) -> bool: ...
+
+    @abstractmethod
+    def hash(self, password: bytes) -> str: ...
+
+    @abstractmethod
+    def verify(self, password: bytes, hashed: str) -> bool: ...
+
+    @abstractmethod
+    def needs_update(self, hashed: str) -> bool: ...
+
+
+class BcryptHasher(PasswordHasher):
+    name = "bcrypt"
+
+    def __init__(self, rounds: int = 12):
+        self.rounds = rounds
+
+    def identify(self, hashed: str) -> bool:
+        return hashed.startswith(("$2a$", "$2b$", "$2y$"))
+
+    def hash(self, password: bytes) -> str:
+        return bcrypt.hashpw(password, bcrypt.gensalt(self.rounds)).decode()
+
+    def verify(self, password: bytes, hashed: str) -> bool:
+        return bcrypt.checkpw(password, hashed.encode())
+
+    def needs_update(self, hashed: str) -> bool:
+        return int(hashed.split("$")[2]) != self.rounds
+
+
+class ScryptHasher(PasswordHasher):
+    name = "scrypt"
+    prefix = "$scrypt$"
+
+    def __init__(self, n: int = 2**14, r: int = 8, p: int = 1):
+        self.n = n
+        self.r = r
+        self.p = p
+
+    @staticmethod
+    def _derive(password: bytes, salt: bytes, n: int, r: int, p: int) -> bytes:
+        return hashlib.scrypt(
+            password,
+            salt=salt,
+            n=n,
+            r=r,
+            p=p,
+            maxmem=256 * n * r + 1024 * 1024,
+            dklen=64,
+        )
+
+    @staticmethod
+    def _b64encode(value: bytes) -> str:
+        return base64.b64encode(value).decode().rstrip("=")
+
+    @staticmethod
+    def _b64decode(value: str) -> bytes:
+        return base64.b64decode(value + "=" * (-len(value) % 4))
+
+    def _parse(self, hashed: str) -> tuple[int, int, int, bytes, bytes]:
+        params, salt, key = hashed.removeprefix(self.prefix).split("$")
+        values = dict(param.split("=") for param in params.split(","))
+        return (
+            2 ** int(values["ln"]),
+            int(values["r"]),
+            int(values["p"]),
+            self._b64decode(salt),
+            self._b64decode(key),
+        )
+
+    def identify(self, hashed: str) -> bool:
+        return hashed.startswith(self.prefix)
+
+    def hash(self, password: bytes) -> str:
+        salt = os.urandom(16)
+        key = self._derive(password, salt, self.n, self.r, self.p)
+        return (
+            f"{self.prefix}ln={int(math.log2(self.n))},r={self.r},p={self.p}"
+            f"${self._b64encode(salt)}${self._b64encode(key)}"
+        )
+
+    def verify(self, password: bytes, hashed: str) -> bool:
+        n, r, p, salt, key = self._parse(hashed)
+        return hmac.compare_digest(self._derive(password, salt, n, r, p), key)
+
+    def needs_update(self, hashed: str) -> bool:
+        n, r, p, _salt, _key = self._parse(hashed)
+        return (n, r, p) != (self.n, self.r, self.p)
+
+
+def build_hashers(cfg: PasswordHashCfg) -> dict[str, PasswordHasher]:
+    return {
+        BcryptHasher.name: BcryptHasher(rounds=cfg.bcrypt_rounds),
+        ScryptHasher.name: ScryptHasher(n=cfg.scrypt_n, r=cfg.scrypt_r, p=cfg.scrypt_p),
+    }
+
+
+password_hashers = build_hashers(settings.api.auth_jwt.password_hash)
+default_hasher = password_hashers[settings.api.auth_jwt.password_hash.algorithm]
+
+
+def identify_hasher(hashed: str) -> PasswordHasher:
+    for hasher in password_hashers.values():
+        if hasher.identify(hashed):
+            return hasher
+    raise ValueError("Unknown password hash format")
+
+
+def password_needs_rehash(hashed: str) -> bool:
+    try:
+        hasher = identify_hasher(hashed)
+    except ValueError:
+        return True
+    return hasher is not default_hasher or hasher.needs_update(hashed)
@@ -0,0 +1,75 @@
+import asyncio
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from core.config import PasswordPoolCfg, settings
+from core.utils import metrics
+
+T = TypeVar("T")
+
+queue_wait = metrics.histogram("password_pool_queue_wait_seconds")
+work_time = metrics.histogram("password_pool_work_seconds")
+in_flight = metrics.gauge("password_pool_in_flight")
+rejected = metrics.counter("password_pool_rejected_total")
+
+
+class PasswordPoolBusyError(Exception):
+    pass
+
+
+class PasswordPool:
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pending = 0
+        self._executor: ThreadPoolExecutor | None = None
+
+    @classmethod
+    def from_cfg(cls, cfg: PasswordPoolCfg) -> "PasswordPool":
+        return cls(max_workers=cfg.max_workers, max_queue=cfg.max_queue)
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="password-pool",
+            )
+        return self._executor
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        if self._pending >= self.max_workers + self.max_queue:
+            rejected.inc()
+            raise PasswordPoolBusyError
+        self._pending += 1
+        in_flight.set(self._pending)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.executor,
+                self._timed_call,
+                time.perf_counter(),
+                func,
+                *args,
+            )
+        finally:
+            self._pending -= 1
+            in_flight.set(self._pending)
+
+    @staticmethod
+    def _timed_call(submitted_at: float, func: Callable[..., T], *args: Any) -> T:
+        started_at = time.perf_counter()
+        queue_wait.observe(started_at - submitted_at)
+        try:
+            return func(*args)
+        finally:
+            work_time.observe(time.perf_counter() - started_at)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_pool = PasswordPool.from_cfg(settings.api.auth_jwt.password_pool)
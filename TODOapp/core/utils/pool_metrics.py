@@ -0,0 +1,124 @@
+import time
+from collections.abc import MutableMapping
+from contextvars import ContextVar
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, PoolProxiedConnection
+
+from core.utils import metrics
+
+POOL_BUCKETS: tuple[float, ...] = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+request_scope: ContextVar[MutableMapping[str, Any] | None] = ContextVar(
+    "request_scope",
+    default=None,
+)
+
+
+def current_endpoint() -> str:
+    scope = request_scope.get()
+    if scope is None:
+        return "background"
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    checkout_wait = metrics.Histogram("db_pool_checkout_wait_seconds", POOL_BUCKETS)
+    timeouts = metrics.Counter("db_pool_timeouts_total")
+
+    def connect(self) -> PoolProxiedConnection:
+        started_at = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            self.timeouts.inc()
+            raise
+        finally:
+            self.checkout_wait.observe(time.perf_counter() - started_at)
+
+    def recreate(self) -> "InstrumentedAsyncQueuePool":
+        pool = super().recreate()
+        assert isinstance(pool, InstrumentedAsyncQueuePool)
+        pool.checkout_wait = self.checkout_wait
+        pool.timeouts = self.timeouts
+        return pool
+
+
+def _update_overflow_gauge(pool: Pool, label: str) -> None:
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        metrics.gauge(metrics.labelled("db_pool_overflow", pool=label)).set(
+            max(0, pool.overflow())
+        )
+
+
+def instrument_pool(engine: AsyncEngine, label: str = "primary") -> None:
+    sync_engine = engine.sync_engine
+    if isinstance(sync_engine.pool, InstrumentedAsyncQueuePool):
+        sync_engine.pool.checkout_wait = metrics.histogram(
+            metrics.labelled("db_pool_checkout_wait_seconds", pool=label),
+            POOL_BUCKETS,
+        )
+        sync_engine.pool.timeouts = metrics.counter(
+            metrics.labelled("db_pool_timeouts_total", pool=label)
+        )
+    if isinstance(sync_engine.pool, AsyncAdaptedQueuePool):
+        metrics.gauge(metrics.labelled("db_pool_size", pool=label)).set(
+            sync_engine.pool.size()
+        )
+    hold_time = metrics.histogram(
+        metrics.labelled("db_pool_hold_seconds", pool=label),
+        POOL_BUCKETS,
+    )
+    checked_out = metrics.gauge(metrics.labelled("db_pool_checked_out", pool=label))
+    invalidations = metrics.counter(
+        metrics.labelled("db_pool_invalidations_total", pool=label)
+    )
+
+    @event.listens_for(sync_engine, "checkout")
+    def on_checkout(_dbapi_connection, connection_record, _connection_proxy):
+        connection_record.info["checked_out_at"] = time.perf_counter()
+        connection_record.info["endpoint"] = current_endpoint()
+        checked_out.inc()
+        _update_overflow_gauge(sync_engine.pool, label)
+
+    @event.listens_for(sync_engine, "checkin")
+    def on_checkin(_dbapi_connection, connection_record):
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        endpoint = connection_record.info.pop("endpoint", None)
+        if checked_out_at is not None:
+            checked_out.dec()
+            elapsed = time.perf_counter() - checked_out_at
+            hold_time.observe(elapsed)
+            metrics.histogram(
+                metrics.labelled("db_pool_hold_seconds", pool=label, endpoint=endpoint),
+                POOL_BUCKETS,
+            ).observe(elapsed)
+        _update_overflow_gauge(sync_engine.pool, label)
+
+    @event.listens_for(sync_engine, "invalidate")
+    def on_invalidate(_dbapi_connection, _connection_record, _exception):
+        invalidations.inc()
+
+    @event.listens_for(sync_engine, "soft_invalidate")
+    def on_soft_invalidate(_dbapi_connection, _connection_record, _exception):
+        invalidations.inc()
@@ -0,0 +1,127 @@
+import math
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from core.config import LoginThrottleCfg, settings
+from core.utils import metrics
+
+admitted = metrics.counter("login_admitted_total")
+failed = metrics.counter("login_failed_total")
+rejected_by_username = metrics.counter("login_rejected_username_total")
+rejected_by_ip = metrics.counter("login_rejected_ip_total")
+rejected_by_concurrency = metrics.counter("login_rejected_concurrency_total")
+verifications_in_flight = metrics.gauge("login_verifications_in_flight")
+
+
+class LoginThrottledError(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__(retry_after)
+        self.retry_after = retry_after
+
+
+class SlidingWindowCounter:
+    def __init__(self, limit: int, window_seconds: float, max_keys: int):
+        self.limit = limit
+        self.window = window_seconds
+        self.max_keys = max_keys
+        self._windows: OrderedDict[str, tuple[int, int, int]] = OrderedDict()
+
+    def _current(self, key: str, now: float) -> tuple[int, int, int]:
+        window_id = int(now // self.window)
+        entry_window_id, previous, current = self._windows.get(key, (window_id, 0, 0))
+        if entry_window_id == window_id - 1:
+            return window_id, current, 0
+        if entry_window_id != window_id:
+            return window_id, 0, 0
+        return entry_window_id, previous, current
+
+    def retry_after(self, key: str, now: float | None = None) -> int | None:
+        now = time.time() if now is None else now
+        window_id, previous, current = self._current(key, now)
+        elapsed = now - window_id * self.window
+        estimate = previous * (1 - elapsed / self.window) + current
+        if estimate < self.limit:
+            return None
+        return max(1, math.ceil(self.window - elapsed))
+
+    def hit(self, key: str, now: float | None = None) -> None:
+        now = time.time() if now is None else now
+        window_id, previous, current = self._current(key, now)
+        self._windows[key] = (window_id, previous, current + 1)
+        self._windows.move_to_end(key)
+        while len(self._windows) > self.max_keys:
+            self._windows.popitem(last=False)
+
+    def clear(self) -> None:
+        self._windows.clear()
+
+
+class LoginAdmission:
+    def __init__(
+        self,
+        per_username: SlidingWindowCounter,
+        per_ip: SlidingWindowCounter,
+        max_concurrent_verifications: int,
+        enabled: bool = True,
+    ):
+        self.per_username = per_username
+        self.per_ip = per_ip
+        self.max_concurrent_verifications = max_concurrent_verifications
+        self.enabled = enabled
+        self._in_flight = 0
+
+    @classmethod
+    def from_cfg(cls, cfg: LoginThrottleCfg) -> "LoginAdmission":
+        return cls(
+            per_username=SlidingWindowCounter(
+                cfg.per_username_limit,
+                cfg.per_username_window_seconds,
+                cfg.max_tracked_keys,
+            ),
+            per_ip=SlidingWindowCounter(
+                cfg.per_ip_limit,
+                cfg.per_ip_window_seconds,
+                cfg.max_tracked_keys,
+            ),
+            max_concurrent_verifications=cfg.max_concurrent_verifications,
+            enabled=cfg.enabled,
+        )
+
+    def admit(self, username: str, client_ip: str) -> None:
+        if not self.enabled:
+            return
+        if retry_after := self.per_ip.retry_after(client_ip):
+            rejected_by_ip.inc()
+            raise LoginThrottledError(retry_after)
+        if retry_after := self.per_username.retry_after(username):
+            rejected_by_username.inc()
+            raise LoginThrottledError(retry_after)
+        self.per_ip.hit(client_ip)
+        admitted.inc()
+
+    def record_failure(self, username: str) -> None:
+        failed.inc()
+        if self.enabled:
+            self.per_username.hit(username)
+
+    @asynccontextmanager
+    async def verification_slot(self) -> AsyncIterator[None]:
+        if self.enabled and self._in_flight >= self.max_concurrent_verifications:
+            rejected_by_concurrency.inc()
+            raise LoginThrottledError(1)
+        self._in_flight += 1
+        verifications_in_flight.set(self._in_flight)
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            verifications_in_flight.set(self._in_flight)
+
+    def clear(self) -> None:
+        self.per_username.clear()
+        self.per_ip.clear()
+
+
+login_admission = LoginAdmission.from_cfg(settings.api.auth_jwt.login_throttle)
@@ -0,0 +1,138 @@
+import logging
+import math
+import time
+from datetime import UTC, datetime, timedelta
+from functools import partial
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.config import RevocationCfg, settings
+from core.crud import revoked_token as revoked_token_crud
+from core.utils import metrics
+from core.utils.background import BackgroundLoop
+from core.utils.bloom import BloomFilter
+
+log = logging.getLogger(__name__)
+
+revoked_size = metrics.gauge("revocation_list_size")
+refresh_failures = metrics.counter("revocation_list_refresh_failures_total")
+
+
+class RevocationList:
+    def __init__(
+        self,
+        refresh_interval: float,
+        full_reload_interval: float,
+        capacity: int,
+        error_rate: float,
+        refresh_overlap: float = 60,
+    ):
+        self.refresh_interval = refresh_interval
+        self.refresh_overlap = refresh_overlap
+        self.full_reload_interval = full_reload_interval
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._filter = BloomFilter(capacity, error_rate)
+        self._revoked: set[str] = set()
+        self._added_during_reload: set[str] = set()
+        self._last_id = 0
+        self._last_full_reload = -math.inf
+        self._loop = BackgroundLoop(
+            refresh_failures,
+            "Revocation list refresh failed",
+            log,
+        )
+
+    @classmethod
+    def from_cfg(cls, cfg: RevocationCfg) -> "RevocationList":
+        return cls(
+            refresh_interval=cfg.refresh_interval_seconds,
+            full_reload_interval=cfg.full_reload_seconds,
+            capacity=cfg.filter_capacity,
+            error_rate=cfg.filter_error_rate,
+            refresh_overlap=cfg.refresh_overlap_seconds,
+        )
+
+    def is_revoked(self, jti: str | None) -> bool:
+        if jti is None or jti not in self._filter:
+            return False
+        return jti in self._revoked
+
+    def add(self, jti: str) -> None:
+        self._filter.add(jti)
+        self._revoked.add(jti)
+        self._added_during_reload.add(jti)
+        revoked_size.set(len(self._revoked))
+
+    def clear(self) -> None:
+        self._filter = BloomFilter(self.capacity, self.error_rate)
+        self._revoked = set()
+        self._added_during_reload = set()
+        self._last_id = 0
+        self._last_full_reload = -math.inf
+        revoked_size.set(0)
+
+    async def revoke(
+        self,
+        session: AsyncSession,
+        jti: str,
+        expires_at: datetime,
+        user_id: int | None = None,
+    ) -> None:
+        await revoked_token_crud.revoke_token(session, jti, expires_at, user_id)
+        self.add(jti)
+
+    async def revoke_payload(self, session: AsyncSession, payload: dict[str, Any]):
+        if jti := payload.get("jti"):
+            await self.revoke(
+                session,
+                jti=jti,
+                expires_at=datetime.fromtimestamp(payload["exp"], UTC),
+                user_id=payload.get("sub"),
+            )
+
+    async def refresh(self, session: AsyncSession) -> None:
+        if time.monotonic() - self._last_full_reload < self.full_reload_interval:
+            for row_id, jti in await revoked_token_crud.get_active_revoked_tokens(
+                session,
+                after_id=self._last_id,
+                created_after=datetime.now() - timedelta(seconds=self.refresh_overlap),
+            ):
+                self.add(jti)
+                self._last_id = max(self._last_id, row_id)
+            return
+
+        self._added_during_reload = set()
+        await revoked_token_crud.delete_expired_revoked_tokens(session)
+        rows = await revoked_token_crud.get_active_revoked_tokens(session)
+        revoked = {jti for _row_id, jti in rows} | self._added_during_reload
+        revoked_filter = BloomFilter(
+            max(self.capacity, 2 * len(revoked)),
+            self.error_rate,
+        )
+        for jti in revoked:
+            revoked_filter.add(jti)
+        self._filter, self._revoked = revoked_filter, revoked
+        self._last_id = rows[-1][0] if rows else 0
+        self._last_full_reload = time.monotonic()
+        revoked_size.set(len(revoked))
+
+    async def _refresh_with(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+    ) -> None:
+        async with session_factory() as session:
+            await self.refresh(session)
+
+    def start(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        self._loop.start(
+            partial(self._refresh_with, session_factory),
+            self.refresh_interval,
+        )
+
+    async def stop(self) -> None:
+        await self._loop.stop()
+
+
+revocation_list = RevocationList.from_cfg(settings.api.auth_jwt.revocation)
@@ -0,0 +1,68 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from functools import partial
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.config import TaskArchiveCfg, settings
+from core.crud import task as task_crud
+from core.utils import metrics
+from core.utils.background import BackgroundLoop
+
+log = logging.getLogger(__name__)
+
+archived_tasks = metrics.counter("archived_tasks_total")
+archive_failures = metrics.counter("task_archive_failures_total")
+
+
+class TaskArchiver:
+    def __init__(
+        self,
+        min_age: timedelta,
+        batch_size: int,
+        pause: float,
+        interval: float,
+    ):
+        self.min_age = min_age
+        self.batch_size = batch_size
+        self.pause = pause
+        self.interval = interval
+        self._loop = BackgroundLoop(archive_failures, "Task archival failed", log)
+
+    @classmethod
+    def from_cfg(cls, cfg: TaskArchiveCfg) -> "TaskArchiver":
+        return cls(
+            min_age=timedelta(days=cfg.min_age_days),
+            batch_size=cfg.batch_size,
+            pause=cfg.pause_seconds,
+            interval=cfg.interval_seconds,
+        )
+
+    async def run(self, session_factory: async_sessionmaker[AsyncSession]) -> int:
+        completed_before = datetime.now() - self.min_age
+        total = 0
+        while True:
+            async with session_factory() as session:
+                moved = await task_crud.archive_completed_tasks(
+                    session,
+                    completed_before,
+                    self.batch_size,
+                )
+            total += moved
+            archived_tasks.inc(moved)
+            if moved < self.batch_size:
+                break
+            await asyncio.sleep(self.pause)
+        if total:
+            log.info("Archived %s completed tasks", total)
+        return total
+
+    def start(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        self._loop.start(partial(self.run, session_factory), self.interval)
+
+    async def stop(self) -> None:
+        await self._loop.stop()
+
+
+task_archiver = TaskArchiver.from_cfg(settings.db.task_archive)
@@ -0,0 +1,302 @@
+import argparse
+import asyncio
+import logging
+import re
+from collections.abc import Iterable, Sequence
+from datetime import date
+from functools import partial
+
+from sqlalchemy import Connection, Table, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from core.config import TaskPartitionsCfg, settings
+from core.models import Task, db_helper
+from core.utils import metrics
+from core.utils.background import BackgroundLoop
+
+log = logging.getLogger(__name__)
+
+PARTITION_NAME_RE = re.compile(r"^tasks_p(\d{4})(\d{2})$")
+DEFAULT_PARTITION = "tasks_default"
+MAINTENANCE_LOCK_ID = 0x7461736B73
+
+maintenance_failures = metrics.counter("task_partition_maintenance_failures_total")
+
+
+def month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+
+def add_months(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(start: date) -> str:
+    return f"tasks_p{start:%Y%m}"
+
+
+def partition_start(name: str) -> date | None:
+    if match := PARTITION_NAME_RE.match(name):
+        return date(int(match[1]), int(match[2]), 1)
+    return None
+
+
+def expired_partitions(names: Iterable[str], cutoff: date) -> list[str]:
+    return sorted(
+        name
+        for name in names
+        if (start := partition_start(name)) is not None
+        and add_months(start, 1) <= cutoff
+    )
+
+
+def is_partitioned(conn: Connection) -> bool:
+    stmt = text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+        "WHERE partrelid = to_regclass('tasks'))"
+    )
+    return bool(conn.scalar(stmt))
+
+
+def list_partitions(conn: Connection) -> list[str]:
+    stmt = text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = to_regclass('tasks')"
+    )
+    return list(conn.scalars(stmt))
+
+
+def _columns() -> str:
+    table: Table = Task.metadata.tables["tasks"]
+    return ", ".join(column.name for column in table.columns if column.computed is None)
+
+
+def _has_stranded_rows(conn: Connection, bounds: dict[str, date]) -> bool:
+    if conn.scalar(text(f"SELECT to_regclass('{DEFAULT_PARTITION}')")) is None:
+        return False
+    return bool(
+        conn.scalar(
+            text(
+                f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} "
+                "WHERE created_at >= :start AND created_at < :end)"
+            ),
+            bounds,
+        )
+    )
+
+
+def create_partition(conn: Connection, start: date) -> None:
+    name = partition_name(start)
+    if conn.scalar(text(f"SELECT to_regclass('{name}')")) is not None:
+        return
+    bounds = {"start": start, "end": add_months(start, 1)}
+    create = text(
+        f"CREATE TABLE {name} PARTITION OF tasks "
+        f"FOR VALUES FROM ('{start}') TO ('{bounds["end"]}')"
+    )
+    if not _has_stranded_rows(conn, bounds):
+        conn.execute(create)
+        return
+    columns = _columns()
+    conn.execute(text(f"ALTER TABLE tasks DETACH PARTITION {DEFAULT_PARTITION}"))
+    conn.execute(create)
+    conn.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            "WHERE created_at >= :start AND created_at < :end "
+            f"RETURNING {columns}) "
+            f"INSERT INTO tasks ({columns}) SELECT {columns} FROM moved"
+        ),
+        bounds,
+    )
+    conn.execute(
+        text(f"ALTER TABLE tasks ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT")
+    )
+
+
+def _rebuild_tasks_table(conn: Connection, partitions: Sequence[date] | None) -> None:
+    triggers = conn.scalars(
+        text(
+            "SELECT pg_get_triggerdef(oid) FROM pg_trigger "
+            "WHERE tgrelid = to_regclass('tasks') AND NOT tgisinternal"
+        )
+    ).all()
+    table: Table = Task.metadata.tables["tasks"]
+    sequence = conn.scalar(text("SELECT pg_get_serial_sequence('tasks', 'id')"))
+    conn.execute(text("ALTER TABLE tasks RENAME TO tasks_old"))
+    conn.execute(
+        text(
+            "CREATE TABLE tasks (LIKE tasks_old "
+            "INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING GENERATED)"
+            + (" PARTITION BY RANGE (created_at)" if partitions is not None else "")
+        )
+    )
+    for start in partitions or ():
+        create_partition(conn, start)
+    if partitions is not None:
+        conn.execute(
+            text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF tasks DEFAULT")
+        )
+    columns = _columns()
+    conn.execute(text(f"INSERT INTO tasks ({columns}) SELECT {columns} FROM tasks_old"))
+    conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY tasks.id"))
+    conn.execute(text("DROP TABLE tasks_old"))
+    primary_key = "id, created_at" if partitions is not None else "id"
+    conn.execute(
+        text(f"ALTER TABLE tasks ADD CONSTRAINT tasks_pkey PRIMARY KEY ({primary_key})")
+    )
+    conn.execute(
+        text(
+            "ALTER TABLE tasks ADD CONSTRAINT tasks_user_id_fkey "
+            "FOREIGN KEY (user_id) REFERENCES users (id)"
+        )
+    )
+    for index in table.indexes:
+        index.create(conn)
+    for trigger in triggers:
+        conn.execute(text(trigger))
+
+
+def convert_to_partitioned(conn: Connection, today: date, premake_months: int) -> bool:
+    if is_partitioned(conn):
+        return False
+    oldest = conn.scalar(text("SELECT min(created_at) FROM tasks"))
+    start = month_start(oldest.date() if oldest is not None else today)
+    end = add_months(month_start(today), premake_months)
+    partitions = []
+    while start <= end:
+        partitions.append(start)
+        start = add_months(start, 1)
+    _rebuild_tasks_table(conn, partitions)
+    return True
+
+
+def convert_to_plain(conn: Connection) -> bool:
+    if not is_partitioned(conn):
+        return False
+    _rebuild_tasks_table(conn, None)
+    return True
+
+
+def maintain_partitions(
+    conn: Connection,
+    today: date,
+    premake_months: int,
+    retention_months: int | None,
+    drop_detached: bool,
+) -> list[str]:
+    if not is_partitioned(conn) or not conn.scalar(
+        text("SELECT pg_try_advisory_xact_lock(:lock_id)"),
+        {"lock_id": MAINTENANCE_LOCK_ID},
+    ):
+        return []
+    current = month_start(today)
+    for offset in range(premake_months + 1):
+        create_partition(conn, add_months(current, offset))
+    if retention_months is None:
+        return []
+    expired = expired_partitions(
+        list_partitions(conn),
+        add_months(current, -retention_months),
+    )
+    for name in expired:
+        conn.execute(text(f"ALTER TABLE tasks DETACH PARTITION {name}"))
+        if drop_detached:
+            conn.execute(text(f"DROP TABLE {name}"))
+    return expired
+
+
+class TaskPartitionMaintainer:
+    def __init__(
+        self,
+        premake_months: int,
+        retention_months: int | None,
+        drop_detached: bool,
+        interval: float,
+    ):
+        self.premake_months = premake_months
+        self.retention_months = retention_months
+        self.drop_detached = drop_detached
+        self.interval = interval
+        self._loop = BackgroundLoop(
+            maintenance_failures,
+            "Task partition maintenance failed",
+            log,
+        )
+
+    @classmethod
+    def from_cfg(cls, cfg: TaskPartitionsCfg) -> "TaskPartitionMaintainer":
+        return cls(
+            premake_months=cfg.premake_months,
+            retention_months=cfg.retention_months,
+            drop_detached=cfg.drop_detached,
+            interval=cfg.maintenance_interval_seconds,
+        )
+
+    def maintain(self, conn: Connection) -> list[str]:
+        return maintain_partitions(
+            conn,
+            date.today(),
+            self.premake_months,
+            self.retention_months,
+            self.drop_detached,
+        )
+
+    async def run(self, engine: AsyncEngine) -> list[str]:
+        async with engine.begin() as conn:
+            expired = await conn.run_sync(self.maintain)
+        if expired:
+            log.info(
+                "%s task partitions: %s",
+                "Dropped" if self.drop_detached else "Detached",
+                ", ".join(expired),
+            )
+        return expired
+
+    def start(self, engine: AsyncEngine) -> None:
+        self._loop.start(partial(self.run, engine), self.interval)
+
+    async def stop(self) -> None:
+        await self._loop.stop()
+
+
+task_partitions = TaskPartitionMaintainer.from_cfg(settings.db.task_partitions)
+
+
+async def _run_command(command: str) -> None:
+    if command == "maintain":
+        await task_partitions.run(db_helper.engine)
+    else:
+        async with db_helper.engine.begin() as conn:
+            if command == "convert":
+                changed = await conn.run_sync(
+                    convert_to_partitioned,
+                    date.today(),
+                    task_partitions.premake_months,
+                )
+            else:
+                changed = await conn.run_sync(convert_to_plain)
+        if changed:
+            log.info(
+                "Tasks table %s",
+                "partitioned" if command == "convert" else "reverted to plain",
+            )
+        else:
+            log.warning(
+                "Tasks table is already %s",
+                "partitioned" if command == "convert" else "plain",
+            )
+    await db_helper.dispose()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Manage tasks table partitions")
+    parser.add_argument("command", choices=["convert", "revert", "maintain"])
+    asyncio.run(_run_command(parser.parse_args().command))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+from core.config import settings
+
+TASK_STATUS_CODES: dict[str, int] = {
+    label: code for code, label in enumerate(settings.tstat.model_dump().values())
+}
+TASK_STATUS_LABELS: dict[int, str] = {
+    code: label for label, code in TASK_STATUS_CODES.items()
+}
@@ -0,0 +1,57 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+
+from core.utils import metrics
+
+STAGE_BUCKETS: tuple[float, ...] = (
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    1.0,
+)
+
+_request_timings: ContextVar[dict[str, float] | None] = ContextVar(
+    "request_timings",
+    default=None,
+)
+
+
+def start_request_timings() -> Token:
+    return _request_timings.set({})
+
+
+def reset_request_timings(token: Token) -> None:
+    _request_timings.reset(token)
+
+
+def request_timings() -> dict[str, float]:
+    return _request_timings.get() or {}
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started_at
+        metrics.histogram(f"{stage}_seconds", STAGE_BUCKETS).observe(elapsed)
+        if (timings := _request_timings.get()) is not None:
+            timings[stage] = timings.get(stage, 0.0) + elapsed
+
+
+def server_timing_value(timings: dict[str, float]) -> str:
+    return ", ".join(
+        f"{stage};dur={elapsed * 1000:.3f}" for stage, elapsed in timings.items()
+    )
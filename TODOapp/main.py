@@ -2,9 +2,18 @@ from contextlib import asynccontextmanager
 
 import uvicorn
 from api import router as api_router
+from api.auth.jwks import router as jwks_router
+from api.http_exceptions import login_throttled_handler, password_pool_busy_handler
+from api.middleware import RequestScopeMiddleware, server_timing_middleware
 from core.config import settings
 from core.models import db_helper
+from core.utils.invalidation import invalidation_bus
 from core.utils.on_startup_scripts import check_and_create_superuser
+from core.utils.password_pool import PasswordPoolBusyError, password_pool
+from core.utils.rate_limit import LoginThrottledError
+from core.utils.revocation import revocation_list
+from core.utils.task_archiver import task_archiver
+from core.utils.task_partitions import task_partitions
 from fastapi import FastAPI
 
 
@@ -12,13 +21,31 @@ from fastapi import FastAPI
 async def lifespan(app: FastAPI):
     async with db_helper.session_factory() as session:
         await check_and_create_superuser(session)
+    revocation_list.start(db_helper.session_factory)
+    if invalidation_bus.enabled:
+        invalidation_bus.start(str(settings.db.url))
+    if settings.db.task_partitions.enabled:
+        task_partitions.start(db_helper.engine)
+    if settings.db.task_archive.enabled:
+        task_archiver.start(db_helper.session_factory)
     yield
+    await task_archiver.stop()
+    await task_partitions.stop()
+    await revocation_list.stop()
+    await invalidation_bus.stop()
     await db_helper.dispose()
+    password_pool.shutdown()
 
 
 todo_app = FastAPI(lifespan=lifespan)
 
 todo_app.include_router(api_router)
+todo_app.include_router(jwks_router, tags=[settings.api.auth_jwt.tag])
+todo_app.add_exception_handler(PasswordPoolBusyError, password_pool_busy_handler)
+todo_app.add_exception_handler(LoginThrottledError, login_throttled_handler)
+todo_app.add_middleware(RequestScopeMiddleware)
+if settings.api.internal.server_timing_header:
+    todo_app.middleware("http")(server_timing_middleware)
 
 
 def main():
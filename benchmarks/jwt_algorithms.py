@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""Compare JWT sign/verify throughput per algorithm.
+
+Run from the repository root: python benchmarks/jwt_algorithms.py [iterations]
+"""
+
+import sys
+import time
+from collections.abc import Callable
+from functools import partial
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+PAYLOAD = {
+    "type": "access_token",
+    "iss": "TODOapi-1@jam089.com",
+    "sub": 7,
+    "username": "john",
+    "jti": "15937a7e-2a4f-41aa-9267-ee2ec264069b",
+    "role": "User",
+    "exp": 4102444800,
+}
+
+
+def generate_keys():
+    return {
+        "RS256": rsa.generate_private_key(public_exponent=65537, key_size=2048),
+        "ES256": ec.generate_private_key(ec.SECP256R1()),
+        "EdDSA": ed25519.Ed25519PrivateKey.generate(),
+    }
+
+
+def to_pem(private_key) -> tuple[bytes, bytes]:
+    private_pem = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    )
+    public_pem = private_key.public_key().public_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+    return private_pem, public_pem
+
+
+def ops_per_second(func: Callable[[], object], iterations: int) -> float:
+    started_at = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return iterations / (time.perf_counter() - started_at)
+
+
+def main(iterations: int = 2000) -> None:
+    print(f"{'algorithm':<10} {'keys':<8} {'sign/s':>10} {'verify/s':>10}")
+    for algorithm, private_key in generate_keys().items():
+        public_key = private_key.public_key()
+        private_pem, public_pem = to_pem(private_key)
+        for label, sign_key, verify_key in (
+            ("pem", private_pem, public_pem),
+            ("parsed", private_key, public_key),
+        ):
+            token = jwt.encode(PAYLOAD, sign_key, algorithm=algorithm)
+            sign_rate = ops_per_second(
+                partial(jwt.encode, PAYLOAD, sign_key, algorithm),
+                iterations,
+            )
+            verify_rate = ops_per_second(
+                partial(jwt.decode, token, verify_key, algorithms=[algorithm]),
+                iterations,
+            )
+            print(f"{algorithm:<10} {label:<8} {sign_rate:>10.0f} {verify_rate:>10.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
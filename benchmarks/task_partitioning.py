@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+"""Compare task query latency on a plain and a partitioned tasks table.
+
+Seeds a scratch schema in the configured database, times the queries, converts
+the table with core.utils.task_partitions and times them again.
+
+Run from the repository root:
+PYTHONPATH=TODOapp python benchmarks/task_partitioning.py [tasks] [months]
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from datetime import date, datetime, timedelta
+
+from api.schemas import SearchTaskSchm
+from core.config import settings
+from core.crud import task as task_crud
+from core.models import Base
+from core.utils.task_partitions import convert_to_partitioned
+from sqlalchemy import NullPool, text
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+SCHEMA = "bench_task_partitions"
+USERS_COUNT = 1_000
+REPEATS = 50
+NOW = datetime.now()
+
+queries: dict[str, Callable[[AsyncSession], Awaitable[object]]] = {
+    "user tasks, last 7 days": lambda s: task_crud.get_tasks_by_some_statement(
+        s, SearchTaskSchm(user_id=42, created_after=NOW - timedelta(days=7)), 101
+    ),
+    "completed, last 30 days": lambda s: task_crud.get_tasks_by_some_statement(
+        s,
+        SearchTaskSchm(
+            status=settings.tstat.cmp, created_after=NOW - timedelta(days=30)
+        ),
+        101,
+    ),
+    "user tasks, all time": lambda s: task_crud.get_tasks_by_some_statement(
+        s, SearchTaskSchm(user_id=42), 101
+    ),
+    "task by id": lambda s: task_crud.get_task_by_id(s, 4242),
+}
+
+
+async def seed(
+    session_factory: async_sessionmaker[AsyncSession], tasks: int, months: int
+):
+    async with session_factory() as session:
+        await session.execute(
+            text(
+                "INSERT INTO users (id, username, password) "
+                "SELECT g, 'bench_' || g, 'x' FROM generate_series(1, :users) g"
+            ),
+            {"users": USERS_COUNT},
+        )
+        await session.execute(
+            text(
+                "INSERT INTO tasks (name, user_id, scheduled_hours, status, created_at) "
+                "SELECT 'task ' || g, 1 + g % :users, 1, g % 4, "
+                "CAST(:now AS timestamp) - random() * :days * interval '1 day' "
+                "FROM generate_series(1, :tasks) g"
+            ),
+            {"users": USERS_COUNT, "tasks": tasks, "days": months * 30, "now": NOW},
+        )
+        await session.commit()
+
+
+async def analyze(engine: AsyncEngine) -> None:
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE tasks"))
+
+
+async def median_ms(
+    session_factory: async_sessionmaker[AsyncSession],
+    query: Callable[[AsyncSession], Awaitable[object]],
+) -> float:
+    timings = []
+    async with session_factory() as session:
+        for _ in range(REPEATS):
+            started_at = time.perf_counter()
+            await query(session)
+            timings.append((time.perf_counter() - started_at) * 1000)
+            session.expunge_all()
+    return statistics.median(timings)
+
+
+async def measure(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> dict[str, float]:
+    return {
+        name: await median_ms(session_factory, query) for name, query in queries.items()
+    }
+
+
+async def main(tasks: int = 500_000, months: int = 24) -> None:
+    admin_engine = create_async_engine(str(settings.db.url), poolclass=NullPool)
+    async with admin_engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    engine = create_async_engine(
+        str(settings.db.url),
+        poolclass=NullPool,
+        connect_args={"server_settings": {"search_path": f"{SCHEMA}, public"}},
+        execution_options={"schema_translate_map": {None: SCHEMA}},
+    )
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        await seed(session_factory, tasks, months)
+        await analyze(engine)
+        plain = await measure(session_factory)
+        async with engine.begin() as conn:
+            await conn.run_sync(convert_to_partitioned, date.today(), 3)
+        await analyze(engine)
+        partitioned = await measure(session_factory)
+    finally:
+        await engine.dispose()
+        async with admin_engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await admin_engine.dispose()
+
+    print(f"{tasks} tasks over {months} months, median of {REPEATS} runs")
+    print(f"{'query':<26} {'plain ms':>10} {'partitioned ms':>15}")
+    for name in queries:
+        print(f"{name:<26} {plain[name]:>10.2f} {partitioned[name]:>15.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 500_000,
+            int(sys.argv[2]) if len(sys.argv) > 2 else 24,
+        )
+    )
@@ -1,8 +1,20 @@
 from collections.abc import AsyncGenerator
 
 import pytest
+from api.response_cache import task_response_cache
 from core.config import settings
+from core.crud.cache import (
+    api_key_cache,
+    epoch_cache,
+    missing_username_cache,
+    task_versions,
+    user_cache,
+    username_cache,
+)
 from core.models import Base, db_helper
+from core.utils.invalidation_triggers import TRIGGER_FUNCTIONS, create_trigger
+from core.utils.rate_limit import login_admission
+from core.utils.revocation import revocation_list
 from httpx import ASGITransport, AsyncClient
 from main import todo_app
 from sqlalchemy import NullPool, text
@@ -58,9 +70,25 @@ def pytest_configure(config):
 @pytest.fixture(autouse=True)
 async def prepare_db(request):
     assert settings.db.mode == "TEST"
+    user_cache.clear()
+    epoch_cache.clear()
+    api_key_cache.clear()
+    task_response_cache.clear()
+    task_versions.clear()
+    username_cache.clear()
+    missing_username_cache.clear()
+    revocation_list.clear()
+    login_admission.clear()
     async with test_engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
     async with test_engine.begin() as conn:
+        if await conn.scalar(
+            text(
+                "SELECT EXISTS "
+                "(SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm')"
+            )
+        ):
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         await conn.run_sync(Base.metadata.create_all)
     async with test_session_factory() as conn:
         await conn.begin()
@@ -89,6 +117,23 @@ async def prepare_db(request):
             )
         )
         await conn.commit()
+        await conn.execute(
+            text(
+                """
+            CREATE TRIGGER last_update_trigger
+            BEFORE UPDATE ON tasks
+            FOR EACH ROW
+            EXECUTE FUNCTION update_last_update_column();
+            """
+            )
+        )
+        await conn.commit()
+        for table, function in TRIGGER_FUNCTIONS.items():
+            await conn.execute(text(function))
+            await conn.execute(
+                text(create_trigger(table, settings.db.invalidation_bus.channel))
+            )
+        await conn.commit()
     yield
     if not (
         request.config.getoption("--skip-delete-DB")
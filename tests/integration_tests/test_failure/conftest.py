@@ -1,6 +1,7 @@
 from typing import Any
 
 import pytest
+from core.crud.cache import epoch_cache, user_cache
 from core.models import User
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -49,6 +50,8 @@ async def mutated(
         for attr, value in attrs.items():
             setattr(user_obj, attr, value)
         await test_session.commit()
+        user_cache.pop(user_obj.id)
+        epoch_cache.pop(user_obj.id)
         await test_session.refresh(user_obj)
         if "role" in attrs:
             new_auth_info = await authentication(
@@ -133,3 +133,48 @@ async def test_endpoint_auth_user_logout(
     assert response.json().get("detail") == expected_details
     assert response.json().get("detail") != "Logout successful"
     assert response.headers.get("set-cookie") is None
+
+
+@pytest.mark.asyncio
+async def test_endpoint_auth_user_login_throttled(
+    async_client: AsyncClient,
+    test_user_c: dict,
+):
+    login_data = {
+        "username": test_user_c["user"].username,
+        "password": "wrong_pass",
+    }
+    for _ in range(settings.api.auth_jwt.login_throttle.per_username_limit):
+        response = await async_client.post(
+            url=f"{settings.api.auth_jwt.prefix}/login/",
+            data=login_data,
+        )
+        assert response.status_code == 401
+
+    login_data["password"] = test_user_c["password"]
+    response = await async_client.post(
+        url=f"{settings.api.auth_jwt.prefix}/login/",
+        data=login_data,
+    )
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
+    assert "access_token" not in response.json()
+
+
+@pytest.mark.asyncio
+async def test_endpoint_auth_api_key_name_too_long(
+    async_client: AsyncClient,
+    test_user,
+):
+    response = await async_client.post(
+        url=f"{settings.api.auth_jwt.prefix}/api-keys/",
+        headers=test_user.get("headers"),
+        json={"name": "k" * 71},
+    )
+    assert response.status_code == 422
+
+    response = await async_client.get(
+        url=f"{settings.api.auth_jwt.prefix}/api-keys/",
+        headers=test_user.get("headers"),
+    )
+    assert response.json() == []
@@ -1,7 +1,13 @@
+import bcrypt
+import jwt
 import pytest
 from core.config import settings
+from core.models import User
+from core.utils.password_hashers import default_hasher, password_needs_rehash
 from httpx import AsyncClient
 
+from tests.integration_tests.factories import UserFactory, create
+
 
 @pytest.mark.asyncio
 async def test_endpoint_auth_user_login(
@@ -51,3 +57,104 @@ async def test_endpoint_auth_user_logout(
     assert response.json().get("detail") == "Logout successful"
     cookies = response.headers.get("set-cookie")
     assert "Max-Age=0" in cookies
+
+    async_client.cookies.clear()
+    response = await async_client.get(
+        url=f"{settings.api.user.prefix}/profile/",
+        headers=test_user.get("headers"),
+    )
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_endpoint_jwks(
+    async_client: AsyncClient,
+    test_user,
+):
+    response = await async_client.get(
+        url=f"http://test{settings.api.auth_jwt.jwks_path}",
+    )
+    assert response.status_code == 200
+    token_kid = jwt.get_unverified_header(test_user.get("access_token"))["kid"]
+    assert token_kid in {key["kid"] for key in response.json()["keys"]}
+
+
+@pytest.mark.asyncio
+async def test_endpoint_auth_user_login_rehashes_outdated_password(
+    async_client: AsyncClient,
+    test_session,
+):
+    password = "outdated_pass"
+    old_hash = bcrypt.hashpw(password.encode(), bcrypt.gensalt(4)).decode()
+    user = await create(UserFactory, password=old_hash)
+    assert password_needs_rehash(old_hash)
+
+    response = await async_client.post(
+        url=f"{settings.api.auth_jwt.prefix}/login/",
+        data={"username": user.username, "password": password},
+    )
+    assert response.status_code == 200
+
+    user_in_db = await test_session.get(User, user.id)
+    assert user_in_db.password != old_hash
+    assert default_hasher.identify(user_in_db.password)
+    assert not password_needs_rehash(user_in_db.password)
+
+
+@pytest.mark.asyncio
+async def test_endpoint_auth_api_key_lifecycle(
+    async_client: AsyncClient,
+    test_user,
+):
+    response = await async_client.post(
+        url=f"{settings.api.auth_jwt.prefix}/api-keys/",
+        headers=test_user.get("headers"),
+        json={"name": "ci"},
+    )
+    assert response.status_code == 201
+    api_key = response.json()
+    assert api_key["key"].startswith(api_key["prefix"])
+    assert api_key["user_id"] == test_user.get("user").id
+
+    response = await async_client.get(
+        url=f"{settings.api.auth_jwt.prefix}/api-keys/",
+        headers=test_user.get("headers"),
+    )
+    assert [key["id"] for key in response.json()] == [api_key["id"]]
+    assert "key" not in response.json()[0]
+
+    async_client.cookies.clear()
+    api_key_headers = {settings.api.auth_jwt.api_key.header_name: api_key["key"]}
+    response = await async_client.get(
+        url=f"{settings.api.user.prefix}/profile/",
+        headers=api_key_headers,
+    )
+    assert response.status_code == 200
+    assert response.json().get("username") == test_user.get("user").username
+
+    response = await async_client.delete(
+        url=f"{settings.api.auth_jwt.prefix}/api-keys/{api_key['id']}/",
+        headers=api_key_headers,
+    )
+    assert response.status_code == 200
+    assert response.json().get("detail") == "API key revoked"
+
+    response = await async_client.get(
+        url=f"{settings.api.user.prefix}/profile/",
+        headers=api_key_headers,
+    )
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_endpoint_internal_metrics(
+    async_client: AsyncClient,
+    admin_user,
+):
+    response = await async_client.get(
+        url=f"{settings.api.internal.prefix}/metrics/",
+        headers=admin_user.get("headers"),
+    )
+    assert response.status_code == 200
+    assert response.json()["auth_decode_seconds"]["count"] >= 1
+    assert response.json()["auth_token_seconds"]["type"] == "histogram"
@@ -0,0 +1,165 @@
+import asyncio
+from collections.abc import Callable
+
+import pytest
+from api.schemas import UserSchmExtended
+from core.config import settings
+from core.crud.cache import api_key_cache, user_cache, username_cache
+from core.utils.invalidation import (
+    InvalidationBus,
+    flushes,
+    listener_failures,
+    received_messages,
+)
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def _wait_until(condition: Callable[[], bool]) -> None:
+    async with asyncio.timeout(5):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+async def invalidation_bus():
+    bus = InvalidationBus(
+        enabled=True,
+        channel=settings.db.invalidation_bus.channel,
+        reconnect_interval=0.05,
+        health_check_interval=0.05,
+    )
+    bus.start(str(settings.db.url))
+    await _wait_until(lambda: bus.connected)
+    yield bus
+    await bus.stop()
+
+
+@pytest.mark.asyncio
+async def test_invalidation_bus_applies_notifications(
+    invalidation_bus: InvalidationBus,
+    async_client: AsyncClient,
+    test_session: AsyncSession,
+    test_user_a: dict,
+):
+    user = test_user_a["user"]
+    received_before = received_messages.value
+    response = await async_client.post(
+        f"{settings.api.task.prefix}/",
+        json={"name": "notified task", "scheduled_hours": 1},
+        headers=test_user_a["headers"],
+    )
+    assert response.status_code == 201
+    await _wait_until(lambda: received_messages.value > received_before)
+
+    user_cache.set(user.id, UserSchmExtended.model_validate(user))
+    username_cache.set(user.username, object())
+    await test_session.execute(
+        text("UPDATE users SET name = 'renamed' WHERE id = :id"),
+        {"id": user.id},
+    )
+    await test_session.commit()
+    await _wait_until(
+        lambda: user_cache.get(user.id) is None
+        and username_cache.get(user.username) is None
+    )
+
+
+@pytest.mark.asyncio
+async def test_invalidation_bus_applies_api_key_revocation(
+    invalidation_bus: InvalidationBus,
+    test_session: AsyncSession,
+    test_user_a: dict,
+):
+    user = test_user_a["user"]
+    await test_session.execute(
+        text(
+            "INSERT INTO api_keys (user_id, name, prefix, digest) "
+            "VALUES (:user_id, 'key', 'prefix', 'digest')"
+        ),
+        {"user_id": user.id},
+    )
+    await test_session.commit()
+    api_key_cache.set("digest", user.id)
+    await test_session.execute(text("UPDATE api_keys SET revoked = true"))
+    await test_session.commit()
+    await _wait_until(lambda: api_key_cache.get("digest") is None)
+
+
+@pytest.mark.asyncio
+async def test_invalidation_bus_flushes_after_reconnect(
+    invalidation_bus: InvalidationBus,
+    test_session: AsyncSession,
+    test_user_a: dict,
+):
+    user = test_user_a["user"]
+    user_cache.set(user.id, UserSchmExtended.model_validate(user))
+    flushes_before = flushes.value
+    await test_session.execute(
+        text(
+            "SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+            "WHERE application_name = 'invalidation_bus'"
+        )
+    )
+    await _wait_until(
+        lambda: flushes.value > flushes_before and invalidation_bus.connected
+    )
+    assert user_cache.get(user.id) is None
+
+
+@pytest.mark.asyncio
+async def test_invalidation_bus_bypasses_caches_while_disconnected(
+    test_session: AsyncSession,
+    test_user_a: dict,
+):
+    user = test_user_a["user"]
+    cached_user = UserSchmExtended.model_validate(user)
+    bus = InvalidationBus(
+        enabled=True,
+        channel=settings.db.invalidation_bus.channel,
+        reconnect_interval=1,
+        health_check_interval=10,
+    )
+    bus.start(str(settings.db.url))
+    try:
+        await _wait_until(lambda: bus.connected)
+        user_cache.set(user.id, cached_user)
+        await test_session.execute(
+            text(
+                "SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+                "WHERE application_name = 'invalidation_bus'"
+            )
+        )
+        await _wait_until(lambda: not bus.connected)
+        assert user_cache.get(user.id) is None
+        user_cache.set(user.id, cached_user)
+        assert user_cache.get(user.id) is None
+
+        await _wait_until(lambda: bus.connected)
+        user_cache.set(user.id, cached_user)
+        assert user_cache.get(user.id) is not None
+    finally:
+        await bus.stop()
+
+
+@pytest.mark.asyncio
+async def test_invalidation_bus_rejects_unpublished_channel(
+    test_user_a: dict,
+):
+    user = test_user_a["user"]
+    bus = InvalidationBus(
+        enabled=True,
+        channel="other_channel",
+        reconnect_interval=0.05,
+        health_check_interval=0.05,
+    )
+    failures_before = listener_failures.value
+    bus.start(str(settings.db.url))
+    try:
+        await _wait_until(lambda: listener_failures.value > failures_before)
+        assert not bus.connected
+        user_cache.set(user.id, UserSchmExtended.model_validate(user))
+        assert user_cache.get(user.id) is None
+    finally:
+        await bus.stop()
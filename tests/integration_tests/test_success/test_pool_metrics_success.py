@@ -0,0 +1,59 @@
+import pytest
+from core.config import settings
+from core.models.db_helper import DatabaseHelper
+from core.utils import metrics
+from core.utils.pool_metrics import request_scope
+from sqlalchemy import exc, text
+
+
+@pytest.fixture
+async def pool_helper():
+    helper = DatabaseHelper(
+        url=str(settings.db.url),
+        echo=False,
+        echo_pool=False,
+        pool_size=1,
+        max_overflow=0,
+    )
+    yield helper
+    await helper.dispose()
+
+
+@pytest.mark.asyncio
+async def test_pool_metrics_checkout_and_hold(mocker, pool_helper):
+    checkout_wait = metrics.histogram(
+        metrics.labelled("db_pool_checkout_wait_seconds", pool="primary")
+    )
+    endpoint_hold = metrics.histogram(
+        metrics.labelled("db_pool_hold_seconds", pool="primary", endpoint="/pool/")
+    )
+    observed_wait, observed_hold = checkout_wait.count, endpoint_hold.count
+    checked_out = metrics.gauge(metrics.labelled("db_pool_checked_out", pool="primary"))
+
+    token = request_scope.set({"route": mocker.Mock(path="/pool/")})
+    try:
+        async with pool_helper.session_factory() as session:
+            await session.execute(text("SELECT 1"))
+            assert checked_out.value == 1
+    finally:
+        request_scope.reset(token)
+
+    assert checkout_wait.count == observed_wait + 1
+    assert endpoint_hold.count == observed_hold + 1
+    assert checked_out.value == 0
+
+
+@pytest.mark.asyncio
+async def test_pool_metrics_timeout(pool_helper):
+    timeouts = metrics.counter(
+        metrics.labelled("db_pool_timeouts_total", pool="primary")
+    )
+    observed = timeouts.value
+    pool_helper.engine.sync_engine.pool._timeout = 0.05
+
+    async with pool_helper.engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            async with pool_helper.engine.connect():
+                pass
+
+    assert timeouts.value == observed + 1
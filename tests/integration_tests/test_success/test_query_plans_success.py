@@ -0,0 +1,168 @@
+import json
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from api.schemas import SearchTaskSchm, UpdateTaskSchm, UserSchmExtended
+from core.config import settings
+from core.crud import task as task_crud
+from core.crud import user as user_crud
+from core.utils.task_status import TASK_STATUS_CODES
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from tests.integration_tests import database
+
+USERS_COUNT = 5_000
+TASK_OWNERS_COUNT = 200
+TASKS_COUNT = 20_000
+NOW = datetime.now(UTC)
+
+seeded_user = UserSchmExtended(
+    id=7,
+    active=True,
+    username="plan_user_7",
+    created_at=NOW,
+    last_update_at=None,
+    role=settings.roles.user,
+)
+
+
+async def _stream_user_tasks(session: AsyncSession) -> None:
+    async for _ in task_crud.stream_user_all_tasks(session, seeded_user.id, 100):
+        pass
+
+
+crud_calls = {
+    "all_tasks_first_page": lambda s: task_crud.get_all_tasks(s, 101),
+    "all_tasks_next_page": lambda s: task_crud.get_all_tasks(s, 101, (100, 10_000)),
+    "user_tasks": lambda s: task_crud.get_user_all_tasks(s, seeded_user),
+    "user_tasks_next_page": lambda s: task_crud.get_user_all_tasks(
+        s, seeded_user, 11, (seeded_user.id, 5_000)
+    ),
+    "user_tasks_fingerprint": lambda s: task_crud.get_user_tasks_fingerprint(
+        s, seeded_user, 101
+    ),
+    "stream_user_tasks": _stream_user_tasks,
+    "search_by_id": lambda s: task_crud.get_tasks_by_some_statement(
+        s, SearchTaskSchm(id=123), 101
+    ),
+    "search_by_name": lambda s: task_crud.get_tasks_by_some_statement(
+        s, SearchTaskSchm(name="task 123"), 101
+    ),
+    "search_by_user_id": lambda s: task_crud.get_tasks_by_some_statement(
+        s, SearchTaskSchm(user_id=seeded_user.id), 101
+    ),
+    "search_by_status": lambda s: task_crud.get_tasks_by_some_statement(
+        s, SearchTaskSchm(status=settings.tstat.cmp), 101
+    ),
+    "search_by_start_at": lambda s: task_crud.get_tasks_by_some_statement(
+        s, SearchTaskSchm(start_at=NOW - timedelta(minutes=10)), 101
+    ),
+    "search_by_end_at": lambda s: task_crud.get_tasks_by_some_statement(
+        s, SearchTaskSchm(end_at=NOW + timedelta(minutes=10)), 101
+    ),
+    "search_contains": lambda s: task_crud.get_tasks_by_some_statement(
+        s, SearchTaskSchm(contains="ASK 1234"), 101
+    ),
+    "search_fulltext": lambda s: task_crud.get_ranked_tasks(
+        s, SearchTaskSchm(query="1234"), 101
+    ),
+    "search_fulltext_next_page": lambda s: task_crud.get_ranked_tasks(
+        s, SearchTaskSchm(query="task 1234"), 101, (-0.1, 100)
+    ),
+    "task_by_id": lambda s: task_crud.get_task_by_id(s, 123),
+    "task_fingerprint": lambda s: task_crud.get_task_fingerprint(s, 123),
+    "task_exists": lambda s: task_crud.task_exists(s, 123),
+    "update_task": lambda s: task_crud.update_task(
+        s, 207, UpdateTaskSchm(name="renamed"), seeded_user
+    ),
+    "change_task_owner": lambda s: task_crud.change_task_owner(
+        s, 207, seeded_user.id + 1, seeded_user
+    ),
+    "delete_task": lambda s: task_crud.delete_task(s, 407, seeded_user),
+    "all_users_next_page": lambda s: user_crud.get_all_users(s, 101, (100,)),
+    "user_by_username": lambda s: user_crud.get_user_by_username(s, "plan_user_42"),
+}
+
+
+@pytest.fixture
+async def seeded_tasks(test_session: AsyncSession):
+    await test_session.execute(
+        text(
+            "INSERT INTO users (id, username, password) "
+            "SELECT g, 'plan_user_' || g, 'x' FROM generate_series(1, :users) g"
+        ),
+        {"users": USERS_COUNT},
+    )
+    await test_session.execute(
+        text(
+            "INSERT INTO tasks (name, description, user_id, status, start_at, end_at) "
+            "SELECT 'task ' || g, 'note w' || g % 1000, 1 + g % :owners, "
+            "g % :statuses, "
+            "CAST(:now AS timestamptz) - g * interval '1 minute', "
+            "CAST(:now AS timestamptz) + g * interval '1 minute' "
+            "FROM generate_series(1, :tasks) g"
+        ),
+        {
+            "owners": TASK_OWNERS_COUNT,
+            "tasks": TASKS_COUNT,
+            "statuses": len(TASK_STATUS_CODES),
+            "now": NOW,
+        },
+    )
+    await test_session.commit()
+    async with database.test_engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE users"))
+        await conn.execute(text("VACUUM ANALYZE tasks"))
+
+
+def _seq_scans(plan: dict) -> list[str]:
+    scans = []
+    if plan["Node Type"] == "Seq Scan":
+        scans.append(plan["Relation Name"])
+    for sub_plan in plan.get("Plans", []):
+        scans.extend(_seq_scans(sub_plan))
+    return scans
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("call_name", crud_calls)
+async def test_crud_statements_use_indexes(
+    seeded_tasks,
+    test_session: AsyncSession,
+    call_name: str,
+):
+    if call_name == "search_contains" and not await test_session.scalar(
+        text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")
+    ):
+        pytest.skip("pg_trgm is not installed")
+    statements = []
+
+    def capture(_conn, _cursor, statement, parameters, _context, _executemany):
+        statements.append((statement, parameters))
+
+    sync_engine = database.test_engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", capture)
+    try:
+        async with database.test_session_factory() as session:
+            await crud_calls[call_name](session)
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", capture)
+
+    statements = [
+        (statement, parameters)
+        for statement, parameters in statements
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE", "WITH"))
+    ]
+    assert statements
+    connection = await test_session.connection()
+    for statement, parameters in statements:
+        result = await connection.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {statement}",
+            parameters,
+        )
+        plan = result.scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        assert _seq_scans(plan[0]["Plan"]) == [], f"{call_name}: {statement}"
@@ -0,0 +1,178 @@
+import json
+from datetime import date, datetime, timedelta
+
+import pytest
+from api.schemas import SearchTaskSchm
+from core.crud import task as task_crud
+from core.utils.task_partitions import (
+    DEFAULT_PARTITION,
+    MAINTENANCE_LOCK_ID,
+    add_months,
+    convert_to_partitioned,
+    convert_to_plain,
+    is_partitioned,
+    list_partitions,
+    maintain_partitions,
+    month_start,
+    partition_name,
+)
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from tests.integration_tests import database
+
+TODAY = date.today()
+TASKS_COUNT = 400
+
+
+@pytest.fixture
+async def partitioned_tasks():
+    async with database.test_engine.begin() as conn:
+        await conn.execute(
+            text("INSERT INTO users (id, username, password) VALUES (1, 'p', 'x')")
+        )
+        await conn.execute(
+            text(
+                "INSERT INTO tasks (name, user_id, scheduled_hours, created_at) "
+                "SELECT 'task ' || g, 1, 1, "
+                "CAST(:today AS timestamp) - g * interval '1 day' "
+                "FROM generate_series(1, :tasks) g"
+            ),
+            {"today": TODAY, "tasks": TASKS_COUNT},
+        )
+        assert await conn.run_sync(convert_to_partitioned, TODAY, 2)
+    yield
+    async with database.test_engine.begin() as conn:
+        await conn.execute(
+            text(
+                "DO $$ DECLARE name text; BEGIN "
+                "FOR name IN SELECT tablename FROM pg_tables "
+                "WHERE tablename ~ '^tasks_(p[0-9]{6}|default)$' "
+                "LOOP EXECUTE format('DROP TABLE %I', name); END LOOP; END $$"
+            )
+        )
+
+
+def _relations(plan: dict) -> set[str]:
+    relations = {plan["Relation Name"]} if "Relation Name" in plan else set()
+    for sub_plan in plan.get("Plans", []):
+        relations |= _relations(sub_plan)
+    return relations
+
+
+@pytest.mark.asyncio
+async def test_convert_keeps_rows_and_creates_future_partitions(
+    partitioned_tasks,
+    test_session: AsyncSession,
+):
+    connection = await test_session.connection()
+    assert await connection.run_sync(is_partitioned)
+    partitions = await connection.run_sync(list_partitions)
+    assert partition_name(add_months(month_start(TODAY), 2)) in partitions
+    assert DEFAULT_PARTITION in partitions
+    assert await test_session.scalar(text("SELECT count(*) FROM tasks")) == (
+        TASKS_COUNT
+    )
+    await test_session.rollback()
+
+    async with database.test_session_factory() as session:
+        found = await task_crud.get_tasks_by_some_statement(
+            session,
+            SearchTaskSchm(
+                user_id=1,
+                created_after=datetime.combine(TODAY, datetime.min.time())
+                - timedelta(days=10),
+            ),
+        )
+    assert found is not None
+    assert len(found) == 10
+
+
+@pytest.mark.asyncio
+async def test_recent_search_prunes_partitions(
+    partitioned_tasks,
+    test_session: AsyncSession,
+):
+    created_after = datetime.combine(month_start(TODAY), datetime.min.time())
+    result = await test_session.execute(
+        text(
+            "EXPLAIN (FORMAT JSON) SELECT * FROM tasks "
+            "WHERE user_id = 1 AND created_at >= :created_after"
+        ),
+        {"created_after": created_after},
+    )
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    scanned = _relations(plan[0]["Plan"])
+    assert partition_name(month_start(TODAY)) in scanned
+    assert partition_name(add_months(month_start(TODAY), -1)) not in scanned
+
+
+@pytest.mark.asyncio
+async def test_maintain_detaches_expired_partitions(partitioned_tasks):
+    async with database.test_engine.begin() as conn:
+        expired = await conn.run_sync(maintain_partitions, TODAY, 3, 2, True)
+        partitions = await conn.run_sync(list_partitions)
+        remaining = await conn.scalar(text("SELECT min(created_at) FROM tasks"))
+    assert partition_name(add_months(month_start(TODAY), -3)) in expired
+    assert partition_name(add_months(month_start(TODAY), -2)) in partitions
+    assert partition_name(add_months(month_start(TODAY), 3)) in partitions
+    assert remaining >= datetime.combine(
+        add_months(month_start(TODAY), -2), datetime.min.time()
+    )
+
+
+@pytest.mark.asyncio
+async def test_revert_restores_plain_table(partitioned_tasks):
+    async with database.test_engine.begin() as conn:
+        assert await conn.run_sync(convert_to_plain)
+        assert not await conn.run_sync(is_partitioned)
+        assert await conn.scalar(text("SELECT count(*) FROM tasks")) == TASKS_COUNT
+        new_id = await conn.scalar(
+            text(
+                "INSERT INTO tasks (name, user_id, scheduled_hours) "
+                "VALUES ('new', 1, 1) RETURNING id"
+            )
+        )
+    assert new_id == TASKS_COUNT + 1
+
+
+@pytest.mark.asyncio
+async def test_default_partition_catches_rows_until_maintenance(partitioned_tasks):
+    future = add_months(month_start(TODAY), 3)
+    async with database.test_engine.begin() as conn:
+        await conn.execute(
+            text(
+                "INSERT INTO tasks (name, user_id, scheduled_hours, created_at) "
+                "VALUES ('future', 1, 1, :created_at)"
+            ),
+            {"created_at": future + timedelta(days=1)},
+        )
+        assert await conn.scalar(text(f"SELECT count(*) FROM {DEFAULT_PARTITION}"))
+        await conn.run_sync(maintain_partitions, TODAY, 3, None, False)
+        partitions = await conn.run_sync(list_partitions)
+        moved = await conn.scalar(
+            text(f"SELECT count(*) FROM {partition_name(future)}")
+        )
+        stranded = await conn.scalar(text(f"SELECT count(*) FROM {DEFAULT_PARTITION}"))
+    assert DEFAULT_PARTITION in partitions
+    assert (moved, stranded) == (1, 0)
+
+
+@pytest.mark.asyncio
+async def test_maintain_skips_while_another_worker_holds_lock(partitioned_tasks):
+    async with database.test_engine.connect() as holder:
+        await holder.execute(
+            text("SELECT pg_advisory_lock(:lock_id)"),
+            {"lock_id": MAINTENANCE_LOCK_ID},
+        )
+        async with database.test_engine.begin() as conn:
+            expired = await conn.run_sync(maintain_partitions, TODAY, 3, 0, True)
+            partitions = await conn.run_sync(list_partitions)
+        await holder.execute(
+            text("SELECT pg_advisory_unlock(:lock_id)"),
+            {"lock_id": MAINTENANCE_LOCK_ID},
+        )
+    assert expired == []
+    assert partition_name(add_months(month_start(TODAY), 3)) not in partitions
@@ -1,13 +1,23 @@
-from datetime import datetime
+import itertools
+import json
+from datetime import datetime, timedelta
 
 import pytest
 from api.schemas import UserSchmExtended
 from api.schemas.task import TaskSchm
 from core.config import settings
 from core.crud import task as task_crud
+from core.models import TaskArchive, User, db_helper
+from core.utils import metrics
+from core.utils.task_archiver import TaskArchiver
 from httpx import AsyncClient
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from tests.integration_tests import database
+from tests.integration_tests.factories import TaskFactory, create
+
 
 @pytest.mark.asyncio
 async def test_endpoint_get_all_tasks(
@@ -90,6 +100,64 @@ async def test_endpoint_search_task_by_parameters(
                 assert actual_val == expected_val
 
 
+@pytest.mark.asyncio
+async def test_endpoint_search_task_contains(
+    async_client: AsyncClient,
+    test_user_a: dict,
+):
+    user = test_user_a["user"]
+    matched = [
+        await create(TaskFactory, user=user, name="Buy 100% milk"),
+        await create(TaskFactory, user=user, name="x", description="MILK run"),
+    ]
+    await create(TaskFactory, user=user, name="Buy 100 bread", description="none")
+    response = await async_client.get(
+        url=f"{settings.api.task.prefix}/search/",
+        params={"contains": "mIlK", "user_id": user.id},
+        headers=test_user_a["headers"],
+    )
+    assert response.status_code == 200
+    assert [task["id"] for task in response.json()] == [task.id for task in matched]
+
+    response = await async_client.get(
+        url=f"{settings.api.task.prefix}/search/",
+        params={"contains": "100%", "user_id": user.id},
+        headers=test_user_a["headers"],
+    )
+    assert [task["id"] for task in response.json()] == [matched[0].id]
+
+
+@pytest.mark.asyncio
+async def test_endpoint_search_task_fulltext_ranked_pages(
+    async_client: AsyncClient,
+    test_user_a: dict,
+):
+    user = test_user_a["user"]
+    weak = await create(TaskFactory, user=user, name="report", description="misc")
+    strong = await create(
+        TaskFactory,
+        user=user,
+        name="quarterly report",
+        description="report for the quarterly report review",
+    )
+    middle = await create(
+        TaskFactory,
+        user=user,
+        name="report draft",
+        description="report",
+    )
+    await create(TaskFactory, user=user, name="unrelated", description="nothing")
+    url: str | None = f"{settings.api.task.prefix}/search/?query=report&limit=1"
+    found: list[int] = []
+    while url:
+        response = await async_client.get(url=url, headers=test_user_a["headers"])
+        assert response.status_code == 200
+        assert len(response.json()) <= 1
+        found.extend(task["id"] for task in response.json())
+        url = response.links.get("next", {}).get("url")
+    assert found == [strong.id, middle.id, weak.id]
+
+
 @pytest.mark.asyncio
 async def test_endpoint_get_task_by_user_id(
     async_client: AsyncClient,
@@ -127,6 +195,102 @@ async def test_endpoint_get_user_all_tasks(
     assert response.json() == expected
 
 
+@pytest.mark.asyncio
+async def test_endpoint_get_all_tasks_keyset_pages(
+    async_client: AsyncClient,
+    test_session: AsyncSession,
+    admin_user: dict,
+    test_multiple_tasks_a: dict,
+    test_multiple_tasks_b: dict,
+):
+    tasks = await task_crud.get_all_tasks(test_session)
+    expected = [TaskSchm.model_validate(t).model_dump(mode="json") for t in tasks]
+    url: str | None = f"{settings.api.task.prefix}/all/?limit=3"
+    pages = []
+    while url:
+        response = await async_client.get(url=url, headers=admin_user.get("headers"))
+        assert response.status_code == 200
+        assert len(response.json()) <= 3
+        pages.extend(response.json())
+        url = response.links.get("next", {}).get("url")
+    assert pages == expected
+
+
+@pytest.mark.asyncio
+async def test_endpoint_get_all_tasks_ndjson(
+    mocker,
+    async_client: AsyncClient,
+    test_session: AsyncSession,
+    admin_user: dict,
+    test_multiple_tasks_a: dict,
+    test_multiple_tasks_b: dict,
+):
+    mocker.patch.object(db_helper, "session_factory", database.test_session_factory)
+    tasks = await task_crud.get_all_tasks(test_session)
+    expected = [TaskSchm.model_validate(t).model_dump(mode="json") for t in tasks]
+    response = await async_client.get(
+        url=f"{settings.api.task.prefix}/all/",
+        headers={"Accept": "application/x-ndjson", **admin_user["headers"]},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line) for line in response.text.splitlines()] == expected
+
+
+@pytest.mark.asyncio
+async def test_endpoint_get_task_by_user_id_ndjson(
+    mocker,
+    async_client: AsyncClient,
+    admin_user: dict,
+    test_multiple_tasks: dict,
+):
+    mocker.patch.object(db_helper, "session_factory", database.test_session_factory)
+    response = await async_client.get(
+        url=f"{settings.api.task.prefix}/by-user/{test_multiple_tasks["user"].id}/",
+        headers={"Accept": "application/x-ndjson", **admin_user["headers"]},
+    )
+    assert response.status_code == 200
+    expected = [
+        TaskSchm.model_validate(t).model_dump(mode="json")
+        for t in test_multiple_tasks["task_list"]
+    ]
+    assert [json.loads(line) for line in response.text.splitlines()] == expected
+
+
+@pytest.mark.asyncio
+async def test_endpoint_get_user_all_tasks_from_replica(
+    mocker,
+    async_client: AsyncClient,
+    test_task_a: dict,
+    test_task_to_create: dict,
+):
+    replica_factory = mocker.Mock(side_effect=database.test_session_factory)
+    mocker.patch.object(db_helper, "replica_session_factories", [replica_factory])
+    mocker.patch.object(db_helper, "_replicas", itertools.repeat(replica_factory))
+    async_client.cookies.clear()
+
+    response = await async_client.get(
+        url=f"{settings.api.task.prefix}/",
+        headers=test_task_a.get("headers"),
+    )
+    assert response.status_code == 200
+    assert [task["id"] for task in response.json()] == [test_task_a["task"].id]
+    assert replica_factory.call_count == 1
+
+    response = await async_client.post(
+        url=f"{settings.api.task.prefix}/",
+        headers=test_task_a.get("headers"),
+        json=test_task_to_create,
+    )
+    assert response.status_code == 201
+    response = await async_client.get(
+        url=f"{settings.api.task.prefix}/",
+        headers=test_task_a.get("headers"),
+    )
+    assert len(response.json()) == 2
+    assert replica_factory.call_count == 1
+
+
 @pytest.mark.asyncio
 async def test_endpoint_get_task_by_task_id(
     async_client: AsyncClient,
@@ -286,3 +450,171 @@ async def test_endpoint_delete_task_by_admin(
         headers=admin_user.get("headers"),
     )
     assert response.status_code == 204
+
+
+@pytest.mark.asyncio
+async def test_archive_completed_tasks_and_include_archived(
+    async_client: AsyncClient,
+    test_user_a: dict,
+):
+    user = test_user_a["user"]
+    old = datetime.now() - timedelta(days=60)
+    archived = [
+        await create(TaskFactory, user=user, status=settings.tstat.cmp, created_at=old)
+        for _ in range(3)
+    ]
+    recent_completed = await create(TaskFactory, user=user, status=settings.tstat.cmp)
+    old_active = await create(
+        TaskFactory, user=user, status=settings.tstat.atw, created_at=old
+    )
+    archiver = TaskArchiver(
+        min_age=timedelta(days=30),
+        batch_size=2,
+        pause=0,
+        interval=60,
+    )
+    assert await archiver.run(database.test_session_factory) == len(archived)
+    assert await archiver.run(database.test_session_factory) == 0
+
+    response = await async_client.get(
+        url=f"{settings.api.task.prefix}/",
+        headers=test_user_a["headers"],
+    )
+    assert [task["id"] for task in response.json()] == [
+        recent_completed.id,
+        old_active.id,
+    ]
+
+    response = await async_client.get(
+        url=f"{settings.api.task.prefix}/",
+        params={"include_archived": True, "limit": 3},
+        headers=test_user_a["headers"],
+    )
+    first_page = [task["id"] for task in response.json()]
+    response = await async_client.get(
+        url=response.links["next"]["url"],
+        headers=test_user_a["headers"],
+    )
+    assert first_page + [task["id"] for task in response.json()] == [
+        task.id for task in [*archived, recent_completed, old_active]
+    ]
+
+    response = await async_client.get(
+        url=f"{settings.api.task.prefix}/search/",
+        params={
+            "status": settings.tstat.cmp,
+            "user_id": user.id,
+            "include_archived": True,
+        },
+        headers=test_user_a["headers"],
+    )
+    assert [task["id"] for task in response.json()] == [
+        task.id for task in [*archived, recent_completed]
+    ]
+    assert all(task["status"] == settings.tstat.cmp for task in response.json())
+
+
+@pytest.mark.asyncio
+async def test_archived_tasks_block_user_delete(test_user_a: dict):
+    user = test_user_a["user"]
+    old = datetime.now() - timedelta(days=60)
+    await create(TaskFactory, user=user, status=settings.tstat.cmp, created_at=old)
+    archiver = TaskArchiver(
+        min_age=timedelta(days=30),
+        batch_size=10,
+        pause=0,
+        interval=60,
+    )
+    assert await archiver.run(database.test_session_factory) == 1
+
+    async with database.test_session_factory() as session:
+        with pytest.raises(IntegrityError):
+            await session.execute(delete(User).where(User.id == user.id))
+    async with database.test_session_factory() as session:
+        archived = await session.scalar(
+            select(func.count()).where(TaskArchive.user_id == user.id)
+        )
+    assert archived == 1
+
+
+@pytest.mark.asyncio
+async def test_task_response_cache_follows_writes(
+    async_client: AsyncClient,
+    test_user_a: dict,
+    test_user_b: dict,
+    admin_user: dict,
+):
+    url = f"{settings.api.task.prefix}/"
+    search_url = f"{settings.api.task.prefix}/search/"
+    hits = metrics.counter("task_response_cache_hits_total")
+    first = await async_client.get(url, headers=test_user_a["headers"])
+    hits_before = hits.value
+    second = await async_client.get(url, headers=test_user_a["headers"])
+    assert second.content == first.content
+    assert hits.value == hits_before + 1
+
+    response = await async_client.post(
+        url,
+        json={"name": "cached task", "scheduled_hours": 1},
+        headers=test_user_a["headers"],
+    )
+    task_id = response.json()["id"]
+    response = await async_client.get(url, headers=test_user_a["headers"])
+    assert task_id in [task["id"] for task in response.json()]
+    search = await async_client.get(
+        search_url,
+        params={"name": "cached task"},
+        headers=test_user_b["headers"],
+    )
+    assert [task["id"] for task in search.json()] == [task_id]
+
+    response = await async_client.patch(
+        f"{url}{task_id}/change_owner/",
+        params={"user_id": test_user_b["user"].id},
+        headers=admin_user["headers"],
+    )
+    assert response.status_code == 200
+    response = await async_client.get(url, headers=test_user_a["headers"])
+    assert task_id not in [task["id"] for task in response.json()]
+    response = await async_client.get(url, headers=test_user_b["headers"])
+    assert task_id in [task["id"] for task in response.json()]
+    search = await async_client.get(
+        search_url,
+        params={"name": "cached task"},
+        headers=test_user_b["headers"],
+    )
+    assert search.json()[0]["user_id"] == test_user_b["user"].id
+
+    await async_client.delete(f"{url}{task_id}/", headers=test_user_b["headers"])
+    response = await async_client.get(url, headers=test_user_b["headers"])
+    assert task_id not in [task["id"] for task in response.json()]
+
+
+@pytest.mark.asyncio
+async def test_task_conditional_get(
+    async_client: AsyncClient,
+    test_task_a: dict,
+    admin_user: dict,
+):
+    headers = test_task_a["headers"]
+    task_url = f"{settings.api.task.prefix}/{test_task_a["task"].id}/"
+    for url, url_headers in (
+        (f"{settings.api.task.prefix}/", headers),
+        (task_url, admin_user["headers"]),
+    ):
+        response = await async_client.get(url, headers=url_headers)
+        etag = response.headers["ETag"]
+        not_modified = await async_client.get(
+            url, headers={**url_headers, "If-None-Match": etag}
+        )
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+        assert not_modified.headers["ETag"] == etag
+
+        await async_client.patch(task_url, json={"name": "renamed"}, headers=headers)
+        response = await async_client.get(
+            url, headers={**url_headers, "If-None-Match": etag}
+        )
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        assert response.json()
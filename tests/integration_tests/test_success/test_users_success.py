@@ -134,6 +134,33 @@ async def test_endpoint_change_your_password(async_client, auth_client, test_use
     assert logging_with_new_pass_response.status_code == 200
 
 
+@pytest.mark.asyncio
+async def test_stateless_token_rejected_after_password_change(
+    mocker,
+    async_client,
+    test_user,
+):
+    mocker.patch.object(settings.api.auth_jwt, "stateless", True)
+    response = await async_client.get(
+        url=f"{settings.api.task.prefix}/",
+        headers=test_user.get("headers"),
+    )
+    assert response.status_code == 200
+
+    response = await async_client.patch(
+        url=f"{settings.api.user.prefix}/change_password/",
+        json={"password": "test_pass007"},
+        headers=test_user.get("headers"),
+    )
+    assert response.status_code == 200
+
+    response = await async_client.get(
+        url=f"{settings.api.task.prefix}/",
+        headers=test_user.get("headers"),
+    )
+    assert response.status_code == 401
+
+
 @pytest.mark.asyncio
 async def test_admin_endpoint_change_role(
     async_client,
@@ -185,3 +212,58 @@ async def test_admin_endpoint_delete_user(async_client, test_user, admin_user):
         headers=admin_user.get("headers"),
     )
     assert response.status_code == 204
+
+
+@pytest.mark.asyncio
+async def test_user_conditional_get(async_client: AsyncClient, test_user_a: dict):
+    headers = test_user_a["headers"]
+    for url in (
+        f"{settings.api.user.prefix}/profile/",
+        f"{settings.api.user.prefix}/{test_user_a["user"].username}/",
+    ):
+        etag = (await async_client.get(url, headers=headers)).headers["ETag"]
+        response = await async_client.get(
+            url, headers={**headers, "If-None-Match": etag}
+        )
+        assert response.status_code == 304
+        assert response.content == b""
+
+        await async_client.patch(
+            f"{settings.api.user.prefix}/",
+            json={"name": f"Renamed {url[-9:]}"},
+            headers=headers,
+        )
+        response = await async_client.get(
+            url, headers={**headers, "If-None-Match": etag}
+        )
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_user_lookup_cache_follows_writes(
+    async_client: AsyncClient,
+    test_user_a: dict,
+):
+    headers = test_user_a["headers"]
+    url = f"{settings.api.user.prefix}/"
+    response = await async_client.get(f"{url}lookup_user/")
+    assert response.status_code == 404
+
+    response = await async_client.post(
+        url, json={"username": "lookup_user", "password": "lookup_pass"}
+    )
+    assert response.status_code == 201
+    response = await async_client.get(f"{url}lookup_user/")
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == settings.api.user.lookup.cache_control
+
+    username = test_user_a["user"].username
+    assert (await async_client.get(f"{url}{username}/")).status_code == 200
+    await async_client.patch(url, json={"username": "renamed_user"}, headers=headers)
+    assert (await async_client.get(f"{url}{username}/")).status_code == 404
+    response = await async_client.get(f"{url}renamed_user/")
+    assert response.json()["id"] == test_user_a["user"].id
+
+    await async_client.delete(url, headers=headers)
+    assert (await async_client.get(f"{url}renamed_user/")).status_code == 404
@@ -3,8 +3,38 @@ from datetime import datetime
 from typing import Any
 
 import pytest
+from api.pagination import Page
+from api.response_cache import task_response_cache
 from core.config import settings
+from core.crud.cache import (
+    api_key_cache,
+    epoch_cache,
+    missing_username_cache,
+    task_versions,
+    user_cache,
+    username_cache,
+)
 from core.models import Task, User
+from fastapi import Request, Response
+
+
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    user_cache.clear()
+    epoch_cache.clear()
+    api_key_cache.clear()
+    task_response_cache.clear()
+    task_versions.clear()
+    username_cache.clear()
+    missing_username_cache.clear()
+    yield
+    user_cache.clear()
+    epoch_cache.clear()
+    api_key_cache.clear()
+    task_response_cache.clear()
+    task_versions.clear()
+    username_cache.clear()
+    missing_username_cache.clear()
 
 
 @pytest.fixture(scope="package")
@@ -33,6 +63,7 @@ def user_mock():
             active=True,
             created_at=datetime.now(),
             password="test0",
+            security_epoch=0,
         ),
         User(
             id=1,
@@ -42,6 +73,7 @@ def user_mock():
             active=False,
             created_at=datetime.now(),
             password="test1",
+            security_epoch=0,
         ),
         User(
             id=2,
@@ -51,6 +83,7 @@ def user_mock():
             active=True,
             created_at=datetime.now(),
             password="test2",
+            security_epoch=0,
         ),
     ]
 
@@ -72,11 +105,12 @@ def user_mock():
 
 @pytest.fixture(scope="package")
 def task_mock():
+    task_fields = {"scheduled_hours": 1, "user_id": 0, "created_at": datetime.now()}
     task_list = [
-        Task(id=0, name="Test Task 0", status=settings.tstat.pld),
-        Task(id=1, name="Test Task 1"),
-        Task(id=2, name="Test Task 2", status=settings.tstat.atw),
-        Task(id=3, name="Test Task 3", status="Very_needed"),
+        Task(id=0, name="Test Task 0", status=settings.tstat.pld, **task_fields),
+        Task(id=1, name="Test Task 1", status=settings.tstat.pld, **task_fields),
+        Task(id=2, name="Test Task 2", status=settings.tstat.atw, **task_fields),
+        Task(id=3, name="Test Task 3", status="Very_needed", **task_fields),
     ]
 
     def _create_task(task_id):
@@ -86,3 +120,21 @@ def task_mock():
             return None
 
     return _create_task
+
+
+@pytest.fixture
+def page_mock():
+    def _create_page(limit=None, cursor=None, query_string=b""):
+        request = Request(
+            {
+                "type": "http",
+                "scheme": "http",
+                "server": ("test", 80),
+                "path": "/api/task/all/",
+                "query_string": query_string,
+                "headers": [],
+            }
+        )
+        return Page(request, Response(), limit, cursor)
+
+    return _create_page
@@ -0,0 +1,41 @@
+from datetime import datetime
+
+import pytest
+from api.etag import etag_matches, make_etag, not_modified
+
+updated_at = datetime(2026, 10, 18, 12, 0)
+
+
+def test_make_etag_changes_with_ids_and_update_time():
+    etag = make_etag("1,2", updated_at)
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == make_etag("1,2", updated_at)
+    assert etag != make_etag("1,3", updated_at)
+    assert etag != make_etag("1,2", datetime(2026, 10, 18, 12, 1))
+    assert make_etag(None, None) == make_etag("", None)
+
+
+@pytest.mark.parametrize(
+    "if_none_match, matches",
+    [
+        (None, False),
+        ('"other"', False),
+        ("*", True),
+        ("{etag}", True),
+        ('"other", {etag}', True),
+        ("W/{etag}", True),
+    ],
+)
+def test_etag_matches(if_none_match, matches):
+    etag = make_etag("1", updated_at)
+    if if_none_match is not None:
+        if_none_match = if_none_match.format(etag=etag)
+    assert etag_matches(if_none_match, etag) is matches
+
+
+def test_not_modified():
+    etag = make_etag("1", updated_at)
+    response = not_modified(etag)
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["ETag"] == etag
@@ -0,0 +1,71 @@
+import pytest
+from api.pagination import decode_cursor, decode_ranked_cursor, encode_cursor
+from core.config import settings
+from fastapi import HTTPException
+
+
+@pytest.mark.parametrize(
+    "key",
+    [(1,), (7, 42), (0, 2**40)],
+)
+def test_cursor_round_trip(key):
+    assert decode_cursor(encode_cursor(key), len(key)) == key
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    ["not-base64!", encode_cursor((1,)), "eyJhIjogMX0", "WyJ4IiwgMV0"],
+)
+def test_decode_cursor_invalid(cursor):
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor(cursor, 2)
+    assert exc_info.value.status_code == 400
+    assert exc_info.value.detail == "Invalid cursor"
+
+
+def test_page_limit_defaults_and_clamps(page_mock):
+    assert page_mock().limit == settings.api.pagination.default_limit
+    assert page_mock(limit=5).fetch_limit == 6
+    assert (
+        page_mock(limit=settings.api.pagination.max_limit + 1).limit
+        == settings.api.pagination.max_limit
+    )
+
+
+def test_page_after(page_mock):
+    assert page_mock().after(2) is None
+    assert page_mock(cursor=encode_cursor((3, 4))).after(2) == (3, 4)
+
+
+def test_page_trim_last_page(page_mock):
+    page = page_mock(limit=3)
+    assert page.trim([1, 2, 3], lambda item: (item,)) == [1, 2, 3]
+    assert "Link" not in page.response.headers
+
+
+def test_page_trim_sets_next_link(page_mock):
+    page = page_mock(limit=2, query_string=b"status=Planned")
+    assert page.trim([1, 2, 3], lambda item: (item,)) == [1, 2]
+    link = page.response.headers["Link"]
+    assert link.startswith("<http://test/api/task/all/?status=Planned&limit=2&cursor=")
+    assert link.endswith('>; rel="next"')
+    cursor = link.split("cursor=")[1].split(">")[0]
+    assert decode_cursor(cursor, 1) == (2,)
+
+
+@pytest.mark.parametrize(
+    "key",
+    [(-0.5, 3), (0, 1), (-0.0607927, 2**40)],
+)
+def test_ranked_cursor_round_trip(key):
+    assert decode_ranked_cursor(encode_cursor(key)) == key
+
+
+@pytest.mark.parametrize(
+    "key",
+    [(1,), (0.5, 1.5), (True, 1), (0.5, 1, 2)],
+)
+def test_decode_ranked_cursor_invalid(key):
+    with pytest.raises(HTTPException) as exc_info:
+        decode_ranked_cursor(encode_cursor(key))
+    assert exc_info.value.status_code == 400
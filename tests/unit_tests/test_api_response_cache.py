@@ -0,0 +1,57 @@
+import json
+
+from api.response_cache import ResponseCache, response_cache_key
+from api.schemas import TaskSchm
+from core.utils import metrics
+from core.utils.cache import TTLCache
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+
+def _request(query_string: bytes) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "path": "/api/task/",
+            "query_string": query_string,
+            "headers": [],
+        }
+    )
+
+
+def test_response_cache_key_normalizes_query():
+    assert response_cache_key(1, _request(b"limit=5&status=x")) == (
+        response_cache_key(1, _request(b"status=x&limit=5"))
+    )
+    assert response_cache_key(1, _request(b"limit=5")) != (
+        response_cache_key(2, _request(b"limit=5"))
+    )
+
+
+def test_response_cache_hit_miss_and_version(task_mock):
+    cache = ResponseCache(
+        TTLCache(max_size=1),
+        TypeAdapter(list[TaskSchm]),
+        "test_response_cache",
+    )
+    response = Response()
+    response.headers["Link"] = '<next>; rel="next"'
+    hits = metrics.counter("test_response_cache_hits_total")
+    misses = metrics.counter("test_response_cache_misses_total")
+    hits_before, misses_before = hits.value, misses.value
+
+    assert cache.get("key", 1) is None
+    stored = cache.put("key", 1, [task_mock(0)], response)
+    cached = cache.get("key", 1)
+    assert cached is not None
+    assert cached.body == stored.body
+    assert json.loads(bytes(cached.body))[0]["id"] == 0
+    assert cached.headers["Link"] == '<next>; rel="next"'
+    assert cache.get("key", 2) is None
+
+    cache.put("other", 1, [], Response())
+    assert cache.get("key", 1) is None
+    cache.put("replica", 1, [], Response(), store=False)
+    assert cache.get("replica", 1) is None
+    assert hits.value - hits_before == 1
+    assert misses.value - misses_before == 4
@@ -0,0 +1,51 @@
+import json
+
+import pytest
+from api.schemas import TaskSchm
+from api.streaming import NDJSON_MEDIA_TYPE, ndjson_response, wants_ndjson
+
+
+@pytest.mark.parametrize(
+    "accept, expected",
+    [
+        (None, False),
+        ("application/json", False),
+        ("*/*", False),
+        (NDJSON_MEDIA_TYPE, True),
+        ("application/json;q=0.5, application/x-ndjson", True),
+        ("Application/X-NDJSON; charset=utf-8", True),
+    ],
+)
+def test_wants_ndjson(accept, expected):
+    assert wants_ndjson(accept) is expected
+
+
+@pytest.mark.asyncio
+async def test_ndjson_response_writes_row_per_line(mocker):
+    tasks = [
+        TaskSchm(
+            id=task_id,
+            name=f"Task {task_id}",
+            scheduled_hours=1,
+            status="Planned",
+            created_at="2024-01-01T00:00:00",
+            user_id=1,
+        )
+        for task_id in range(3)
+    ]
+    session = mocker.AsyncMock()
+    session_factory = mocker.MagicMock()
+    session_factory.return_value.__aenter__.return_value = session
+
+    async def rows(stream_session):
+        assert stream_session is session
+        for task in tasks:
+            yield task
+
+    response = ndjson_response(session_factory, rows, TaskSchm)
+    body: list[bytes] = [chunk async for chunk in response.body_iterator]  # type: ignore[misc]
+
+    assert response.media_type == NDJSON_MEDIA_TYPE
+    assert len(body) == len(tasks)
+    assert [json.loads(line)["id"] for line in body] == [0, 1, 2]
+    session_factory.return_value.__aexit__.assert_awaited_once()
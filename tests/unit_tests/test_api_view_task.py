@@ -1,12 +1,16 @@
+import json
+
 import pytest
+from api.pagination import decode_ranked_cursor, encode_cursor
+from api.schemas import SearchTaskSchm, UpdateTaskSchm
 from api.views.task import (
     change_task_owner,
     delete_task,
     search_task_by_parameters,
     update_task,
 )
-from core.config import settings
 from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
 
 
 @pytest.mark.asyncio
@@ -14,8 +18,10 @@ from fastapi import HTTPException
     "task_id",
     [0, 1, 2],
 )
-async def test_search_task_by_parameters_success(mocker, user_mock, task_mock, task_id):
-    session_mock = mocker.AsyncMock()
+async def test_search_task_by_parameters_success(
+    mocker, user_mock, task_mock, page_mock, task_id
+):
+    session_mock = mocker.AsyncMock(info={})
     expect_task = task_mock(task_id)
     cur_user = user_mock(0)
     mocker.patch(
@@ -24,29 +30,45 @@ async def test_search_task_by_parameters_success(mocker, user_mock, task_mock, t
     )
     result = await search_task_by_parameters(
         session_mock,
-        expect_task,
+        SearchTaskSchm(id=expect_task.id, status=expect_task.status),
         cur_user,
+        page_mock(),
     )
-    assert result[0].id == expect_task.id
+    assert json.loads(result.body)[0]["id"] == expect_task.id
 
 
 @pytest.mark.asyncio
-async def test_search_task_by_parameters_bad_request(mocker, user_mock, task_mock):
-    session_mock = mocker.AsyncMock()
-    expect_task = task_mock(3)
-    cur_user = user_mock(0)
-    mocker.patch(
-        "api.views.task.crud.get_tasks_by_some_statement",
-        new=mocker.AsyncMock(return_value=[expect_task]),
+async def test_search_task_by_parameters_ranked(
+    mocker, user_mock, task_mock, page_mock
+):
+    session_mock = mocker.AsyncMock(info={})
+    ranked_tasks = [(task_mock(2), 0.9), (task_mock(0), 0.5), (task_mock(1), 0.5)]
+    get_ranked_tasks = mocker.patch(
+        "api.views.task.crud.get_ranked_tasks",
+        new=mocker.AsyncMock(return_value=ranked_tasks),
+    )
+    page = page_mock(limit=2, cursor=encode_cursor((-1.0, 5)))
+    result = await search_task_by_parameters(
+        session_mock,
+        SearchTaskSchm(query="test task"),
+        user_mock(0),
+        page,
+        include_archived=True,
     )
+    assert [task["id"] for task in json.loads(result.body)] == [2, 0]
+    get_ranked_tasks.assert_awaited_once_with(
+        session_mock, SearchTaskSchm(query="test task"), 3, (-1.0, 5), True
+    )
+    cursor = result.headers["Link"].split("cursor=")[1].split(">")[0]
+    assert decode_ranked_cursor(cursor) == (-0.5, 0)
+
+
+def test_search_task_schema_rejects_bad_status(task_mock):
+    bad_status = task_mock(3).status
     with pytest.raises(HTTPException) as exc_info:
-        await search_task_by_parameters(
-            session_mock,
-            expect_task,
-            cur_user,
-        )
+        SearchTaskSchm(status=bad_status)
     assert exc_info.value.status_code == 400
-    assert exc_info.value.detail == f"Status '{expect_task.status}' not exist"
+    assert exc_info.value.detail == f"Status '{bad_status}' not exist"
 
 
 @pytest.mark.asyncio
@@ -59,52 +81,51 @@ async def test_change_task_owner_success(mocker, user_mock, task_mock, cur_user_
     cur_user = user_mock(cur_user_id)
     task_id = 1
     expect_task = task_mock(task_id)
-    if cur_user.role != settings.roles.admin:
-        expect_task.user_id = cur_user.id
-    new_user = user_mock(1)
-    mocker.patch(
-        "api.views.task.crud.get_task_by_id",
-        new=mocker.AsyncMock(return_value=expect_task),
-    )
-    mocker.patch(
-        "api.views.task.crud.change_task_user_by_user",
+    change_owner_mock = mocker.patch(
+        "api.views.task.crud.change_task_owner",
         new=mocker.AsyncMock(return_value=expect_task),
     )
-    result = await change_task_owner(session_mock, task_id, cur_user, new_user)
+    result = await change_task_owner(session_mock, task_id, cur_user, 1)
     assert result.id == expect_task.id
+    change_owner_mock.assert_awaited_once_with(session_mock, task_id, 1, cur_user)
 
 
 @pytest.mark.asyncio
-async def test_change_task_owner_privileges_exc(mocker, user_mock, task_mock):
+@pytest.mark.parametrize(
+    "task_exists, expected_code",
+    [(True, 403), (False, 404)],
+)
+async def test_change_task_owner_not_changed_exc(
+    mocker,
+    user_mock,
+    task_exists,
+    expected_code,
+):
     session_mock = mocker.AsyncMock()
-    task_id = 1
-    expect_task = task_mock(task_id)
-    new_user = user_mock(1)
     mocker.patch(
-        "api.views.task.crud.get_task_by_id",
-        new=mocker.AsyncMock(return_value=expect_task),
+        "api.views.task.crud.change_task_owner",
+        new=mocker.AsyncMock(return_value=None),
+    )
+    mocker.patch(
+        "api.views.task.crud.task_exists",
+        new=mocker.AsyncMock(return_value=task_exists),
     )
     with pytest.raises(HTTPException) as exc_info:
-        await change_task_owner(session_mock, task_id, user_mock(1), new_user)
-    assert exc_info.value.status_code == 403
-    assert exc_info.value.detail == "Not enough privileges"
+        await change_task_owner(session_mock, 11, user_mock(1), 1)
+    assert exc_info.value.status_code == expected_code
 
 
 @pytest.mark.asyncio
-async def test_change_task_owner_task_not_exist_exc(mocker, user_mock, task_mock):
+async def test_change_task_owner_user_not_exist_exc(mocker, user_mock):
     session_mock = mocker.AsyncMock()
-    cur_user = user_mock(0)
-    task_id = 11
-    expect_task = task_mock(task_id)
-    new_user = user_mock(1)
     mocker.patch(
-        "api.views.task.crud.get_task_by_id",
-        new=mocker.AsyncMock(return_value=expect_task),
+        "api.views.task.crud.change_task_owner",
+        new=mocker.AsyncMock(side_effect=IntegrityError("UPDATE", {}, Exception())),
     )
     with pytest.raises(HTTPException) as exc_info:
-        await change_task_owner(session_mock, task_id, cur_user, new_user)
+        await change_task_owner(session_mock, 1, user_mock(0), 999)
     assert exc_info.value.status_code == 404
-    assert exc_info.value.detail == f"Task with id=[{task_id}] not found"
+    assert exc_info.value.detail == "User with id=[999] not found"
 
 
 @pytest.mark.asyncio
@@ -115,107 +136,107 @@ async def test_change_task_owner_task_not_exist_exc(mocker, user_mock, task_mock
 async def test_update_task_success(mocker, user_mock, task_mock, cur_user_id):
     session_mock = mocker.AsyncMock()
     cur_user = user_mock(cur_user_id)
-    task_input = task_mock(0)
+    task_input = UpdateTaskSchm(name="Test Task 1 updated")
     task_id = 1
     expect_task = task_mock(task_id)
-    if cur_user.role != settings.roles.admin:
-        expect_task.user_id = cur_user.id
-    mocker.patch(
-        "api.views.task.crud.get_task_by_id",
-        new=mocker.AsyncMock(return_value=expect_task),
-    )
-    mocker.patch(
+    update_mock = mocker.patch(
         "api.views.task.crud.update_task",
         new=mocker.AsyncMock(return_value=expect_task),
     )
     result = await update_task(session_mock, task_input, task_id, cur_user)
     assert result.id == expect_task.id
+    update_mock.assert_awaited_once_with(session_mock, task_id, task_input, cur_user)
 
 
 @pytest.mark.asyncio
-async def test_update_task_privileges_exc(mocker, user_mock, task_mock):
+async def test_update_task_privileges_exc(mocker, user_mock):
     session_mock = mocker.AsyncMock()
-    cur_user = user_mock(1)
-    task_input = task_mock(0)
-    task_id = 1
-    expect_task = task_mock(task_id)
     mocker.patch(
-        "api.views.task.crud.get_task_by_id",
-        new=mocker.AsyncMock(return_value=expect_task),
+        "api.views.task.crud.update_task",
+        new=mocker.AsyncMock(return_value=None),
+    )
+    mocker.patch(
+        "api.views.task.crud.task_exists",
+        new=mocker.AsyncMock(return_value=True),
     )
     with pytest.raises(HTTPException) as exc_info:
-        await update_task(session_mock, task_input, task_id, cur_user)
+        await update_task(session_mock, UpdateTaskSchm(), 1, user_mock(1))
     assert exc_info.value.status_code == 403
     assert exc_info.value.detail == "Not enough privileges"
 
 
 @pytest.mark.asyncio
-async def test_update_task_task_not_exist_exc(mocker, user_mock, task_mock):
+async def test_update_task_task_not_exist_exc(mocker, user_mock):
     session_mock = mocker.AsyncMock()
-    cur_user = user_mock(1)
-    task_input = task_mock(0)
     task_id = 11
-    expect_task = task_mock(task_id)
     mocker.patch(
-        "api.views.task.crud.get_task_by_id",
-        new=mocker.AsyncMock(return_value=expect_task),
+        "api.views.task.crud.update_task",
+        new=mocker.AsyncMock(return_value=None),
+    )
+    mocker.patch(
+        "api.views.task.crud.task_exists",
+        new=mocker.AsyncMock(return_value=False),
     )
     with pytest.raises(HTTPException) as exc_info:
-        await update_task(session_mock, task_input, task_id, cur_user)
+        await update_task(session_mock, UpdateTaskSchm(), task_id, user_mock(1))
     assert exc_info.value.status_code == 404
     assert exc_info.value.detail == f"Task with id=[{task_id}] not found"
 
 
+def test_update_task_schema_rejects_bad_status():
+    with pytest.raises(HTTPException) as exc_info:
+        UpdateTaskSchm(status="Very_needed")
+    assert exc_info.value.status_code == 400
+    assert exc_info.value.detail == "Status 'Very_needed' not exist"
+
+
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
     "cur_user_id",
     [0, 2],
 )
-async def test_delete_task_success(mocker, user_mock, task_mock, cur_user_id):
+async def test_delete_task_success(mocker, user_mock, cur_user_id):
     session_mock = mocker.AsyncMock()
     cur_user = user_mock(cur_user_id)
     task_id = 1
-    task_to_delete = task_mock(task_id)
-    if cur_user.role != settings.roles.admin:
-        task_to_delete.user_id = cur_user.id
-    mocker.patch(
-        "api.views.task.crud.get_task_by_id",
-        new=mocker.AsyncMock(return_value=task_to_delete),
-    )
-    mocker.patch(
+    delete_mock = mocker.patch(
         "api.views.task.crud.delete_task",
-        new=mocker.AsyncMock(return_value=None),
+        new=mocker.AsyncMock(return_value=True),
     )
     assert await delete_task(session_mock, task_id, cur_user) is None
+    delete_mock.assert_awaited_once_with(session_mock, task_id, cur_user)
 
 
 @pytest.mark.asyncio
-async def test_delete_task_privileges_exc(mocker, user_mock, task_mock):
+async def test_delete_task_privileges_exc(mocker, user_mock):
     session_mock = mocker.AsyncMock()
-    cur_user = user_mock(1)
-    task_id = 1
-    task_to_delete = task_mock(task_id)
     mocker.patch(
-        "api.views.task.crud.get_task_by_id",
-        new=mocker.AsyncMock(return_value=task_to_delete),
+        "api.views.task.crud.delete_task",
+        new=mocker.AsyncMock(return_value=False),
+    )
+    mocker.patch(
+        "api.views.task.crud.task_exists",
+        new=mocker.AsyncMock(return_value=True),
     )
     with pytest.raises(HTTPException) as exc_info:
-        await delete_task(session_mock, task_id, cur_user)
+        await delete_task(session_mock, 1, user_mock(1))
     assert exc_info.value.status_code == 403
     assert exc_info.value.detail == "Not enough privileges"
 
 
 @pytest.mark.asyncio
-async def test_delete_task_task_not_exist_exc(mocker, user_mock, task_mock):
+async def test_delete_task_task_not_exist_exc(mocker, user_mock):
     session_mock = mocker.AsyncMock()
-    cur_user = user_mock(1)
     task_id = 11
-    task_to_delete = task_mock(task_id)
     mocker.patch(
-        "api.views.task.crud.get_task_by_id",
-        new=mocker.AsyncMock(return_value=task_to_delete),
+        "api.views.task.crud.delete_task",
+        new=mocker.AsyncMock(return_value=False),
+    )
+    mocker.patch(
+        "api.views.task.crud.task_exists",
+        new=mocker.AsyncMock(return_value=False),
     )
     with pytest.raises(HTTPException) as exc_info:
-        await delete_task(session_mock, task_id, cur_user)
+        await delete_task(session_mock, task_id, user_mock(1))
     assert exc_info.value.status_code == 404
     assert exc_info.value.detail == f"Task with id=[{task_id}] not found"
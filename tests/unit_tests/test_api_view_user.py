@@ -1,51 +1,83 @@
 import pytest
-from api.schemas.user import UserRoleChangeSchm
+from api.etag import record_etag
+from api.schemas.user import UserPassChangeSchm, UserRoleChangeSchm
 from api.views.user import (
     change_role,
+    change_your_password,
     create_user,
+    delete_user,
+    delete_yourself,
     get_all_user_and_by_id,
     get_user_by_username,
     update_user,
     update_yourself,
 )
 from core.config import settings
-from fastapi import HTTPException
+from fastapi import HTTPException, Response
+from sqlalchemy.exc import IntegrityError
+
+
+def integrity_error(sqlstate: str, constraint_name: str | None) -> IntegrityError:
+    cause = Exception()
+    cause.constraint_name = constraint_name  # type: ignore[attr-defined]
+    orig = Exception()
+    orig.sqlstate = sqlstate  # type: ignore[attr-defined]
+    orig.__cause__ = cause
+    return IntegrityError("UPDATE", {}, orig)
 
 
 @pytest.mark.asyncio
 async def test_get_user_by_username_success_get_user(mocker, user_mock):
     session_mock = mocker.AsyncMock()
     expected_user = user_mock(0)
-    mocker.patch(
+    get_user = mocker.patch(
         "api.views.user.user.get_user_by_username",
         mocker.AsyncMock(return_value=expected_user),
     )
+    response = Response()
     user_from_endpoint = await get_user_by_username(
         session_mock,
         expected_user.username,
+        response,
     )
+    etag = record_etag(expected_user.id, expected_user.created_at, None)
     assert user_from_endpoint.id == expected_user.id
+    assert response.headers["ETag"] == etag
+    assert response.headers["Cache-Control"] == settings.api.user.lookup.cache_control
+
+    result = await get_user_by_username(
+        session_mock,
+        expected_user.username,
+        Response(),
+        f'"other", {etag}',
+    )
+    assert result.status_code == 304
+    assert result.headers["ETag"] == etag
+    get_user.assert_awaited_once()
 
 
 @pytest.mark.asyncio
 async def test_get_user_by_username_get_user_exception(mocker, user_mock):
     session_mock = mocker.AsyncMock()
     expected_user = user_mock(0)
-    mocker.patch(
+    get_user = mocker.patch(
         "api.views.user.user.get_user_by_username",
         mocker.AsyncMock(return_value=None),
     )
-    with pytest.raises(HTTPException) as exc_info:
-        await get_user_by_username(
-            session_mock,
-            expected_user.username,
-        )
-    assert exc_info.value.status_code == 404
-    assert exc_info.value.detail == f"User {expected_user.username} not exist"
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exc_info:
+            await get_user_by_username(
+                session_mock,
+                expected_user.username,
+                Response(),
+            )
+        assert exc_info.value.status_code == 404
+        assert exc_info.value.detail == f"User {expected_user.username} not exist"
+    get_user.assert_awaited_once()
 
 
 @pytest.mark.asyncio
-async def test_get_all_user_and_by_id_get_all_users(mocker, user_mock):
+async def test_get_all_user_and_by_id_get_all_users(mocker, user_mock, page_mock):
     session_mock = mocker.AsyncMock()
     cur_user = mocker.Mock()
     expected_users = [user_mock(i) for i in range(2)]
@@ -53,7 +85,7 @@ async def test_get_all_user_and_by_id_get_all_users(mocker, user_mock):
         "api.views.user.user.get_all_users",
         new=mocker.AsyncMock(return_value=expected_users),
     )
-    result = await get_all_user_and_by_id(session_mock, cur_user)
+    result = await get_all_user_and_by_id(session_mock, cur_user, page_mock())
     result = [result[i].username for i in range(len(result))]
     expected_users = [expected_users[i].username for i in range(len(expected_users))]
 
@@ -61,7 +93,9 @@ async def test_get_all_user_and_by_id_get_all_users(mocker, user_mock):
 
 
 @pytest.mark.asyncio
-async def test_get_all_user_and_by_id_success_getting_user(mocker, user_mock):
+async def test_get_all_user_and_by_id_success_getting_user(
+    mocker, user_mock, page_mock
+):
     session_mock = mocker.AsyncMock()
     cur_user = user_mock(2)
     expected_user = user_mock(0)
@@ -70,13 +104,13 @@ async def test_get_all_user_and_by_id_success_getting_user(mocker, user_mock):
         new=mocker.AsyncMock(return_value=expected_user),
     )
 
-    result = await get_all_user_and_by_id(session_mock, cur_user, 0)
+    result = await get_all_user_and_by_id(session_mock, cur_user, page_mock(), 0)
 
     assert result.username == expected_user.username
 
 
 @pytest.mark.asyncio
-async def test_get_all_user_and_by_id_no_user_with_id_exc(mocker, user_mock):
+async def test_get_all_user_and_by_id_no_user_with_id_exc(mocker, user_mock, page_mock):
     session_mock = mocker.AsyncMock()
     cur_user = user_mock(2)
     expect_user_id = 4
@@ -86,14 +120,16 @@ async def test_get_all_user_and_by_id_no_user_with_id_exc(mocker, user_mock):
     )
 
     with pytest.raises(HTTPException) as exc_info:
-        await get_all_user_and_by_id(session_mock, cur_user, expect_user_id)
+        await get_all_user_and_by_id(
+            session_mock, cur_user, page_mock(), expect_user_id
+        )
 
     assert exc_info.value.detail == f"User with id=[{expect_user_id}] not found"
     assert exc_info.value.status_code == 404
 
 
 @pytest.mark.asyncio
-async def test_get_all_user_and_by_id_no_privileges_exc(mocker, user_mock):
+async def test_get_all_user_and_by_id_no_privileges_exc(mocker, user_mock, page_mock):
     session_mock = mocker.AsyncMock()
     cur_user = user_mock(0)
     mocker.patch(
@@ -102,7 +138,7 @@ async def test_get_all_user_and_by_id_no_privileges_exc(mocker, user_mock):
     )
 
     with pytest.raises(HTTPException) as exc_info:
-        await get_all_user_and_by_id(session_mock, cur_user, 0)
+        await get_all_user_and_by_id(session_mock, cur_user, page_mock(), 0)
 
     assert exc_info.value.detail == "Not enough privileges"
     assert exc_info.value.status_code == 403
@@ -112,10 +148,6 @@ async def test_get_all_user_and_by_id_no_privileges_exc(mocker, user_mock):
 async def test_create_user_success(mocker, user_mock):
     expect_user = user_mock(0)
     session_mock = mocker.AsyncMock()
-    mocker.patch(
-        "api.views.user.user.get_user_by_username",
-        mocker.AsyncMock(return_value=None),
-    )
     mocker.patch(
         "api.views.user.user.create_user",
         mocker.AsyncMock(return_value=expect_user),
@@ -130,8 +162,8 @@ async def test_create_user_user_already_exist_exc(mocker, user_mock):
     expect_user = user_mock(0)
     session_mock = mocker.AsyncMock()
     mocker.patch(
-        "api.views.user.user.get_user_by_username",
-        mocker.AsyncMock(return_value=expect_user),
+        "api.views.user.user.create_user",
+        mocker.AsyncMock(return_value=None),
     )
     with pytest.raises(HTTPException) as exc_info:
         await create_user(session_mock, expect_user)
@@ -149,7 +181,7 @@ async def test_change_role_success(mocker, user_mock):
         "api.views.user.user.update_role",
         mocker.AsyncMock(return_value=expect_user),
     )
-    result = await change_role(role_for_update, session_mock, expect_user, cur_user)
+    result = await change_role(role_for_update, session_mock, expect_user.id, cur_user)
     assert result.username == expect_user.username
     assert result.id == expect_user.id
 
@@ -165,7 +197,7 @@ async def test_change_role_role_not_exist_exc(mocker, user_mock):
         mocker.AsyncMock(return_value=expect_user),
     )
     with pytest.raises(HTTPException) as exc_info:
-        await change_role(role_for_update, session_mock, expect_user, cur_user)
+        await change_role(role_for_update, session_mock, expect_user.id, cur_user)
 
     assert exc_info.value.status_code == 400
     assert exc_info.value.detail == f"Role '{role_for_update.role}' not exist"
@@ -177,16 +209,12 @@ async def test_update_user_success(mocker, user_mock):
     cur_user = user_mock(2)
     user_input = user_mock(1)
     expect_user = user_mock(0)
-    mocker.patch(
-        "api.views.user.user.get_user_by_username",
-        new=mocker.AsyncMock(return_value=None),
-    )
     mocker.patch(
         "api.views.user.user.update_user",
         new=mocker.AsyncMock(return_value=expect_user),
     )
 
-    result = await update_user(user_input, session_mock, expect_user, cur_user)
+    result = await update_user(user_input, session_mock, expect_user.id, cur_user)
     assert result.username == expect_user.username
     assert result.id == expect_user.id
 
@@ -197,17 +225,15 @@ async def test_update_user_username_already_exist_exc(mocker, user_mock):
     cur_user = user_mock(2)
     user_input = user_mock(1)
     expect_user = user_mock(0)
-    mocker.patch(
-        "api.views.user.user.get_user_by_username",
-        new=mocker.AsyncMock(return_value=True),
-    )
     mocker.patch(
         "api.views.user.user.update_user",
-        new=mocker.AsyncMock(return_value=expect_user),
+        new=mocker.AsyncMock(
+            side_effect=integrity_error("23505", "users_username_key")
+        ),
     )
 
     with pytest.raises(HTTPException) as exc_info:
-        await update_user(user_input, session_mock, expect_user, cur_user)
+        await update_user(user_input, session_mock, expect_user.id, cur_user)
     assert exc_info.value.status_code == 409
     assert exc_info.value.detail == f"Username '{user_input.username}' already exist"
 
@@ -218,16 +244,13 @@ async def test_update_yourself_success(mocker, user_mock):
     cur_user = user_mock(2)
     user_input = user_mock(1)
     expect_user = user_mock(0)
-    mocker.patch(
-        "api.views.user.user.get_user_by_username",
-        new=mocker.AsyncMock(return_value=None),
-    )
-    mocker.patch(
+    update_mock = mocker.patch(
         "api.views.user.user.update_user",
         new=mocker.AsyncMock(return_value=expect_user),
     )
 
     result = await update_yourself(user_input, session_mock, cur_user)
+    update_mock.assert_awaited_once_with(session_mock, cur_user.id, user_input)
     assert result.username == expect_user.username
     assert result.id == expect_user.id
 
@@ -237,17 +260,99 @@ async def test_update_yourself_username_already_exist_exc(mocker, user_mock):
     session_mock = mocker.AsyncMock()
     cur_user = user_mock(2)
     user_input = user_mock(1)
-    expect_user = user_mock(0)
-    mocker.patch(
-        "api.views.user.user.get_user_by_username",
-        new=mocker.AsyncMock(return_value=True),
-    )
     mocker.patch(
         "api.views.user.user.update_user",
-        new=mocker.AsyncMock(return_value=expect_user),
+        new=mocker.AsyncMock(
+            side_effect=integrity_error("23505", "users_username_key")
+        ),
     )
 
     with pytest.raises(HTTPException) as exc_info:
         await update_yourself(user_input, session_mock, cur_user)
     assert exc_info.value.status_code == 409
     assert exc_info.value.detail == f"Username '{user_input.username}' already exist"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "error",
+    [
+        integrity_error("23502", None),
+        integrity_error("23505", "users_other_key"),
+        IntegrityError("UPDATE", {}, Exception()),
+    ],
+)
+async def test_update_user_reraises_other_integrity_errors(mocker, user_mock, error):
+    mocker.patch(
+        "api.views.user.user.update_user",
+        new=mocker.AsyncMock(side_effect=error),
+    )
+    with pytest.raises(IntegrityError):
+        await update_user(
+            user_mock(1), mocker.AsyncMock(), user_mock(0).id, user_mock(2)
+        )
+
+
+@pytest.mark.asyncio
+async def test_update_user_not_found_exc(mocker, user_mock):
+    mocker.patch(
+        "api.views.user.user.update_user",
+        new=mocker.AsyncMock(return_value=None),
+    )
+    with pytest.raises(HTTPException) as exc_info:
+        await update_user(user_mock(1), mocker.AsyncMock(), 100, user_mock(2))
+    assert exc_info.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_change_role_not_found_exc(mocker, user_mock):
+    mocker.patch(
+        "api.views.user.user.update_role",
+        new=mocker.AsyncMock(return_value=None),
+    )
+    with pytest.raises(HTTPException) as exc_info:
+        await change_role(
+            UserRoleChangeSchm(role=settings.roles.admin),
+            mocker.AsyncMock(),
+            100,
+            user_mock(2),
+        )
+    assert exc_info.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_change_your_password_single_statement(mocker, user_mock):
+    session_mock = mocker.AsyncMock()
+    cur_user = user_mock(0)
+    update_mock = mocker.patch(
+        "api.views.user.user.update_password",
+        new=mocker.AsyncMock(return_value=cur_user),
+    )
+    get_mock = mocker.patch("api.views.user.user.get_user_by_id")
+    new_password = UserPassChangeSchm(password="new_password")
+
+    assert await change_your_password(new_password, session_mock, cur_user) is cur_user
+    update_mock.assert_awaited_once_with(
+        session=session_mock,
+        user_id=cur_user.id,
+        password="new_password",
+    )
+    get_mock.assert_not_called()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("deleted", [True, False])
+async def test_delete_user_by_id(mocker, user_mock, deleted):
+    delete_mock = mocker.patch(
+        "api.views.user.user.delete_user",
+        new=mocker.AsyncMock(return_value=deleted),
+    )
+    session_mock = mocker.AsyncMock()
+    if deleted:
+        await delete_user(session_mock, 1, user_mock(2))
+        await delete_yourself(session_mock, user_mock(0))
+    else:
+        with pytest.raises(HTTPException) as exc_info:
+            await delete_user(session_mock, 1, user_mock(2))
+        assert exc_info.value.status_code == 404
+    delete_mock.assert_any_await(session_mock, 1)
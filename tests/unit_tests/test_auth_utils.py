@@ -43,7 +43,19 @@ def test_create_token(mocker, response):
 def test_create_access_token(mocker, user_mock):
     user = user_mock(1)
     response_mock = mocker.Mock()
-    expected_keys = {"iss", "sub", "username", "jti", "name", "logged_in_at", "role"}
+    expected_keys = {
+        "iss",
+        "sub",
+        "username",
+        "jti",
+        "name",
+        "logged_in_at",
+        "role",
+        "active",
+        "epoch",
+        "b_date",
+        "created_at",
+    }
 
     create_token_mock = mocker.patch(
         "api.auth.utils.create_token",
@@ -58,6 +70,8 @@ def test_create_access_token(mocker, user_mock):
     assert payload["username"] == user.username
     assert payload["role"] == user.role
     assert payload["name"] == user.name
+    assert payload["active"] == user.active
+    assert payload["epoch"] == user.security_epoch
     uuid_obj = uuid.UUID(payload["jti"], version=4)
     assert isinstance(uuid_obj, uuid.UUID)
     now_ts = time.time()
@@ -68,7 +82,7 @@ def test_create_access_token(mocker, user_mock):
 def test_create_refresh_token(mocker, user_mock):
     user = user_mock(1)
     response_mock = mocker.Mock()
-    expected_keys = {"sub"}
+    expected_keys = {"sub", "jti", "epoch"}
 
     create_token_mock = mocker.patch(
         "api.auth.utils.create_token",
@@ -6,9 +6,14 @@ from api.auth.validation import (
     get_auth_user_from_db,
     get_auth_user_from_token_of_type,
     get_currant_token_payload_of_token_type,
+    get_user_from_api_key,
     get_user_from_payload,
+    rehash_user_password,
     validate_token_type,
 )
+from api.schemas import UserSchmExtended
+from core.config import settings
+from core.crud.cache import user_cache
 from fastapi import HTTPException
 from jwt import InvalidTokenError
 
@@ -78,9 +83,39 @@ async def test_get_user_from_payload_no_user(mocker, user_mock):
     assert exc_info.value.detail == "Invalid token"
 
 
+@pytest.mark.asyncio
+async def test_get_user_from_payload_cached(mocker, user_mock):
+    get_user_by_id_mock = mocker.AsyncMock(return_value=user_mock(0))
+    mocker.patch(
+        "api.auth.validation.get_user_by_id",
+        new=get_user_by_id_mock,
+    )
+    session_mock = mocker.AsyncMock()
+    payload = {"sub": user_mock(0).id}
+    first = await get_user_from_payload(session_mock, payload)
+    second = await get_user_from_payload(session_mock, payload)
+    assert first == second
+    get_user_by_id_mock.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_get_user_from_payload_cached_inactive_user(mocker, user_mock):
+    user_cache.set(user_mock(1).id, UserSchmExtended.model_validate(user_mock(1)))
+    get_user_by_id_mock = mocker.AsyncMock()
+    mocker.patch(
+        "api.auth.validation.get_user_by_id",
+        new=get_user_by_id_mock,
+    )
+    session_mock = mocker.AsyncMock()
+    with pytest.raises(HTTPException) as exc_info:
+        await get_user_from_payload(session_mock, {"sub": user_mock(1).id})
+    assert exc_info.value.detail == "User is inactive"
+    get_user_by_id_mock.assert_not_awaited()
+
+
 def test_get_currant_token_payload_of_token_type_valid_token(mocker):
     mocker.patch(
-        "api.auth.validation.decode_jwt",
+        "api.auth.validation.decode_jwt_cached",
         return_value="valid_token",
     )
     get_current_token_payload = get_currant_token_payload_of_token_type("valid_token")
@@ -90,7 +125,7 @@ def test_get_currant_token_payload_of_token_type_valid_token(mocker):
 
 def test_get_currant_token_payload_of_token_type_invalid_token(mocker):
     mocker.patch(
-        "api.auth.validation.decode_jwt",
+        "api.auth.validation.decode_jwt_cached",
         side_effect=InvalidTokenError(),
     )
     get_current_token_payload = get_currant_token_payload_of_token_type("invalid_token")
@@ -155,6 +190,179 @@ async def test_get_auth_user_from_token_of_type_without_privileges(
     assert exc_info.value.detail == "Not enough privileges"
 
 
+@pytest.mark.asyncio
+async def test_get_auth_user_from_token_of_type_revoked(mocker, user_mock):
+    get_auth_user_from_token = get_auth_user_from_token_of_type(ACCESS_TOKEN_TYPE)
+    payload = {
+        "sub": 0,
+        TOKEN_TYPE_FIELD: ACCESS_TOKEN_TYPE,
+        "role": "User",
+        "jti": "revoked-jti",
+    }
+    mocker.patch(
+        "api.auth.validation.revocation_list.is_revoked",
+        return_value=True,
+    )
+    session_mock = mocker.AsyncMock()
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_auth_user_from_token(session_mock, payload)
+    assert exc_info.value.status_code == 401
+    assert exc_info.value.detail == "Invalid token"
+
+
+@pytest.mark.asyncio
+async def test_get_user_from_api_key_cached(mocker, user_mock):
+    get_api_key_mock = mocker.patch(
+        "api.auth.validation.get_active_api_key_by_digest",
+        return_value=mocker.Mock(user_id=0, expires_at=None),
+    )
+    mocker.patch(
+        "api.auth.validation.get_user_by_id",
+        side_effect=make_get_user_by_mock(user_mock),
+    )
+    session_mock = mocker.AsyncMock()
+
+    first = await get_user_from_api_key(session_mock, "todo_key")
+    second = await get_user_from_api_key(session_mock, "todo_key")
+    assert first == second
+    assert first.id == user_mock(0).id
+    get_api_key_mock.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_get_user_from_api_key_unknown(mocker):
+    mocker.patch(
+        "api.auth.validation.get_active_api_key_by_digest",
+        return_value=None,
+    )
+    session_mock = mocker.AsyncMock()
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_user_from_api_key(session_mock, "todo_unknown")
+    assert exc_info.value.status_code == 401
+    assert exc_info.value.detail == "Invalid token"
+
+
+@pytest.mark.parametrize(
+    "api_key, role_to_check, expected_code",
+    [
+        (None, None, 401),
+        ("todo_key", None, None),
+        ("todo_key", settings.roles.admin, 403),
+    ],
+)
+@pytest.mark.asyncio
+async def test_get_auth_user_from_token_of_type_api_key(
+    mocker,
+    user_mock,
+    api_key,
+    role_to_check,
+    expected_code,
+):
+    mocker.patch(
+        "api.auth.validation.get_user_from_api_key",
+        return_value=UserSchmExtended.model_validate(user_mock(1)),
+    )
+    get_auth_user_from_token = get_auth_user_from_token_of_type(
+        token_type=ACCESS_TOKEN_TYPE,
+        user_role_to_check=role_to_check,
+    )
+    session_mock = mocker.AsyncMock()
+
+    if expected_code is None:
+        user = await get_auth_user_from_token(session_mock, None, api_key)
+        assert user.id == user_mock(1).id
+        return
+    with pytest.raises(HTTPException) as exc_info:
+        await get_auth_user_from_token(session_mock, None, api_key)
+    assert exc_info.value.status_code == expected_code
+
+
+def make_stateless_payload(user, epoch=0):
+    return {
+        "sub": user.id,
+        TOKEN_TYPE_FIELD: ACCESS_TOKEN_TYPE,
+        "username": user.username,
+        "name": user.name,
+        "role": user.role,
+        "active": user.active,
+        "epoch": epoch,
+        "b_date": None,
+        "created_at": user.created_at.timestamp(),
+    }
+
+
+@pytest.mark.asyncio
+async def test_get_auth_user_from_token_stateless(mocker, user_mock):
+    mocker.patch.object(settings.api.auth_jwt, "stateless", True)
+    get_user_by_id_mock = mocker.AsyncMock()
+    mocker.patch("api.auth.validation.get_user_by_id", new=get_user_by_id_mock)
+    epoch_mock = mocker.patch(
+        "api.auth.validation.get_user_security_epoch",
+        new=mocker.AsyncMock(return_value=0),
+    )
+    get_auth_user_from_token = get_auth_user_from_token_of_type(ACCESS_TOKEN_TYPE)
+    session_mock = mocker.AsyncMock()
+    payload = make_stateless_payload(user_mock(0))
+
+    user = await get_auth_user_from_token(session_mock, payload)
+    await get_auth_user_from_token(session_mock, payload)
+
+    assert user.id == payload["sub"]
+    assert user.username == payload["username"]
+    get_user_by_id_mock.assert_not_awaited()
+    epoch_mock.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "user_id, token_epoch, current_epoch, detail",
+    [
+        (0, 0, 1, "Invalid token"),
+        (0, 0, None, "Invalid token"),
+        (1, 0, 0, "User is inactive"),
+    ],
+)
+async def test_get_auth_user_from_token_stateless_rejected(
+    mocker,
+    user_mock,
+    user_id,
+    token_epoch,
+    current_epoch,
+    detail,
+):
+    mocker.patch.object(settings.api.auth_jwt, "stateless", True)
+    mocker.patch(
+        "api.auth.validation.get_user_security_epoch",
+        new=mocker.AsyncMock(return_value=current_epoch),
+    )
+    get_auth_user_from_token = get_auth_user_from_token_of_type(ACCESS_TOKEN_TYPE)
+    session_mock = mocker.AsyncMock()
+    payload = make_stateless_payload(user_mock(user_id), token_epoch)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_auth_user_from_token(session_mock, payload)
+    assert exc_info.value.status_code == 401
+    assert exc_info.value.detail == detail
+
+
+@pytest.mark.asyncio
+async def test_get_auth_user_from_token_stateless_refresh_epoch(mocker, user_mock):
+    mocker.patch.object(settings.api.auth_jwt, "stateless", True)
+    mocker.patch(
+        "api.auth.validation.get_user_by_id",
+        new=make_get_user_by_mock(user_mock),
+    )
+    get_auth_user_from_token = get_auth_user_from_token_of_type(REFRESH_TOKEN_TYPE)
+    session_mock = mocker.AsyncMock()
+    payload = {"sub": 0, TOKEN_TYPE_FIELD: REFRESH_TOKEN_TYPE, "epoch": -1}
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_auth_user_from_token(session_mock, payload)
+    assert exc_info.value.detail == "Invalid token"
+
+
 @pytest.mark.asyncio
 async def test_get_auth_user_from_db_success(mocker, user_mock):
     username = "test_user_0"
@@ -166,7 +374,7 @@ async def test_get_auth_user_from_db_success(mocker, user_mock):
         new=get_user_by_id_mock,
     )
     mocker.patch(
-        "api.auth.validation.check_password",
+        "api.auth.validation.check_password_async",
         return_value=True,
     )
 
@@ -178,6 +386,41 @@ async def test_get_auth_user_from_db_success(mocker, user_mock):
     assert user.username == username
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize("needs_rehash", [True, False])
+async def test_get_auth_user_from_db_schedules_rehash(mocker, user_mock, needs_rehash):
+    session_mock = mocker.AsyncMock()
+    background_tasks = mocker.Mock()
+    mocker.patch(
+        "api.auth.validation.get_user_by_username",
+        new=make_get_user_by_mock(user_mock),
+    )
+    mocker.patch(
+        "api.auth.validation.check_password_async",
+        return_value=True,
+    )
+    mocker.patch(
+        "api.auth.validation.password_needs_rehash",
+        return_value=needs_rehash,
+    )
+
+    user = await get_auth_user_from_db(
+        session=session_mock,
+        username="test_user_0",
+        password="test0",
+        background_tasks=background_tasks,
+    )
+    if needs_rehash:
+        background_tasks.add_task.assert_called_once_with(
+            rehash_user_password,
+            user.id,
+            user.password,
+            "test0",
+        )
+    else:
+        background_tasks.add_task.assert_not_called()
+
+
 @pytest.mark.asyncio
 async def test_get_auth_user_from_db_no_user(mocker, user_mock):
     username = "test_no_user"
@@ -189,7 +432,7 @@ async def test_get_auth_user_from_db_no_user(mocker, user_mock):
         new=get_user_by_id_mock,
     )
     mocker.patch(
-        "api.auth.validation.check_password",
+        "api.auth.validation.check_password_async",
         return_value=True,
     )
 
@@ -214,7 +457,7 @@ async def test_get_auth_user_from_db_wrong_password(mocker, user_mock):
         new=get_user_by_id_mock,
     )
     mocker.patch(
-        "api.auth.validation.check_password",
+        "api.auth.validation.check_password_async",
         return_value=False,
     )
 
@@ -239,7 +482,7 @@ async def test_get_auth_user_from_db_inactive_user(mocker, user_mock):
         new=get_user_by_id_mock,
     )
     mocker.patch(
-        "api.auth.validation.check_password",
+        "api.auth.validation.check_password_async",
         return_value=True,
     )
 
@@ -1,5 +1,14 @@
 import pytest
-from core.crud.user import _create_user_helper
+from api.schemas import UpdateUserSchm, UserSchm, UserSchmExtended
+from core.crud.cache import missing_username_cache, user_cache, username_cache
+from core.crud.user import (
+    _create_user_helper,
+    delete_user,
+    update_password,
+    update_role,
+    update_user,
+)
+from sqlalchemy.dialects import postgresql
 
 
 @pytest.mark.asyncio
@@ -23,20 +32,169 @@ from core.crud.user import _create_user_helper
     ],
 )
 async def test_create_user_crud(mocker, user_data):
-    def refresh_side_effect(user):
-        user.id = 1
-
+    created_user = mocker.Mock()
     session_mock = mocker.AsyncMock()
-    session_mock.add = mocker.MagicMock()
-    session_mock.commit = mocker.AsyncMock()
-    session_mock.refresh = mocker.AsyncMock(side_effect=refresh_side_effect)
+    session_mock.scalars.return_value = mocker.Mock()
+    session_mock.scalars.return_value.one_or_none.return_value = created_user
 
     user = await _create_user_helper(session_mock, user_data)
 
-    session_mock.add.assert_called_once_with(user)
+    stmt = session_mock.scalars.await_args.args[0]
+    compiled = stmt.compile(dialect=postgresql.dialect())
+    params = compiled.params
+    session_mock.commit.assert_awaited_once()
+    assert user is created_user
+    assert "ON CONFLICT (username) DO NOTHING" in str(compiled)
+    assert params["username"] == user_data["username"]
+    assert params["password"] != user_data["password"]
+    assert params["password"].startswith("$2b$")
+
+
+@pytest.mark.asyncio
+async def test_create_user_crud_username_conflict(mocker):
+    session_mock = mocker.AsyncMock()
+    session_mock.scalars.return_value = mocker.Mock()
+    session_mock.scalars.return_value.one_or_none.return_value = None
+
+    user = await _create_user_helper(
+        session_mock,
+        {"username": "TestUser", "password": "testpass1"},
+    )
+
+    assert user is None
     session_mock.commit.assert_awaited_once()
-    session_mock.refresh.assert_awaited_once_with(user)
-    assert user.id is not None
-    assert user.username == user_data["username"]
-    assert user.password != user_data["password"]
-    assert user.password.startswith("$2b$")
+
+
+def updated_user_session(mocker, user, previous_username=None):
+    session_mock = mocker.AsyncMock()
+    session_mock.scalar.return_value = user
+    session_mock.execute.return_value = mocker.Mock()
+    session_mock.execute.return_value.one_or_none.return_value = (
+        (user, previous_username or user.username) if user is not None else None
+    )
+    return session_mock
+
+
+def compiled_stmt(stmt):
+    return stmt.compile(dialect=postgresql.dialect())
+
+
+@pytest.mark.asyncio
+async def test_update_user_single_statement(mocker, user_mock):
+    user = user_mock(0)
+    user_cache.set(user.id, UserSchmExtended.model_validate(user))
+    session_mock = updated_user_session(mocker, user)
+
+    result = await update_user(session_mock, user.id, UpdateUserSchm(name=user.name))
+
+    compiled = compiled_stmt(session_mock.execute.await_args.args[0])
+    assert "UPDATE users SET name=" in str(compiled)
+    assert "RETURNING" in str(compiled)
+    assert "security_epoch=" not in str(compiled)
+    session_mock.refresh.assert_not_awaited()
+    session_mock.commit.assert_awaited_once()
+    assert user_cache.get(user.id) is None
+    assert result is user
+
+
+@pytest.mark.asyncio
+async def test_update_user_missing(mocker):
+    session_mock = updated_user_session(mocker, None)
+    assert await update_user(session_mock, 100, UpdateUserSchm(name="name")) is None
+
+
+@pytest.mark.asyncio
+async def test_update_user_bumps_security_epoch_when_active_changes(
+    mocker,
+    user_mock,
+):
+    user = user_mock(0)
+    session_mock = updated_user_session(mocker, user)
+    await update_user(session_mock, user.id, UpdateUserSchm(active=False))
+    compiled = str(compiled_stmt(session_mock.execute.await_args.args[0]))
+    assert "security_epoch=CASE WHEN (previous.active !=" in compiled
+
+
+@pytest.mark.asyncio
+async def test_update_role_single_statement(mocker, user_mock):
+    user = user_mock(2)
+    user_cache.set(user.id, UserSchmExtended.model_validate(user))
+    session_mock = updated_user_session(mocker, user)
+
+    updated_user = await update_role(session_mock, user.id, user.role)
+
+    compiled = compiled_stmt(session_mock.scalar.await_args.args[0])
+    assert "security_epoch=(coalesce(users.security_epoch" in str(compiled)
+    assert "RETURNING" in str(compiled)
+    session_mock.refresh.assert_not_awaited()
+    assert user_cache.get(user.id) is None
+    assert updated_user is user
+
+
+@pytest.mark.asyncio
+async def test_update_password_bumps_security_epoch(mocker, user_mock):
+    user = user_mock(0)
+    mocker.patch(
+        "core.crud.user.hash_password_async",
+        new=mocker.AsyncMock(return_value=b"hashed"),
+    )
+    session_mock = updated_user_session(mocker, user)
+
+    assert await update_password(session_mock, user.id, "new_password") is user
+
+    compiled = compiled_stmt(session_mock.scalar.await_args.args[0])
+    assert compiled.params["password"] == "hashed"
+    assert "security_epoch=(coalesce(users.security_epoch" in str(compiled)
+    session_mock.refresh.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_delete_user_invalidates_caches(mocker, user_mock):
+    user = user_mock(0)
+    user_cache.set(user.id, UserSchmExtended.model_validate(user))
+    username_cache.set(user.username, (UserSchm.model_validate(user), '"etag"'))
+    session_mock = mocker.AsyncMock()
+    session_mock.scalar.return_value = user.username
+
+    assert await delete_user(session_mock, user.id) is True
+
+    compiled = str(compiled_stmt(session_mock.scalar.await_args.args[0]))
+    assert compiled.startswith("DELETE FROM users")
+    assert "RETURNING users.username" in compiled
+    session_mock.delete.assert_not_awaited()
+    assert user_cache.get(user.id) is None
+    assert username_cache.get(user.username) is None
+
+
+@pytest.mark.asyncio
+async def test_delete_user_missing(mocker):
+    session_mock = mocker.AsyncMock()
+    session_mock.scalar.return_value = None
+    assert await delete_user(session_mock, 100) is False
+
+
+@pytest.mark.asyncio
+async def test_rename_user_invalidates_username_caches(mocker, user_mock):
+    user = user_mock(0)
+    old_username = user.username
+    username_cache.set(old_username, (UserSchm.model_validate(user), '"etag"'))
+    missing_username_cache.set("renamed_user", True)
+    user.username = "renamed_user"
+    session_mock = updated_user_session(mocker, user, old_username)
+    await update_user(session_mock, user.id, UpdateUserSchm(username="renamed_user"))
+    assert username_cache.get(old_username) is None
+    assert missing_username_cache.get("renamed_user") is None
+
+
+@pytest.mark.asyncio
+async def test_create_user_invalidates_missing_username(mocker, user_mock):
+    user = user_mock(0)
+    missing_username_cache.set(user.username, True)
+    session_mock = mocker.AsyncMock()
+    session_mock.scalars.return_value = mocker.Mock()
+    session_mock.scalars.return_value.one_or_none.return_value = user
+    await _create_user_helper(
+        session_mock,
+        {"username": user.username, "password": "testpass1"},
+    )
+    assert missing_username_cache.get(user.username) is None
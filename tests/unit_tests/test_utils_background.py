@@ -0,0 +1,31 @@
+import asyncio
+import logging
+
+import pytest
+from core.utils import metrics
+from core.utils.background import BackgroundLoop
+
+
+@pytest.mark.asyncio
+async def test_background_loop_survives_failures_and_stops():
+    failures = metrics.Counter("test_background_failures_total")
+    loop = BackgroundLoop(failures, "Test job failed", logging.getLogger(__name__))
+    calls = 0
+    done = asyncio.Event()
+
+    async def job():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise RuntimeError("boom")
+        done.set()
+
+    loop.start(job, 0)
+    loop.start(job, 0)
+    async with asyncio.timeout(1):
+        await done.wait()
+    assert failures.value == 1
+
+    await loop.stop()
+    await loop.stop()
+    assert calls >= 2
@@ -0,0 +1,60 @@
+import time
+
+from core.utils.cache import TTLCache
+
+
+def test_cache_get_set():
+    cache = TTLCache(max_size=2)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_cache_lru_eviction():
+    cache = TTLCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_cache_expire_at():
+    cache = TTLCache(max_size=2)
+    cache.set("a", 1, expire_at=time.time() - 1)
+    cache.set("b", 2, expire_at=time.time() + 60)
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert len(cache) == 1
+
+
+def test_cache_ttl_caps_expire_at():
+    cache = TTLCache(max_size=2, ttl=0)
+    cache.set("a", 1, expire_at=time.time() + 60)
+    assert cache.get("a") is None
+
+
+def test_cache_pop_and_clear():
+    cache = TTLCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.pop("a") == 1
+    assert cache.pop("a") is None
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_cache_bypassed():
+    cache = TTLCache(max_size=2)
+    cache.set("a", 1)
+    cache.bypassed = True
+    cache.set("b", 2)
+    assert cache.get("a") is None
+    cache.bypassed = False
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
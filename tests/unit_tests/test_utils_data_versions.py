@@ -0,0 +1,30 @@
+from core.utils.data_versions import DataVersions
+
+
+def test_data_versions_bump_changes_key_and_any():
+    versions = DataVersions(max_size=10)
+    user_version, any_version = versions.get(1), versions.get()
+    other_version = versions.get(2)
+    assert versions.get(1) == user_version
+
+    versions.bump(1)
+    assert versions.get(1) != user_version
+    assert versions.get() != any_version
+    assert versions.get(2) == other_version
+
+
+def test_data_versions_never_reuse_evicted_versions():
+    versions = DataVersions(max_size=2)
+    seen = {versions.get(1)}
+    for key in range(2, 6):
+        seen.add(versions.get(key))
+    assert versions.get(1) not in seen
+
+    versions.clear()
+    assert versions.get(5) not in seen
+
+
+def test_data_versions_bypassed():
+    versions = DataVersions(max_size=10)
+    versions.bypassed = True
+    assert versions.get(1) != versions.get(1)
@@ -0,0 +1,96 @@
+from api.schemas import UserSchmExtended
+from core.config import InvalidationBusCfg
+from core.crud.cache import (
+    api_key_cache,
+    missing_username_cache,
+    task_versions,
+    user_cache,
+    username_cache,
+)
+from core.utils.invalidation import (
+    API_KEY,
+    TASKS,
+    USER,
+    USERNAME,
+    InvalidationBus,
+    apply,
+    flush,
+    message,
+)
+from core.utils.invalidation_triggers import create_trigger, trigger_matches
+
+
+def test_apply_invalidation_messages(user_mock):
+    user = user_mock(0)
+    user_cache.set(user.id, UserSchmExtended.model_validate(user))
+    username_cache.set(user.username, object())
+    missing_username_cache.set("ghost", True)
+    api_key_cache.set("digest", user.id)
+    version = task_versions.get(user.id)
+
+    apply(message(USER, user.id))
+    apply(message(USERNAME, user.username))
+    apply(message(USERNAME, "ghost"))
+    apply(message(API_KEY, "digest"))
+    apply(message(TASKS, user.id))
+    apply("unknown:1")
+
+    assert user_cache.get(user.id) is None
+    assert username_cache.get(user.username) is None
+    assert missing_username_cache.get("ghost") is None
+    assert api_key_cache.get("digest") is None
+    assert task_versions.get(user.id) != version
+
+
+def test_flush_clears_caches(user_mock):
+    user = user_mock(0)
+    user_cache.set(user.id, UserSchmExtended.model_validate(user))
+    username_cache.set(user.username, object())
+    version = task_versions.get(user.id)
+
+    flush()
+
+    assert user_cache.get(user.id) is None
+    assert username_cache.get(user.username) is None
+    assert task_versions.get(user.id) != version
+
+
+def test_malformed_notification_is_ignored(user_mock):
+    user = user_mock(0)
+    user_cache.set(user.id, UserSchmExtended.model_validate(user))
+    bus = InvalidationBus.from_cfg(InvalidationBusCfg())
+    bus._on_notification(None, 0, bus.channel, "user:not_an_id")
+    assert user_cache.get(user.id) is not None
+
+
+def test_disconnect_flushes_and_bypasses_caches(user_mock):
+    user = user_mock(0)
+    cached_user = UserSchmExtended.model_validate(user)
+    bus = InvalidationBus.from_cfg(InvalidationBusCfg())
+    bus._set_connected(True)
+    user_cache.set(user.id, cached_user)
+
+    bus._set_connected(False)
+    assert user_cache.get(user.id) is None
+    user_cache.set(user.id, cached_user)
+    assert user_cache.get(user.id) is None
+    assert task_versions.get(user.id) != task_versions.get(user.id)
+
+    bus._set_connected(True)
+    user_cache.set(user.id, cached_user)
+    assert user_cache.get(user.id) is not None
+
+
+def test_trigger_matches_configured_channel():
+    definition = (
+        "CREATE TRIGGER invalidation_trigger AFTER UPDATE OR DELETE ON "
+        "public.api_keys FOR EACH ROW "
+        "EXECUTE FUNCTION notify_api_keys_invalidation('cache_invalidation')"
+    )
+    assert create_trigger("api_keys", "cache_invalidation").endswith(
+        "EXECUTE FUNCTION notify_api_keys_invalidation('cache_invalidation')"
+    )
+    assert trigger_matches(definition, "api_keys", "cache_invalidation")
+    assert not trigger_matches(definition, "api_keys", "other_channel")
+    assert not trigger_matches(definition, "users", "cache_invalidation")
+    assert not trigger_matches(None, "api_keys", "cache_invalidation")
@@ -1,7 +1,19 @@
 from datetime import UTC, datetime, timedelta
 
 import pytest
-from core.utils.jwt import check_password, decode_jwt, encode_jwt, hash_password
+from core.utils import jwt as jwt_utils
+from core.utils import metrics
+from core.utils.jwt import (
+    check_password,
+    check_password_async,
+    decode_jwt,
+    decode_jwt_cached,
+    encode_jwt,
+    hash_password,
+    hash_password_async,
+    token_cache,
+)
+from jwt import InvalidTokenError
 
 
 def test_encode_decode_jwt(jwt_payload_example, jwt_config):
@@ -38,3 +50,44 @@ def test_hash_n_check_passwords(password):
     hash_pass = hash_password(password)
     assert hash_pass != password
     assert check_password(password, hash_pass)
+
+
+def test_decode_jwt_cached(mocker, jwt_payload_example, jwt_config):
+    token_cache.clear()
+    token = encode_jwt(
+        payload=jwt_payload_example,
+        private_key=jwt_config.get("private_key"),
+        algorithm=jwt_config.get("algorithm"),
+        expire_minutes=jwt_config.get("expire_minutes"),
+    )
+    decode_spy = mocker.spy(jwt_utils, "decode_jwt")
+    hits = metrics.counter("token_cache_hits_total")
+    misses = metrics.counter("token_cache_misses_total")
+    hits_before, misses_before = hits.value, misses.value
+    first = decode_jwt_cached(token)
+    second = decode_jwt_cached(token)
+    assert first == second
+    assert first["username"] == jwt_payload_example["username"]
+    assert decode_spy.call_count == 1
+    assert hits.value == hits_before + 1
+    assert misses.value == misses_before + 1
+    assert metrics.gauge("token_cache_size").value == 1
+
+
+def test_decode_jwt_cached_invalid_token_not_cached():
+    token_cache.clear()
+    with pytest.raises(InvalidTokenError):
+        decode_jwt_cached("invalid.token.value")
+    assert len(token_cache) == 0
+
+
+def test_decode_jwt_cached_missing_token():
+    with pytest.raises(InvalidTokenError):
+        decode_jwt_cached(None)  # type: ignore[arg-type]
+
+
+@pytest.mark.asyncio
+async def test_hash_n_check_passwords_async():
+    hash_pass = await hash_password_async("fg345gGdg")
+    assert await check_password_async("fg345gGdg", hash_pass)
+    assert not await check_password_async("wrong", hash_pass)
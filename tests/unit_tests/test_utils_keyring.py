@@ -0,0 +1,72 @@
+import jwt
+import pytest
+from core.utils import jwt as jwt_utils
+from core.utils.jwt import decode_jwt, encode_jwt, key_ring
+from core.utils.keyring import JWTKey, KeyRing, jwk_thumbprint
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from jwt import InvalidTokenError
+
+
+@pytest.fixture
+def ec_key():
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    return JWTKey.from_keys(private_key.public_key(), private_key, "RS256")
+
+
+@pytest.fixture
+def ed_key():
+    private_key = ed25519.Ed25519PrivateKey.generate()
+    return JWTKey.from_keys(private_key.public_key(), private_key, "EdDSA")
+
+
+def test_jwk_thumbprint_rfc7638_example():
+    jwk = {
+        "kty": "RSA",
+        "e": "AQAB",
+        "n": "0vx7agoebGcQSuuPiLJXZptN9nndrQmbXEps2aiAFbWhM78LhWx4cbbfAAtVT86zwu1"
+        "RK7aPFFxuhDR1L6tSoc_BJECPebWKRXjBZCiFV4n3oknjhMstn64tZ_2W-5JsGY4Hc5n9y"
+        "BXArwl93lqt7_RN5w6Cf0h4QyQ5v-65YGjQR0_FDW2QvzqY368QQMicAtaSqzs8KJZgnYb"
+        "9c7d0zgdAZHzu6qMQvRL5hajrn1n91CbOpbISD08qNLyrdkt-bFTWhAI4vMQFh6WeZu0fM"
+        "4lFd2NcRwr3XPksINHaQ-G_xBniIqbw0Ls1jF44-csFCur-kEgU8awapJzKnqDKgw",
+    }
+    assert jwk_thumbprint(jwk) == "NzbLsXh8uDCcd-6MNwXF4W_7noWXFZAfHkxZsRGC9Xs"
+
+
+def test_key_algorithm_inferred_from_key_type(ec_key, ed_key):
+    assert ec_key.algorithm == "ES256"
+    assert ed_key.algorithm == "EdDSA"
+
+
+def test_encode_jwt_stamps_active_kid(jwt_payload_example):
+    token = encode_jwt(payload=jwt_payload_example)
+    assert jwt.get_unverified_header(token)["kid"] == key_ring.active.kid
+    assert decode_jwt(token)["username"] == jwt_payload_example["username"]
+
+
+@pytest.mark.parametrize("active_key", ["ec_key", "ed_key"])
+def test_key_rotation_verifies_retired_keys(
+    mocker,
+    request,
+    jwt_payload_example,
+    active_key,
+):
+    old_token = encode_jwt(payload=jwt_payload_example)
+    new_ring = KeyRing(request.getfixturevalue(active_key), (key_ring.active,))
+    mocker.patch.object(jwt_utils, "key_ring", new_ring)
+    new_token = encode_jwt(payload=jwt_payload_example)
+    assert jwt.get_unverified_header(new_token)["kid"] == new_ring.active.kid
+    assert decode_jwt(old_token)["sub"] == jwt_payload_example["sub"]
+    assert decode_jwt(new_token)["sub"] == jwt_payload_example["sub"]
+
+
+def test_unknown_kid_rejected(mocker, ec_key, jwt_payload_example):
+    token = encode_jwt(payload=jwt_payload_example)
+    mocker.patch.object(jwt_utils, "key_ring", KeyRing(ec_key))
+    with pytest.raises(InvalidTokenError):
+        decode_jwt(token)
+
+
+def test_jwks(ec_key):
+    jwks = KeyRing(ec_key, (key_ring.active,)).jwks()
+    assert {key["kid"] for key in jwks["keys"]} == {ec_key.kid, key_ring.active.kid}
+    assert all("d" not in key for key in jwks["keys"])
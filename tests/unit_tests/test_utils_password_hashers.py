@@ -0,0 +1,54 @@
+import pytest
+from core.utils import password_hashers
+from core.utils.password_hashers import (
+    BcryptHasher,
+    PasswordHasher,
+    ScryptHasher,
+    identify_hasher,
+    password_needs_rehash,
+)
+
+
+@pytest.mark.parametrize(
+    "hasher",
+    [BcryptHasher(rounds=4), ScryptHasher(n=2**10, r=8, p=1)],
+)
+def test_hash_and_verify(hasher):
+    hashed = hasher.hash(b"fg345gGdg")
+    assert hasher.identify(hashed)
+    assert hasher.verify(b"fg345gGdg", hashed)
+    assert not hasher.verify(b"wrong", hashed)
+    assert not hasher.needs_update(hashed)
+
+
+def test_needs_update_on_changed_cost():
+    assert BcryptHasher(rounds=5).needs_update(BcryptHasher(rounds=4).hash(b"pass"))
+    old_hash = ScryptHasher(n=2**10).hash(b"pass")
+    assert ScryptHasher(n=2**11).needs_update(old_hash)
+
+
+def test_identify_hasher():
+    assert identify_hasher(BcryptHasher(rounds=4).hash(b"pass")).name == "bcrypt"
+    assert identify_hasher(ScryptHasher(n=2**10).hash(b"pass")).name == "scrypt"
+    with pytest.raises(ValueError):
+        identify_hasher("plain")
+
+
+def test_password_needs_rehash_on_algorithm_change(mocker):
+    scrypt_hasher = ScryptHasher(n=2**10)
+    bcrypt_hash = BcryptHasher(rounds=4).hash(b"pass")
+    mocker.patch.object(password_hashers, "default_hasher", scrypt_hasher)
+    mocker.patch.dict(password_hashers.password_hashers, {"scrypt": scrypt_hasher})
+    assert password_needs_rehash(bcrypt_hash)
+    assert not password_needs_rehash(scrypt_hasher.hash(b"pass"))
+
+
+def test_incomplete_hasher_cannot_be_instantiated():
+    class PlainHasher(PasswordHasher):
+        name = "plain"
+
+        def hash(self, password: bytes) -> str:
+            return password.decode()
+
+    with pytest.raises(TypeError):
+        PlainHasher()  # type: ignore[abstract]
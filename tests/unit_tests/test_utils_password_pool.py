@@ -0,0 +1,34 @@
+import asyncio
+import threading
+
+import pytest
+from core.utils.password_pool import (
+    PasswordPool,
+    PasswordPoolBusyError,
+    queue_wait,
+    work_time,
+)
+
+
+@pytest.mark.asyncio
+async def test_password_pool_run():
+    pool = PasswordPool(max_workers=1, max_queue=0)
+    observed = work_time.count
+    result = await pool.run(lambda a, b: a + b, 2, 3)
+    pool.shutdown()
+    assert result == 5
+    assert work_time.count == observed + 1
+    assert queue_wait.count >= 1
+
+
+@pytest.mark.asyncio
+async def test_password_pool_busy():
+    pool = PasswordPool(max_workers=1, max_queue=0)
+    release = threading.Event()
+    running = asyncio.ensure_future(pool.run(release.wait))
+    await asyncio.sleep(0)
+    with pytest.raises(PasswordPoolBusyError):
+        await pool.run(lambda: None)
+    release.set()
+    assert await running
+    pool.shutdown()
@@ -0,0 +1,27 @@
+from core.utils import metrics
+from core.utils.pool_metrics import current_endpoint, request_scope
+
+
+def test_labelled_metric_name():
+    assert metrics.labelled("db_pool_size") == "db_pool_size"
+    assert (
+        metrics.labelled("db_pool_hold_seconds", pool="primary", endpoint="/task/")
+        == 'db_pool_hold_seconds{pool="primary",endpoint="/task/"}'
+    )
+
+
+def test_current_endpoint(mocker):
+    assert current_endpoint() == "background"
+    scope = {"type": "http"}
+    token = request_scope.set(scope)
+    try:
+        assert current_endpoint() == "unmatched"
+        scope["route"] = mocker.Mock(path="/api/task/{task_id}/")
+        assert current_endpoint() == "/api/task/{task_id}/"
+    finally:
+        request_scope.reset(token)
+
+
+def test_unlabelled_pool_metrics_not_registered():
+    assert "db_pool_checkout_wait_seconds" not in metrics.registry
+    assert "db_pool_timeouts_total" not in metrics.registry
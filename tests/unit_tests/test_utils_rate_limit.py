@@ -0,0 +1,91 @@
+import pytest
+from core.utils.rate_limit import (
+    LoginAdmission,
+    LoginThrottledError,
+    SlidingWindowCounter,
+    admitted,
+    rejected_by_concurrency,
+    rejected_by_ip,
+    rejected_by_username,
+)
+
+
+def make_admission(username_limit=2, ip_limit=3, max_concurrent=1):
+    return LoginAdmission(
+        per_username=SlidingWindowCounter(username_limit, 60, 100),
+        per_ip=SlidingWindowCounter(ip_limit, 60, 100),
+        max_concurrent_verifications=max_concurrent,
+    )
+
+
+def test_sliding_window_counter_limit():
+    counter = SlidingWindowCounter(limit=2, window_seconds=60, max_keys=10)
+    counter.hit("john", now=600)
+    assert counter.retry_after("john", now=600) is None
+    counter.hit("john", now=610)
+    assert counter.retry_after("john", now=610) == 50
+    assert counter.retry_after("jane", now=610) is None
+
+
+def test_sliding_window_counter_weights_previous_window():
+    counter = SlidingWindowCounter(limit=2, window_seconds=60, max_keys=10)
+    for now in (600, 601, 602):
+        counter.hit("john", now=now)
+    assert counter.retry_after("john", now=665) == 55
+    assert counter.retry_after("john", now=700) is None
+    assert counter.retry_after("john", now=800) is None
+
+
+def test_sliding_window_counter_evicts_oldest_key():
+    counter = SlidingWindowCounter(limit=1, window_seconds=60, max_keys=2)
+    for key in ("a", "b", "c"):
+        counter.hit(key, now=600)
+    assert counter.retry_after("a", now=600) is None
+    assert counter.retry_after("c", now=600) == 60
+
+
+def test_login_admission_per_ip():
+    admission = make_admission(ip_limit=2)
+    observed_admitted, observed_rejected = admitted.value, rejected_by_ip.value
+    admission.admit("john", "10.0.0.1")
+    admission.admit("jane", "10.0.0.1")
+    with pytest.raises(LoginThrottledError) as exc_info:
+        admission.admit("jack", "10.0.0.1")
+    admission.admit("jack", "10.0.0.2")
+    assert exc_info.value.retry_after >= 1
+    assert admitted.value == observed_admitted + 3
+    assert rejected_by_ip.value == observed_rejected + 1
+
+
+def test_login_admission_counts_only_username_failures():
+    admission = make_admission(username_limit=1, ip_limit=100)
+    observed = rejected_by_username.value
+    admission.admit("john", "10.0.0.1")
+    admission.admit("john", "10.0.0.1")
+    admission.record_failure("john")
+    with pytest.raises(LoginThrottledError):
+        admission.admit("john", "10.0.0.2")
+    assert rejected_by_username.value == observed + 1
+    admission.clear()
+    admission.admit("john", "10.0.0.2")
+
+
+def test_login_admission_disabled():
+    admission = make_admission(username_limit=0, ip_limit=0)
+    admission.enabled = False
+    admission.admit("john", "10.0.0.1")
+    admission.record_failure("john")
+
+
+@pytest.mark.asyncio
+async def test_login_admission_verification_slot():
+    admission = make_admission(max_concurrent=1)
+    observed = rejected_by_concurrency.value
+    async with admission.verification_slot():
+        with pytest.raises(LoginThrottledError) as exc_info:
+            async with admission.verification_slot():
+                pass
+    async with admission.verification_slot():
+        pass
+    assert exc_info.value.retry_after == 1
+    assert rejected_by_concurrency.value == observed + 1
@@ -0,0 +1,90 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from core.utils.revocation import RevocationList
+
+
+@pytest.fixture
+def revocation():
+    return RevocationList(
+        refresh_interval=1,
+        full_reload_interval=60,
+        capacity=100,
+        error_rate=0.01,
+    )
+
+
+def test_revocation_list_add(revocation):
+    assert not revocation.is_revoked("jti-1")
+    assert not revocation.is_revoked(None)
+    revocation.add("jti-1")
+    assert revocation.is_revoked("jti-1")
+
+
+@pytest.mark.asyncio
+async def test_revocation_list_revoke_payload(mocker, revocation):
+    revoke_mock = mocker.patch(
+        "core.utils.revocation.revoked_token_crud.revoke_token",
+        new=mocker.AsyncMock(),
+    )
+    session_mock = mocker.AsyncMock()
+    await revocation.revoke_payload(
+        session_mock,
+        {"jti": "jti-1", "sub": 7, "exp": 1722351564},
+    )
+    revoke_mock.assert_awaited_once_with(
+        session_mock,
+        "jti-1",
+        datetime.fromtimestamp(1722351564, UTC),
+        7,
+    )
+    assert revocation.is_revoked("jti-1")
+
+
+@pytest.mark.asyncio
+async def test_revocation_list_refresh(mocker, revocation):
+    mocker.patch(
+        "core.utils.revocation.revoked_token_crud.delete_expired_revoked_tokens",
+        new=mocker.AsyncMock(),
+    )
+    get_mock = mocker.patch(
+        "core.utils.revocation.revoked_token_crud.get_active_revoked_tokens",
+        new=mocker.AsyncMock(side_effect=[[(1, "jti-1")], [(2, "jti-2")]]),
+    )
+    session_mock = mocker.AsyncMock()
+    revocation.add("jti-local")
+
+    await revocation.refresh(session_mock)
+    assert revocation.is_revoked("jti-1")
+    assert not revocation.is_revoked("jti-local")
+
+    await revocation.refresh(session_mock)
+    get_mock.assert_awaited_with(
+        session_mock,
+        after_id=1,
+        created_after=mocker.ANY,
+    )
+    assert revocation.is_revoked("jti-2")
+
+
+@pytest.mark.asyncio
+async def test_revocation_list_refresh_rescans_late_commits(mocker, revocation):
+    mocker.patch(
+        "core.utils.revocation.revoked_token_crud.delete_expired_revoked_tokens",
+        new=mocker.AsyncMock(),
+    )
+    get_mock = mocker.patch(
+        "core.utils.revocation.revoked_token_crud.get_active_revoked_tokens",
+        new=mocker.AsyncMock(
+            side_effect=[[(2, "jti-2")], [(1, "jti-1"), (2, "jti-2")]],
+        ),
+    )
+    session_mock = mocker.AsyncMock()
+
+    await revocation.refresh(session_mock)
+    await revocation.refresh(session_mock)
+
+    created_after = get_mock.await_args.kwargs["created_after"]
+    assert datetime.now() - created_after >= timedelta(seconds=59)
+    assert revocation.is_revoked("jti-1")
+    assert revocation._last_id == 2
@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta
+
+import pytest
+from core.config import TaskArchiveCfg
+from core.utils.task_archiver import TaskArchiver, archived_tasks
+
+
+@pytest.mark.asyncio
+async def test_task_archiver_runs_batches_until_short_batch(mocker):
+    archive_mock = mocker.patch(
+        "core.utils.task_archiver.task_crud.archive_completed_tasks",
+        new=mocker.AsyncMock(side_effect=[2, 2, 1]),
+    )
+    sleep_mock = mocker.patch(
+        "core.utils.task_archiver.asyncio.sleep",
+        new=mocker.AsyncMock(),
+    )
+    session_factory = mocker.MagicMock()
+    archived_before = archived_tasks.value
+    archiver = TaskArchiver(
+        min_age=timedelta(days=7),
+        batch_size=2,
+        pause=0.25,
+        interval=60,
+    )
+
+    assert await archiver.run(session_factory) == 5
+    assert archive_mock.await_count == 3
+    assert sleep_mock.await_args_list == [mocker.call(0.25), mocker.call(0.25)]
+    _session, completed_before, batch_size = archive_mock.await_args.args
+    assert batch_size == 2
+    assert completed_before < datetime.now() - timedelta(days=7) + timedelta(seconds=5)
+    assert archived_tasks.value == archived_before + 5
+
+
+def test_task_archiver_from_cfg():
+    archiver = TaskArchiver.from_cfg(TaskArchiveCfg(min_age_days=3, batch_size=10))
+    assert archiver.min_age == timedelta(days=3)
+    assert archiver.batch_size == 10
+    assert archiver.pause == 0.5
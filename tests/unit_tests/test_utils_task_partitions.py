@@ -0,0 +1,49 @@
+from datetime import date
+
+import pytest
+from core.config import TaskPartitionsCfg
+from core.utils.task_partitions import (
+    TaskPartitionMaintainer,
+    add_months,
+    expired_partitions,
+    partition_name,
+    partition_start,
+)
+
+
+@pytest.mark.parametrize(
+    "day, months, expected",
+    [
+        (date(2026, 10, 18), 0, date(2026, 10, 1)),
+        (date(2026, 10, 18), 3, date(2027, 1, 1)),
+        (date(2026, 1, 31), -1, date(2025, 12, 1)),
+        (date(2026, 1, 1), -13, date(2024, 12, 1)),
+    ],
+)
+def test_add_months(day, months, expected):
+    assert add_months(day, months) == expected
+
+
+def test_partition_name_round_trip():
+    assert partition_name(date(2026, 3, 1)) == "tasks_p202603"
+    assert partition_start("tasks_p202603") == date(2026, 3, 1)
+    assert partition_start("tasks_archive") is None
+
+
+def test_expired_partitions():
+    names = ["tasks_p202604", "tasks_p202603", "tasks_p202605", "tasks_default"]
+    assert expired_partitions(names, date(2026, 5, 1)) == [
+        "tasks_p202603",
+        "tasks_p202604",
+    ]
+    assert expired_partitions(names, date(2026, 4, 1)) == ["tasks_p202603"]
+
+
+def test_maintainer_from_cfg():
+    maintainer = TaskPartitionMaintainer.from_cfg(
+        TaskPartitionsCfg(retention_months=12, maintenance_interval_seconds=60)
+    )
+    assert maintainer.premake_months == 3
+    assert maintainer.retention_months == 12
+    assert maintainer.drop_detached is False
+    assert maintainer.interval == 60
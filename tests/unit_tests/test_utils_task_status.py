@@ -0,0 +1,48 @@
+import pytest
+from api.schemas import SearchTaskSchm, UpdateTaskSchm
+from core.config import settings
+from core.models import Task
+from core.models.task import TaskStatusCode
+from core.utils.task_status import TASK_STATUS_CODES, TASK_STATUS_LABELS
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+
+def test_task_status_mapping():
+    assert list(TASK_STATUS_CODES) == list(settings.tstat.model_dump().values())
+    assert list(TASK_STATUS_CODES.values()) == list(range(len(TASK_STATUS_CODES)))
+    assert all(
+        TASK_STATUS_LABELS[code] == label for label, code in TASK_STATUS_CODES.items()
+    )
+
+
+@pytest.mark.parametrize("label", settings.tstat.model_dump().values())
+def test_task_status_code_round_trip(label):
+    status_type = TaskStatusCode()
+    dialect = postgresql.dialect()
+    code = status_type.process_bind_param(label, dialect)
+    assert code == TASK_STATUS_CODES[label]
+    assert status_type.process_result_value(code, dialect) == label
+    assert status_type.process_bind_param(None, dialect) is None
+
+
+def test_task_status_filter_binds_code():
+    stmt = select(Task.id).where(Task.status == settings.tstat.cmp)
+    compiled = stmt.compile(
+        dialect=postgresql.dialect(),
+        compile_kwargs={"literal_binds": True},
+    )
+    assert str(compiled).endswith(
+        f"WHERE tasks.status = {TASK_STATUS_CODES[settings.tstat.cmp]}"
+    )
+
+
+@pytest.mark.parametrize("schema", [SearchTaskSchm, UpdateTaskSchm])
+def test_task_status_validated_by_schema(schema):
+    assert schema(status=settings.tstat.dly).status == settings.tstat.dly
+    assert schema().status is None
+    with pytest.raises(HTTPException) as exc_info:
+        schema(status="Very_needed")
+    assert exc_info.value.status_code == 400
+    assert exc_info.value.detail == "Status 'Very_needed' not exist"
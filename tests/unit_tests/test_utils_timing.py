@@ -0,0 +1,63 @@
+import pytest
+from api.middleware import server_timing_middleware
+from core.utils import metrics
+from core.utils.timing import (
+    request_timings,
+    reset_request_timings,
+    server_timing_value,
+    start_request_timings,
+    timed,
+)
+from fastapi import Response
+
+
+def test_timed_observes_stage_histogram():
+    histogram = metrics.histogram("test_stage_seconds")
+    observed = histogram.count
+    with timed("test_stage"):
+        pass
+    assert histogram.count == observed + 1
+    assert request_timings() == {}
+
+
+def test_timed_collects_request_timings():
+    token = start_request_timings()
+    try:
+        with timed("test_stage"):
+            pass
+        with timed("test_stage"):
+            pass
+        timings = request_timings()
+    finally:
+        reset_request_timings(token)
+    assert list(timings) == ["test_stage"]
+    assert timings["test_stage"] >= 0
+    assert request_timings() == {}
+
+
+def test_server_timing_value():
+    timings = {"auth_decode": 0.0001234, "auth_user_fetch": 0.002}
+    assert (
+        server_timing_value(timings)
+        == "auth_decode;dur=0.123, auth_user_fetch;dur=2.000"
+    )
+
+
+@pytest.mark.asyncio
+async def test_server_timing_middleware(mocker):
+    async def call_next(_request):
+        with timed("auth_decode"):
+            pass
+        return Response()
+
+    response = await server_timing_middleware(mocker.Mock(), call_next)
+    assert response.headers["Server-Timing"].startswith("auth_decode;dur=")
+
+
+@pytest.mark.asyncio
+async def test_server_timing_middleware_without_timings(mocker):
+    async def call_next(_request):
+        return Response()
+
+    response = await server_timing_middleware(mocker.Mock(), call_next)
+    assert "Server-Timing" not in response.headers